@@ -3,27 +3,41 @@
 
 from __future__ import annotations
 import sys
-import os
 import time
+_STARTUP_MARKS = [("시작", time.perf_counter_ns())] # --profile-startup용 (단계명, 시각)
+import argparse
+import bisect
+import functools
+import gc
+import itertools
+import os
 import threading
+import heapq
 import math
-import base64
-import webbrowser
+import mmap
+import queue
+import random
+import select
+import stat
+import struct
 import json
+from array import array
 from collections import deque
 from statistics import mean, median, stdev
-from typing import Deque, List, Optional, Tuple, Set
+from typing import Callable, Deque, List, Optional, Tuple, Set
 from datetime import datetime
-from urllib import request as url_request
+# base64, webbrowser, urllib는 시작 속도를 위해 사용하는 시점에 불러옵니다.
+_STARTUP_MARKS.append(("표준 라이브러리 import", time.perf_counter_ns()))
 
 # ----- Qt (Py-Side6) -----
-from PySide6.QtCore import Qt, QThread, Signal, Slot, QTimer, QPointF, QRectF
-from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QIcon, QPixmap
+from PySide6.QtCore import Qt, QThread, Signal, Slot, QTimer, QPointF, QRectF, QLineF, QObject, QEvent, QCoreApplication
+from PySide6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QIcon, QPixmap, QImage
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QComboBox,
     QGroupBox, QFrame, QSlider, QSizePolicy, QMessageBox, QDialog,
-    QRadioButton, QProgressBar
+    QRadioButton, QProgressBar, QCheckBox
 )
+_STARTUP_MARKS.append(("PySide6 import", time.perf_counter_ns()))
 
 # ----- Windows API (ctypes) -----
 import ctypes
@@ -39,13 +53,21 @@ ICON_BASE64 = "iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAABHNCSVQICAgIfAhki
 # ----- XInput API 상수 및 구조체 정의 -----
 _XINPUT_DLLS = ["xinput1_4.dll", "xinput1_3.dll", "xinput9_1_0.dll"]
 class XINPUT_GAMEPAD(ctypes.Structure): _fields_ = [("wButtons", wintypes.WORD),("bLeftTrigger", ctypes.c_ubyte),("bRightTrigger", ctypes.c_ubyte),("sThumbLX", ctypes.c_short),("sThumbLY", ctypes.c_short),("sThumbRX", ctypes.c_short),("sThumbRY", ctypes.c_short),]
-class XINPUT_STATE(ctypes.Structure): _fields_ = [("dwPacketNumber", wintypes.DWORD),("Gamepad", XINPUT_GAMEPAD),]
+# dwPacketNumber는 Windows의 DWORD(32비트)와 같도록 c_uint32로 고정합니다. wintypes.DWORD(c_ulong)는 Linux에서 64비트라 구조체가 24바이트가 되어 16바이트 캡처 레코드와 어긋납니다.
+class XINPUT_STATE(ctypes.Structure): _fields_ = [("dwPacketNumber", ctypes.c_uint32),("Gamepad", XINPUT_GAMEPAD),]
 class XINPUT_VIBRATION(ctypes.Structure): _fields_ = [("wLeftMotorSpeed", wintypes.WORD),("wRightMotorSpeed", wintypes.WORD),]
 class XINPUT_CAPABILITIES(ctypes.Structure): _fields_ = [("Type", ctypes.c_ubyte),("SubType", ctypes.c_ubyte),("Flags", ctypes.c_ushort),("Gamepad", XINPUT_GAMEPAD),("Vibration", XINPUT_VIBRATION),]
 class XINPUT_BATTERY_INFORMATION(ctypes.Structure): _fields_ = [("BatteryType", ctypes.c_ubyte), ("BatteryLevel", ctypes.c_ubyte)]
+class XINPUT_CAPABILITIES_EX(ctypes.Structure): _fields_ = [("Capabilities", XINPUT_CAPABILITIES),("VendorId", wintypes.WORD),("ProductId", wintypes.WORD),("ProductVersion", wintypes.WORD),("unk1", wintypes.WORD),("unk2", wintypes.DWORD),]
 
 XINPUT_GAMEPAD_DPAD_UP, XINPUT_GAMEPAD_DPAD_DOWN, XINPUT_GAMEPAD_DPAD_LEFT, XINPUT_GAMEPAD_DPAD_RIGHT, XINPUT_GAMEPAD_START, XINPUT_GAMEPAD_BACK, XINPUT_GAMEPAD_LEFT_THUMB, XINPUT_GAMEPAD_RIGHT_THUMB, XINPUT_GAMEPAD_LEFT_SHOULDER, XINPUT_GAMEPAD_RIGHT_SHOULDER, XINPUT_GAMEPAD_A, XINPUT_GAMEPAD_B, XINPUT_GAMEPAD_X, XINPUT_GAMEPAD_Y = 0x0001,0x0002,0x0004,0x0008,0x0010,0x0020,0x0040,0x0080,0x0100,0x0200,0x1000,0x2000,0x4000,0x8000
 XINPUT_DEVSUBTYPE_GAMEPAD, XINPUT_DEVSUBTYPE_WHEEL, XINPUT_DEVSUBTYPE_ARCADE_STICK = 0x01, 0x02, 0x03
+# 버튼 이름 → wButtons 비트
+BUTTON_MASKS = {
+    "DPAD_UP": XINPUT_GAMEPAD_DPAD_UP, "DPAD_DOWN": XINPUT_GAMEPAD_DPAD_DOWN, "DPAD_LEFT": XINPUT_GAMEPAD_DPAD_LEFT, "DPAD_RIGHT": XINPUT_GAMEPAD_DPAD_RIGHT,
+    "START": XINPUT_GAMEPAD_START, "BACK": XINPUT_GAMEPAD_BACK, "LTHUMB": XINPUT_GAMEPAD_LEFT_THUMB, "RTHUMB": XINPUT_GAMEPAD_RIGHT_THUMB,
+    "LB": XINPUT_GAMEPAD_LEFT_SHOULDER, "RB": XINPUT_GAMEPAD_RIGHT_SHOULDER, "A": XINPUT_GAMEPAD_A, "B": XINPUT_GAMEPAD_B, "X": XINPUT_GAMEPAD_X, "Y": XINPUT_GAMEPAD_Y,
+}
 _SUBTYPE_NAME = {XINPUT_DEVSUBTYPE_GAMEPAD: "Gamepad", XINPUT_DEVSUBTYPE_WHEEL: "Wheel", XINPUT_DEVSUBTYPE_ARCADE_STICK: "Arcade Stick"}
 BATTERY_TYPE_DISCONNECTED, BATTERY_TYPE_WIRED, BATTERY_TYPE_ALKALINE, BATTERY_TYPE_NIMH, BATTERY_TYPE_UNKNOWN = 0x00, 0x01, 0x02, 0x03, 0xFF
 BATTERY_LEVEL_EMPTY, BATTERY_LEVEL_LOW, BATTERY_LEVEL_MEDIUM, BATTERY_LEVEL_FULL = 0x00, 0x01, 0x02, 0x03
@@ -61,6 +83,13 @@ def normalize_stick_value(value: int) -> float:
         # 음수 범위의 최솟값(-32768)이 -1.0으로 매핑되도록 32768.0으로 나눕니다.
         return value / 32768.0
 
+def parse_duration(text: str) -> float:
+    """'8h', '30m', '90s', '1.5h' 또는 초 단위 숫자를 초로 변환합니다."""
+    text = text.strip().lower(); units = {"h": 3600.0, "m": 60.0, "s": 1.0}
+    value = float(text[:-1]) * units[text[-1]] if text and text[-1] in units else float(text)
+    if value <= 0: raise ValueError(f"측정 시간은 0보다 커야 합니다: {text}")
+    return value
+
 def compute_polling_stats(intervals_ns: List[int]) -> dict:
     """
     주어진 시간 간격 리스트(나노초 단위)로부터 폴링 관련 통계치를 계산합니다.
@@ -84,29 +113,420 @@ def compute_polling_stats(intervals_ns: List[int]) -> dict:
         "stability_pct": stability,
     }
 
-def get_gamepad_names_from_pygame() -> dict[int, str]:
+class _SlidingMedian:
+    """지연 삭제(lazy deletion)를 사용하는 두 힙 기반 중앙값. 추가/삭제 O(log n), 조회 O(1)."""
+    def __init__(self):
+        self.lo: List[int] = []  # 작은 절반 (부호 반전 최대 힙)
+        self.hi: List[int] = []  # 큰 절반 (최소 힙)
+        self.lo_size = 0; self.hi_size = 0 # 삭제 예정 항목을 제외한 실제 크기
+        self.delayed: dict = {}
+
+    def _prune(self, heap: List[int], sign: int):
+        while heap:
+            v = sign * heap[0]; c = self.delayed.get(v)
+            if not c: break
+            if c == 1: del self.delayed[v]
+            else: self.delayed[v] = c - 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        if self.lo_size > self.hi_size + 1:
+            heapq.heappush(self.hi, -heapq.heappop(self.lo)); self.lo_size -= 1; self.hi_size += 1; self._prune(self.lo, -1)
+        elif self.lo_size < self.hi_size:
+            heapq.heappush(self.lo, -heapq.heappop(self.hi)); self.hi_size -= 1; self.lo_size += 1; self._prune(self.hi, 1)
+
+    def add(self, v: int):
+        if not self.lo or v <= -self.lo[0]: heapq.heappush(self.lo, -v); self.lo_size += 1
+        else: heapq.heappush(self.hi, v); self.hi_size += 1
+        self._balance()
+
+    def remove(self, v: int):
+        self.delayed[v] = self.delayed.get(v, 0) + 1
+        if self.lo and v <= -self.lo[0]:
+            self.lo_size -= 1
+            if v == -self.lo[0]: self._prune(self.lo, -1)
+        else:
+            self.hi_size -= 1
+            if self.hi and v == self.hi[0]: self._prune(self.hi, 1)
+        self._balance()
+        if len(self.lo) + len(self.hi) > 2 * (self.lo_size + self.hi_size) + 64: self._compact()
+
+    def _compact(self):
+        """힙 안쪽에 쌓인 삭제 예정 항목을 걸러 힙을 다시 만듭니다. 장시간 슬라이딩 윈도우에서도 메모리가 윈도우 크기에 비례하도록 합니다."""
+        delayed = self.delayed
+        def live(heap: List[int], sign: int) -> List[int]:
+            out = []
+            for x in heap:
+                c = delayed.get(sign * x)
+                if not c: out.append(x)
+                elif c == 1: del delayed[sign * x]
+                else: delayed[sign * x] = c - 1
+            heapq.heapify(out); return out
+        self.lo = live(self.lo, -1); self.hi = live(self.hi, 1); self.lo_size = len(self.lo); self.hi_size = len(self.hi) # 같은 값은 어느 쪽 힙에서 지워도 중앙값이 같음
+        while self.lo_size > self.hi_size + 1 or self.lo_size < self.hi_size: self._balance()
+
+    def clear(self):
+        """모든 값을 지웁니다. 힙과 삭제 예정 목록은 제자리에서 비웁니다."""
+        self.lo.clear(); self.hi.clear(); self.delayed.clear(); self.lo_size = 0; self.hi_size = 0
+
+    def median(self) -> float:
+        if self.lo_size > self.hi_size: return float(-self.lo[0])
+        return (-self.lo[0] + self.hi[0]) / 2.0
+
+class StreamingPollingStats:
     """
-    Pygame 라이브러리를 이용해 연결된 조이스틱의 제품명을 조회합니다.
-    - XInput 인덱스와 Pygame 조이스틱 인덱스가 일치한다고 가정합니다.
-    - 매 호출 시 Pygame을 초기화/종료하여 장치 목록의 최신 상태를 반영합니다.
+    compute_polling_stats와 동일한 항목을 샘플 단위로 증분 갱신하는 통계 엔진.
+    - 평균/분산: Welford 알고리즘 (추가/삭제 O(1))
+    - 중앙값: 두 힙 기반 슬라이딩 중앙값 (O(log n))
+    - 안정도(±2σ 비율): 1µs 단위 펜윅 트리 히스토그램의 구간 합 (O(log B)), 경계 오차는 1µs 이내
+    - snapshot()은 샘플 수와 무관하게 상수 시간에 끝납니다.
     """
-    names = {}
-    try:
-        import pygame
-        pygame.init()
-        pygame.joystick.init()
-        for i in range(pygame.joystick.get_count()):
-            names[i] = pygame.joystick.Joystick(i).get_name()
-        pygame.joystick.quit()
-        pygame.quit()
-    except Exception as e:
-        print(f"Pygame으로 장치명 로딩 실패: {e}")
-    return names
+    BIN_NS = 1000      # 히스토그램 해상도 (1µs)
+    BINS = 1 << 17     # 약 131ms까지 구분, 그 이상은 마지막 구간으로 집계
 
+    def __init__(self):
+        self.n = 0; self._mean = 0.0; self._m2 = 0.0
+        self._median = _SlidingMedian()
+        self._tree = array("i", bytes(4 * (self.BINS + 1)))
+
+    def _reset(self):
+        """값이 하나도 없는 상태로 되돌립니다. 중앙값 힙과 히스토그램은 다시 만들지 않고 제자리에서 비웁니다."""
+        self.n = 0; self._mean = 0.0; self._m2 = 0.0
+        self._median.clear()
+        ctypes.memset(self._tree.buffer_info()[0], 0, len(self._tree) * self._tree.itemsize)
+
+    def _bin(self, value_ns: int) -> int: return min(value_ns // self.BIN_NS, self.BINS - 1)
+
+    def _tree_add(self, i: int, delta: int):
+        i += 1; tree = self._tree; size = self.BINS
+        while i <= size: tree[i] += delta; i += i & -i
+
+    def _tree_prefix(self, i: int) -> int:
+        """구간 0..i의 누적 개수."""
+        i = min(i, self.BINS - 1) + 1; total = 0; tree = self._tree
+        while i > 0: total += tree[i]; i -= i & -i
+        return total
+
+    def add(self, value_ns: int):
+        x = value_ns / 1_000_000.0
+        self.n += 1; d = x - self._mean; self._mean += d / self.n; self._m2 += d * (x - self._mean)
+        self._median.add(value_ns); self._tree_add(self._bin(value_ns), 1)
+
+    def remove(self, value_ns: int):
+        """슬라이딩 윈도우에서 밀려난 값을 제거합니다."""
+        if self.n <= 1: self._reset(); return
+        x = value_ns / 1_000_000.0
+        old_mean = self._mean; self.n -= 1; self._mean = (old_mean * (self.n + 1) - x) / self.n
+        self._m2 = max(0.0, self._m2 - (x - old_mean) * (x - self._mean))
+        self._median.remove(value_ns); self._tree_add(self._bin(value_ns), -1)
+
+    def snapshot(self) -> dict:
+        n = self.n
+        if n < 10: return {"samples": n}
+        mu = self._mean
+        sigma = math.sqrt(self._m2 / (n - 1))
+        low_ns, high_ns = (mu - 2 * sigma) * 1_000_000.0, (mu + 2 * sigma) * 1_000_000.0
+        inside = self._tree_prefix(int(high_ns // self.BIN_NS)) - (self._tree_prefix(int(low_ns // self.BIN_NS) - 1) if low_ns >= self.BIN_NS else 0)
+        med = self._median.median() / 1_000_000.0
+        return {
+            "samples": n, "mean_ms": mu, "median_ms": med,
+            "mean_hz": 1000.0 / mu if mu > 0 else 0,
+            "median_hz": 1000.0 / med if med > 0 else 0,
+            "stability_pct": inside / n * 100.0, "stdev_ms": sigma,
+        }
+
+class IntervalPlotFeed:
+    """
+    실시간 간격 그래프용 요약. 분석 스레드가 간격마다 add()하고, GUI는 snapshot()의 고정 크기 결과만 그립니다.
+    - 타임라인: 측정 전체를 최대 COLUMNS개 버킷의 (최소, 최대)로 유지합니다. 버킷이 모두 차면 이웃 버킷을 합치고 버킷 폭을 두 배로 늘립니다 (min/max 데시메이션).
+      최소/최대를 보존하므로 단발성 지연(스파이크)이 평균에 묻히지 않으며, 메모리와 그리기 비용은 샘플 수(1천~1천만)와 무관합니다.
+    - 히스토그램: 최근 HIST_WINDOW개 간격을 로그 구간(0.05~50ms)으로 집계합니다 (추가/제거 O(1)).
+    """
+    COLUMNS = 512
+    HIST_WINDOW = 4096
+    HIST_LOG_MIN, HIST_DECADES, HIST_PER_DECADE = -1.3, 3, 20 # log10(약 0.05ms)부터 3자릿수, 자릿수당 20구간 (1ms·10ms가 구간 경계)
+
+    def __init__(self):
+        self.span = 1; self._fill = 0 # 버킷당 샘플 수, 현재 버킷에 들어간 수
+        self.mins: List[int] = []; self.maxs: List[int] = []
+        self.hist = [0] * (self.HIST_DECADES * self.HIST_PER_DECADE)
+        self._window: Deque[int] = deque(maxlen=self.HIST_WINDOW)
+        self._inner_edges_ns = [int(ms * 1_000_000) for ms in self.hist_edges_ms()[1:-1]] # 구간 경계 (bisect용, 양 끝 구간은 범위 밖 값 포함)
+        self.count = 0
+
+    def _merge(self):
+        mins, maxs = self.mins, self.maxs
+        self.mins = [min(mins[i], mins[i + 1]) for i in range(0, len(mins), 2)]; self.maxs = [max(maxs[i], maxs[i + 1]) for i in range(0, len(maxs), 2)]
+        self.span *= 2
+
+    def hist_bin(self, value_ns: int) -> int: return bisect.bisect_right(self._inner_edges_ns, value_ns)
+
+    def add(self, value_ns: int):
+        if self._fill == 0:
+            if len(self.mins) == self.COLUMNS: self._merge()
+            self.mins.append(value_ns); self.maxs.append(value_ns)
+        elif value_ns < self.mins[-1]: self.mins[-1] = value_ns
+        elif value_ns > self.maxs[-1]: self.maxs[-1] = value_ns
+        self._fill += 1
+        if self._fill == self.span: self._fill = 0
+        b = bisect.bisect_right(self._inner_edges_ns, value_ns); hist = self.hist; window = self._window
+        if len(window) == self.HIST_WINDOW: hist[window[0]] -= 1
+        window.append(b); hist[b] += 1; self.count += 1
+
+    def hist_edges_ms(self) -> List[float]:
+        return [10 ** (self.HIST_LOG_MIN + i / self.HIST_PER_DECADE) for i in range(len(self.hist) + 1)]
+
+    def snapshot(self) -> dict:
+        """GUI로 넘길 고정 크기 사본 (타임라인 열 ≤ COLUMNS, 히스토그램 구간 고정)."""
+        return {"count": self.count, "span": self.span, "mins": tuple(self.mins), "maxs": tuple(self.maxs), "hist": tuple(self.hist)}
+
+SOAK_DURATIONS = {"내구 10분": 600, "내구 1시간": 3600, "내구 8시간": 8 * 3600} # GUI 샘플 수 목록의 내구 측정 항목 (초)
+
+class SoakAggregator:
+    """
+    내구(장시간) 측정용 구간 집계기. 분석 스레드가 간격마다 add()합니다.
+    - 시간축은 간격의 누적 합(첫 입력 변화 이후 경과 시간)입니다. 1초 구간마다 (입력 수, 안정도, 최대 간격, 연결 끊김 수)를 계산하고, 60개를 묶어 1분 구간을 만듭니다.
+    - 원본 간격은 현재 1초 구간의 것만 모았다가 비우고, 초 구간은 최근 SECONDS_KEPT개, 분 구간은 최근 MINUTES_KEPT개만 유지하므로 메모리는 측정 시간과 무관합니다.
+    - log_path를 지정하면 분 구간이 닫힐 때마다 CSV 한 줄을 덧붙여, 측정 도중에도 추이를 확인할 수 있습니다.
+    """
+    SECOND_NS = 1_000_000_000
+    SECONDS_KEPT, MINUTES_KEPT = 3600, 24 * 60
+    DRIFT_MINUTES = 10 # 초기/최근 폴링레이트 비교 구간 (열화 확인용)
+    CSV_HEADER = "minute,samples,rate_hz,stability_pct,max_gap_ms,disconnects\n"
+
+    def __init__(self, log_path: Optional[str] = None, on_minute: Optional[Callable[[tuple], None]] = None):
+        self.seconds: Deque[tuple] = deque(maxlen=self.SECONDS_KEPT) # (초, 입력 수, 안정도 또는 None, 최대 간격 ns, 연결 끊김)
+        self.minutes: Deque[tuple] = deque(maxlen=self.MINUTES_KEPT) # (분, 입력 수, Hz, 안정도 또는 None, 최대 간격 ns, 연결 끊김)
+        self._values = array("q"); self._minute: List[tuple] = []
+        self._elapsed_ns = 0; self._window_end_ns = self.SECOND_NS
+        self._disconnects_seen = 0; self._window_disconnects = 0
+        self.seconds_closed = 0; self.total_samples = 0; self.max_gap_ns = 0; self.total_disconnects = 0
+        self._stab_sum = 0.0; self._stab_n = 0
+        self.worst_minute: Optional[tuple] = None; self.first_rates: List[float] = []
+        self.log_path = log_path; self.on_minute = on_minute
+        self._log = None
+        if log_path: self._log = open(log_path, "w", encoding="utf-8", buffering=1); self._log.write(self.CSV_HEADER) # 줄 단위로 기록
+
+    def note_disconnects(self, total: int):
+        """수집 스레드의 누적 연결 끊김 수를 반영합니다. 새로 끊긴 횟수는 현재 구간에 집계합니다."""
+        if total != self._disconnects_seen: self._window_disconnects += total - self._disconnects_seen; self._disconnects_seen = total
+
+    def add(self, value_ns: int):
+        t = self._elapsed_ns + value_ns
+        while t > self._window_end_ns: self._close_second() # 긴 공백은 빈 구간으로 채움 (공백 자체는 끝나는 구간의 최대 간격)
+        self._elapsed_ns = t; self._values.append(value_ns)
+
+    def _close_second(self):
+        vals = self._values; n = len(vals); stability = None; max_gap = max(vals) if n else 0
+        if n >= 2:
+            mu = sum(vals) / n; limit = 2 * math.sqrt(sum((v - mu) ** 2 for v in vals) / (n - 1))
+            stability = sum(1 for v in vals if abs(v - mu) <= limit) / n * 100.0
+            self._stab_sum += stability * n; self._stab_n += n
+        row = (self.seconds_closed, n, stability, max_gap, self._window_disconnects)
+        self.seconds.append(row); self._minute.append(row)
+        self.seconds_closed += 1; self.total_samples += n; self.total_disconnects += self._window_disconnects
+        if max_gap > self.max_gap_ns: self.max_gap_ns = max_gap
+        self._values = array("q"); self._window_disconnects = 0; self._window_end_ns += self.SECOND_NS
+        if len(self._minute) == 60: self._close_minute()
+
+    def _close_minute(self):
+        rows = self._minute; self._minute = []
+        if not rows: return
+        samples = sum(r[1] for r in rows); weighted = [(r[2], r[1]) for r in rows if r[2] is not None]
+        stab_n = sum(n for _, n in weighted)
+        row = (len(self.minutes) and self.minutes[-1][0] + 1, samples, samples / len(rows), sum(st * n for st, n in weighted) / stab_n if stab_n else None, max(r[3] for r in rows), sum(r[4] for r in rows))
+        self.minutes.append(row)
+        if len(self.first_rates) < self.DRIFT_MINUTES: self.first_rates.append(row[2])
+        if self.worst_minute is None or row[2] < self.worst_minute[2]: self.worst_minute = row
+        if self._log is not None: self._log.write(f"{row[0] + 1},{row[1]},{row[2]:.2f},{'' if row[3] is None else f'{row[3]:.2f}'},{row[4] / 1e6:.4f},{row[5]}\n")
+        if self.on_minute is not None: self.on_minute(row)
+
+    def finish(self):
+        """측정 종료 시 진행 중이던 초/분 구간을 닫고 기록 파일을 닫습니다."""
+        if self._values or self._window_disconnects: self._close_second()
+        self._close_minute()
+        if self._log is not None: self._log.close(); self._log = None
+
+    def summary(self) -> dict:
+        recent = [r[2] for r in list(self.minutes)[-self.DRIFT_MINUTES:]]
+        first_hz = sum(self.first_rates) / len(self.first_rates) if self.first_rates else 0.0; last_hz = sum(recent) / len(recent) if recent else 0.0
+        return {"seconds": self.seconds_closed, "samples": self.total_samples, "rate_hz": self.total_samples / self.seconds_closed if self.seconds_closed else 0.0,
+                "stability_pct": self._stab_sum / self._stab_n if self._stab_n else None, "max_gap_ms": self.max_gap_ns / 1e6, "disconnects": self.total_disconnects,
+                "worst_minute": self.worst_minute, "drift_pct": (last_hz - first_hz) / first_hz * 100.0 if first_hz and len(self.minutes) > self.DRIFT_MINUTES else None}
+
+    def snapshot(self) -> dict:
+        """GUI 표시용: 최근 1초/1분 구간과 누적 값."""
+        last_second = self.seconds[-1] if self.seconds else None; last_minute = self.minutes[-1] if self.minutes else None
+        return {"soak_seconds": self.seconds_closed, "soak_second_hz": last_second[1] if last_second else 0, "soak_minute_hz": last_minute[2] if last_minute else None,
+                "soak_max_gap_ms": self.max_gap_ns / 1e6, "soak_disconnects": self.total_disconnects + self._window_disconnects}
+
+def benchmark_stats(sizes: Tuple[int, ...] = (1_000, 10_000, 100_000, 1_000_000), seed: int = 0):
+    """
+    compute_polling_stats(일괄 재계산)와 StreamingPollingStats(증분 갱신)의 비용을 비교 출력합니다.
+    - 일괄: 스냅샷 1회당 전체 재계산 시간
+    - 증분: 샘플 1개당 갱신 시간과 스냅샷 1회 시간
+    """
+    rng = random.Random(seed)
+    print(f"{'samples':>10} | {'batch/snapshot':>15} | {'stream/sample':>14} | {'stream/snapshot':>16} | {'max diff':>9}")
+    for n in sizes:
+        data = [1_000_000 + int(rng.gauss(0, 30_000)) + (4_000_000 if rng.random() < 0.01 else 0) for _ in range(n)]
+        t0 = time.perf_counter(); batch = compute_polling_stats(data); t_batch = time.perf_counter() - t0
+        st = StreamingPollingStats()
+        t0 = time.perf_counter()
+        for v in data: st.add(v)
+        t_update = time.perf_counter() - t0
+        reps = 1000; t0 = time.perf_counter()
+        for _ in range(reps): snap = st.snapshot()
+        t_snap = (time.perf_counter() - t0) / reps
+        diff = max(abs(batch[k] - snap[k]) for k in batch if k != "samples")
+        print(f"{n:>10,} | {t_batch * 1e3:>12.2f} ms | {t_update / n * 1e6:>11.2f} µs | {t_snap * 1e6:>13.2f} µs | {diff:>9.4f}")
+
+REPORT_PERCENTILES = (1.0, 5.0, 95.0, 99.0, 99.9)
+STORE_QUANTILES = tuple(float(q) for q in range(101)) # 결과 저장소에 남기는 분위수 (원본 없이 분포 비교용)
+REPORT_CHUNK = 1 << 16 # 원본 데이터 일괄 기록 단위 (줄 수)
+
+def _percentile_sorted(values: List[float], q: float) -> float:
+    """정렬된 리스트의 백분위수 (NumPy 기본값과 같은 선형 보간)."""
+    pos = (len(values) - 1) * q / 100.0; lo = int(pos); hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+def analyze_intervals(intervals_ns, bins: int = 40) -> dict:
+    """
+    최종 리포트용 전체 분석. compute_polling_stats의 요약에 분포 정보를 더합니다.
+    - 추가 항목: min/max/stdev(ms), 백분위수(p1/p5/p95/p99/p99.9), 히스토그램(구간 경계, 개수), ±2σ 밖 이상치 인덱스,
+      중앙값의 95% 신뢰 구간(순서 통계량: 중앙 순위 ± 1.96·√n/2), 결과 저장소용 0~100 분위수(quantiles_ms)
+    - NumPy가 있으면 몇 번의 벡터화 연산으로, 없으면 순수 Python으로 같은 결과를 계산합니다.
+    - intervals_ns에는 리스트, array, ndarray를 모두 전달할 수 있습니다.
+    """
+    n = len(intervals_ns)
+    if n < 10: return {"samples": n}
+    ci_q = (max(0.0, 50.0 - 98.0 / math.sqrt(n)), min(100.0, 50.0 + 98.0 / math.sqrt(n))) # 중앙값 신뢰 구간의 백분위 위치
+    np = _optional_numpy()
+    if np is not None:
+        ms = np.asarray(intervals_ns, dtype=np.int64) / 1_000_000.0
+        mu = float(ms.mean()); sigma = float(ms.std(ddof=1)); med = float(np.median(ms))
+        inside = (ms >= mu - 2 * sigma) & (ms <= mu + 2 * sigma)
+        pcts = np.percentile(ms, REPORT_PERCENTILES + ci_q + STORE_QUANTILES); k = len(REPORT_PERCENTILES)
+        counts, edges = np.histogram(ms, bins=bins)
+        result = {"min_ms": float(ms.min()), "max_ms": float(ms.max()), "stability_pct": float(np.count_nonzero(inside)) / n * 100.0,
+                  "percentiles_ms": dict(zip(REPORT_PERCENTILES, pcts[:k].tolist())), "median_ci_ms": tuple(pcts[k:k + 2].tolist()), "quantiles_ms": pcts[k + 2:].tolist(),
+                  "histogram": (edges.tolist(), counts.tolist()), "outliers": np.flatnonzero(~inside).tolist()}
+    else:
+        ms = [x / 1_000_000.0 for x in intervals_ns]
+        mu = mean(ms); sigma = stdev(ms); ordered = sorted(ms); med = _percentile_sorted(ordered, 50.0)
+        low, high = mu - 2 * sigma, mu + 2 * sigma
+        outliers = [i for i, v in enumerate(ms) if not low <= v <= high]
+        lo_v, hi_v = ordered[0], ordered[-1]; width = (hi_v - lo_v) / bins or 1.0
+        counts = [0] * bins
+        for v in ms: counts[min(int((v - lo_v) / width), bins - 1)] += 1
+        result = {"min_ms": lo_v, "max_ms": hi_v, "stability_pct": (n - len(outliers)) / n * 100.0,
+                  "percentiles_ms": {q: _percentile_sorted(ordered, q) for q in REPORT_PERCENTILES}, "median_ci_ms": tuple(_percentile_sorted(ordered, q) for q in ci_q),
+                  "quantiles_ms": [_percentile_sorted(ordered, q) for q in STORE_QUANTILES],
+                  "histogram": ([lo_v + i * width for i in range(bins + 1)], counts), "outliers": outliers}
+    result.update({"samples": n, "mean_ms": mu, "median_ms": med, "stdev_ms": sigma,
+                   "mean_hz": 1000.0 / mu if mu > 0 else 0, "median_hz": 1000.0 / med if med > 0 else 0})
+    return result
+
+def format_interval_lines(intervals_ns) -> str:
+    """원본 간격(ns)을 리포트용 ms 텍스트(줄당 하나)로 일괄 변환합니다."""
+    np = _optional_numpy()
+    ms = (np.asarray(intervals_ns, dtype=np.int64) / 1_000_000.0).tolist() if np is not None else [x / 1_000_000.0 for x in intervals_ns]
+    return "\n".join(map("{:.4f}".format, ms)) + ("\n" if ms else "")
+
+def format_fidelity_lines(sampler: dict) -> List[str]:
+    """고정밀 측정(FidelityWindow)에서 적용된 설정과 실패한 설정을 리포트 줄로 만듭니다."""
+    if "fidelity" not in sampler: return []
+    if not sampler["fidelity"]: return ["  High Fidelity: off\n"]
+    lines = [f"  High Fidelity: {', '.join(sampler.get('fidelity_applied') or ()) or 'nothing applied'}\n"]
+    if sampler.get("fidelity_failed"): lines.append(f"  High Fidelity Failures: {'; '.join(sampler['fidelity_failed'])}\n")
+    return lines
+
+def write_text_report(path: str, data_ns, device: str, sampler: Optional[dict] = None) -> dict:
+    """측정 결과를 요약, 분포, 원본 데이터를 포함한 텍스트 리포트로 저장하고 분석 결과를 반환합니다."""
+    stats = analyze_intervals(data_ns)
+    out = ["Gamepad Polling Rate Test Report\n" + "="*40 + "\n", f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", f"Device: {device}\n" + "="*40 + "\n\n"]
+    out += ["[Summary]\n", f"  Average Rate: {stats.get('mean_hz', 0):.2f} Hz\n", f"  Median Rate: {stats.get('median_hz', 0):.2f} Hz\n", f"  Average Interval: {stats.get('mean_ms', 0):.3f} ms\n"]
+    out += [f"  Median Interval: {stats.get('median_ms', 0):.3f} ms\n", f"  Stability: {stats.get('stability_pct', 0):.1f}%\n", f"  Total Samples: {len(data_ns):,}\n\n"]
+    if "percentiles_ms" in stats:
+        out += ["[Distribution (ms)]\n", f"  Min / Max: {stats['min_ms']:.4f} / {stats['max_ms']:.4f}\n", f"  Std Dev: {stats['stdev_ms']:.4f}\n"]
+        out += [f"  P{q:g}: {v:.4f}\n" for q, v in stats["percentiles_ms"].items()]
+        outliers = stats["outliers"]
+        out.append(f"  Outliers (outside ±2σ): {len(outliers):,}" + (f" (first indices: {', '.join(map(str, outliers[:20]))})" if outliers else "") + "\n\n")
+        edges, counts = stats["histogram"]
+        out.append("[Histogram (ms)]\n"); out += [f"  {edges[i]:.4f} - {edges[i + 1]:.4f}: {c:,}\n" for i, c in enumerate(counts) if c]; out.append("\n")
+    if sampler:
+        out += ["[Sampler]\n", f"  Strategy: {sampler.get('sampler')}\n", f"  Loop Period: {sampler.get('loop_us') or 0:.2f} us\n", f"  Sampler CPU: {sampler.get('cpu_pct') or 0:.1f}%\n"]
+        out += [f"  Timer Floor: {sampler.get('timer_floor_us', 0):.1f} us\n", f"  Clock Resolution: {sampler.get('clock_res_ns', 0)} ns\n"]
+        keepup = sampler_keepup(stats, sampler)
+        if keepup is not None: out.append(f"  Poll Rate: {sampler['poll_hz']:.1f} Hz ({keepup:.2f}x device rate)\n")
+        if "packets_seen" in sampler: out.append(f"  Missed Packets: {sampler.get('packets_missed', 0):,} ({sampler.get('missed_pct', 0):.2f}%)\n")
+        if "call_us" in sampler:
+            out.append(f"  Calibration: get_state {sampler['call_us']:.2f} us median / {sampler['call_p99_us']:.2f} us P99, spin loop {sampler['cal_loop_us']:.2f} us median / "
+                       f"{sampler['cal_loop_p99_us']:.2f} us P99 / {sampler['cal_stall_us']:.1f} us max stall ({sampler['cal_loops']:,} loops)\n")
+            if sampler.get("cal_poll_hz") and stats.get("median_hz"):
+                ceiling_x = sampler["cal_poll_hz"] / stats["median_hz"]
+                out.append(f"  Spin Ceiling: {sampler['cal_poll_hz']:,.0f} Hz ({ceiling_x:.2f}x device rate)\n")
+                if ceiling_x < KEEPUP_MIN_X: out.append(f"  WARNING: even spin polling on this PC is below {KEEPUP_MIN_X:g}x the device rate; this device cannot be measured reliably here.\n")
+        if is_undersampled(stats, sampler): out.append("  WARNING: sampler did not keep up with the device; intervals are undersampled.\n")
+        if has_missed_packets(sampler):
+            out.append(f"  WARNING: {sampler['missed_pct']:.2f}% of packets were never observed (packet number gaps above {MISSED_MAX_PCT:g}%); "
+                       "intervals spanning them are merged. Usually caused by capture-thread stalls rather than the poll rate.\n")
+        out.append("\n")
+        conf = measurement_confidence(stats, sampler)
+        if conf:
+            lo, hi = conf["mean_hz_ci"]; out += ["[Confidence (95%)]\n", f"  Average Rate: {stats['mean_hz']:.2f} Hz ({lo:.2f} - {hi:.2f})\n"]
+            if "median_hz_ci" in conf: lo, hi = conf["median_hz_ci"]; out.append(f"  Median Rate: {stats['median_hz']:.2f} Hz ({lo:.2f} - {hi:.2f})\n")
+            out.append(f"  Per-Interval Resolution: ±{conf['resolution_ms']:.4f} ms ({'sampler poll period' if sampler.get('poll_hz') else 'clock resolution'})\n")
+            out.append(f"  Sampler Share of Interval Variance: {conf['sampler_noise_pct']:.1f}%\n")
+            if conf["sampler_limited"]: out.append("  WARNING: interval jitter mostly reflects the sampler's timing, not the device; read stability and std dev as upper bounds.\n")
+            out.append("\n")
+        out += ["[Pipeline]\n", f"  Capture Loop Max: {sampler.get('loop_max_us', 0):.1f} us\n"]
+        if "gc_mode" in sampler: out.append(f"  Garbage Collector: {sampler['gc_mode']} ({sampler.get('gc_collections', 0):,} collections during capture, {sampler.get('gc_frozen', 0):,} objects frozen)\n")
+        out += format_fidelity_lines(sampler)
+        out.append(f"  Analysis Pass: {sampler.get('analysis_pass_us', 0):.1f} us avg / {sampler.get('analysis_max_us', 0):.1f} us max ({sampler.get('analysis_passes', 0)} passes, {sampler.get('analysis_lost', 0)} lost)\n")
+        out.append(f"  GUI Pull: {sampler.get('gui_pull_us', 0):.1f} us avg\n")
+        if "gui_driver_calls" in sampler:
+            out.append(f"  GUI State Reads: {sampler['gui_driver_calls']:,} driver / {sampler.get('gui_cache_hits', 0):,} cached / {sampler.get('gui_shared_reads', 0):,} from capture\n")
+        if "info_saved_per_min" in sampler: out.append(f"  Battery/Caps Cache: {sampler['info_saved_per_min']:,.0f} driver calls saved per minute\n")
+        if "ui_tick_hz" in sampler:
+            out.append(f"  GUI Refresh: {sampler['ui_tick_hz']:.1f} Hz display / {sampler.get('ui_connection_hz', 0):.2f} Hz hotplug ticks, "
+                       f"{sampler.get('ui_tick_us', 0):.1f} us avg / {sampler.get('ui_tick_max_us', 0):.1f} us max per display tick, "
+                       f"{sampler.get('ui_connection_us', 0):.1f} us avg per hotplug tick "
+                       f"(last mode {sampler.get('ui_mode', '')}, {sampler.get('ui_interval_ms', 0)} ms interval)\n")
+        out.append("\n")
+    out.append("[Raw Interval Data (ms)]\n")
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("".join(out))
+        # 원본 데이터는 일정 크기 단위로 변환해 써서 대용량 캡처에서도 메모리 사용량을 제한합니다.
+        for i in range(0, len(data_ns), REPORT_CHUNK): f.write(format_interval_lines(data_ns[i:i + REPORT_CHUNK]))
+    return stats
+
+def _sdl_guid_vid_pid(guid: str) -> Optional[Tuple[int, int]]:
+    """SDL 조이스틱 GUID 문자열에서 (VID, PID)를 추출합니다. GUID에 USB ID가 없으면 None."""
+    if len(guid) != 32 or guid[12:16] != "0000" or guid[20:24] != "0000": return None
+    try: vid, pid = int(guid[10:12] + guid[8:10], 16), int(guid[18:20] + guid[16:18], 16)
+    except ValueError: return None
+    return (vid, pid) if vid else None
+
+def startup_mark(label: str): _STARTUP_MARKS.append((label, time.perf_counter_ns()))
+
+def format_startup_profile() -> str:
+    """시작 단계별 소요 시간을 표 형태의 문자열로 반환합니다."""
+    t0 = prev = _STARTUP_MARKS[0][1]; lines = ["[시작 프로파일]"]
+    for label, t in _STARTUP_MARKS[1:]:
+        lines.append(f"  {(t - prev) / 1e6:8.1f} ms  (누적 {(t - t0) / 1e6:8.1f} ms)  {label}"); prev = t
+    return "\n".join(lines)
+
+def open_url(url: str):
+    import webbrowser
+    webbrowser.open(url)
+
+@functools.lru_cache(maxsize=1)
 def _load_app_pixmap() -> Optional[QPixmap]:
-    """Base64로 인코딩된 아이콘 데이터를 QPixmap 객체로 로드합니다."""
+    """Base64로 인코딩된 아이콘 데이터를 QPixmap 객체로 로드합니다. 한 번만 디코딩하여 재사용합니다."""
     if ICON_BASE64 == "...": return None
     try:
+        import base64
         icon_data = base64.b64decode(ICON_BASE64)
         pixmap = QPixmap()
         pixmap.loadFromData(icon_data)
@@ -117,16 +537,77 @@ def _load_app_pixmap() -> Optional[QPixmap]:
 
 # --- 핵심 로직 클래스 ---
 
-class XInput:
+class StateBuffer:
+    """
+    미리 할당한 XINPUT_STATE 하나와 그 위의 고정 참조/뷰. 수집 루프는 이 버퍼를 재사용하여 폴링마다 객체를 만들지 않습니다.
+    - ref: 드라이버 호출에 그대로 넘기는 byref 참조 (매 호출마다 byref를 만들지 않음)
+    - packet / gamepad: 패킷 번호(4바이트)와 게임패드 값(12바이트)의 memoryview. 뷰끼리의 비교는 할당 없이 memcmp로 끝납니다.
+    """
+    __slots__ = ("state", "ref", "raw", "packet", "gamepad")
+
+    def __init__(self):
+        self.state = XINPUT_STATE(); self.ref = ctypes.byref(self.state)
+        self.raw = memoryview(self.state).cast("B"); self.packet = self.raw[:4]; self.gamepad = self.raw[4:]
+
+class InputBackend:
+    """
+    입력 장치 백엔드의 공통 인터페이스.
+    - 모든 백엔드는 XInput과 동일한 (결과 코드, XINPUT_STATE) 형태로 상태를 반환합니다.
+    - 측정 엔진과 UI는 이 인터페이스만 사용하므로 실제 드라이버 없이도 동작할 수 있습니다.
+    """
+    name = "base"
+    max_devices = 4
+    kernel_timestamps = False # True이면 read_packets()가 커널 타임스탬프가 붙은 패킷 목록을 제공
+    supports_wait = False     # True이면 wait_packets()로 새 패킷을 차단 대기할 수 있음
+
+    def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]: raise NotImplementedError
+    def get_state_into(self, idx: int, buf: StateBuffer) -> int:
+        """상태를 호출자의 버퍼에 읽고 결과 코드만 반환합니다. 할당 없는 구현은 백엔드가 재정의합니다."""
+        res, state = self.get_state(idx)
+        if res == ERROR_SUCCESS: buf.raw[:] = memoryview(state).cast("B")
+        return res
+    def read_packets(self, idx: int) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        """마지막 호출 이후 도착한 (타임스탬프 ns, 상태) 패킷 목록을 반환합니다. kernel_timestamps 백엔드 전용."""
+        raise NotImplementedError
+    def discard_packets(self, idx: int) -> None:
+        """측정 시작 전에 쌓인 실시간 패킷을 버립니다. kernel_timestamps 백엔드 전용."""
+        pass
+    def wait_packets(self, idx: int, timeout_s: float) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        """
+        새 패킷이 도착하거나 timeout_s가 지날 때까지 대기한 뒤 (타임스탬프 ns, 상태) 목록을 반환합니다. supports_wait 백엔드 전용.
+        - 타임스탬프는 백엔드가 알고 있는 실제 패킷 도착 시각이어야 합니다 (커널 시각, 시뮬레이션 예정 시각 등).
+        """
+        raise NotImplementedError
+    def stream_ended(self, idx: int) -> bool:
+        """끝이 있는 패킷 스트림(녹화 파일, 캡처 재생)을 모두 전달했으면 True. 측정 스레드는 이때 목표 샘플 수 전이라도 정상 종료합니다."""
+        return False
+    def set_vibration(self, idx: int, left: int, right: int) -> bool: return False
+    def get_capabilities(self, idx: int) -> Optional[XINPUT_CAPABILITIES]: return None
+    def get_battery_info(self, idx: int) -> Optional[dict]: return None
+    def get_device_ids(self, idx: int) -> Optional[Tuple[int, int]]:
+        """장치의 USB (VID, PID). 알 수 없으면 None."""
+        return None
+    def get_device_name(self, idx: int) -> Optional[str]:
+        """백엔드가 직접 알고 있는 제품명. 없으면 None (이름 확인 서비스가 Pygame으로 조회)."""
+        return None
+    def close(self) -> None: pass
+
+class XInput(InputBackend):
     """XInput API와 상호작용하기 위한 저수준 ctypes 래퍼 클래스."""
+    name = "xinput"
+
     def __init__(self) -> None:
         self.lib = None; last_err: Optional[Exception] = None
+        win_dll = getattr(ctypes, "WinDLL", None)
+        if win_dll is None: raise OSError("XInput은 Windows에서만 사용할 수 있습니다.")
         for name in _XINPUT_DLLS:
-            try: self.lib = ctypes.WinDLL(name); break
+            try: self.lib = win_dll(name); break
             except OSError as e: last_err = e; continue
         if self.lib is None: raise OSError(f"XInput DLL을 찾을 수 없습니다: {_XINPUT_DLLS} / 마지막 오류: {last_err}")
         
         self.XInputGetState = self.lib.XInputGetState; self.XInputGetState.argtypes = [wintypes.DWORD, ctypes.POINTER(XINPUT_STATE)]; self.XInputGetState.restype = wintypes.DWORD
+        # 수집 루프 전용 함수 포인터: argtypes 변환(from_param)이 인자마다 임시 객체를 만들므로, 변환 없이 정수 인덱스와 미리 만든 byref만 넘깁니다.
+        self._get_state_raw = self.lib["XInputGetState"]; self._get_state_raw.restype = wintypes.DWORD
         try: self.XInputSetState = self.lib.XInputSetState; self.XInputSetState.argtypes = [wintypes.DWORD, ctypes.POINTER(XINPUT_VIBRATION)]; self.XInputSetState.restype = wintypes.DWORD
         except AttributeError: self.XInputSetState = None
         try: self.XInputGetCapabilities = self.lib.XInputGetCapabilities; self.XInputGetCapabilities.argtypes = [wintypes.DWORD, wintypes.DWORD, ctypes.POINTER(XINPUT_CAPABILITIES)]; self.XInputGetCapabilities.restype = wintypes.DWORD
@@ -136,9 +617,16 @@ class XInput:
             self.XInputGetBatteryInformation.argtypes = [wintypes.DWORD, ctypes.c_ubyte, ctypes.POINTER(XINPUT_BATTERY_INFORMATION)]
             self.XInputGetBatteryInformation.restype = wintypes.DWORD
         except AttributeError: self.XInputGetBatteryInformation = None
+        try:
+            # 문서화되지 않은 XInputGetCapabilitiesEx (xinput1_4.dll 서수 108): VID/PID를 제공
+            self.XInputGetCapabilitiesEx = self.lib[108]
+            self.XInputGetCapabilitiesEx.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.POINTER(XINPUT_CAPABILITIES_EX)]
+            self.XInputGetCapabilitiesEx.restype = wintypes.DWORD
+        except AttributeError: self.XInputGetCapabilitiesEx = None
 
     def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]:
         state = XINPUT_STATE(); res = self.XInputGetState(idx, ctypes.byref(state)); return int(res), state
+    def get_state_into(self, idx: int, buf: StateBuffer) -> int: return self._get_state_raw(idx, buf.ref)
     def set_vibration(self, idx: int, left: int, right: int) -> bool:
         if not self.XInputSetState: return False
         vib = XINPUT_VIBRATION(int(max(0, min(65535, left))), int(max(0, min(65535, right)))); res = self.XInputSetState(idx, ctypes.byref(vib)); return res == ERROR_SUCCESS
@@ -154,83 +642,1985 @@ class XInput:
         if self.XInputGetBatteryInformation(idx, 0x00, ctypes.byref(info)) == ERROR_SUCCESS:
             return {"type": info.BatteryType, "level": info.BatteryLevel}
         return None
+    def get_device_ids(self, idx: int) -> Optional[Tuple[int, int]]:
+        if not self.XInputGetCapabilitiesEx: return None
+        caps = XINPUT_CAPABILITIES_EX()
+        if self.XInputGetCapabilitiesEx(1, idx, 0, ctypes.byref(caps)) == ERROR_SUCCESS and caps.VendorId: return caps.VendorId, caps.ProductId
+        return None
+
+# 시뮬레이션 프로파일: 지터(주기 대비 %), 패킷 손실(%), 주기적 연결 끊김(간격/지속 시간, 초)
+SIM_RATES_HZ = (125, 250, 500, 1000, 8000)
+SIM_PROFILES = {
+    "ideal":  {"jitter_pct": 0.0,  "drop_pct": 0.0, "disconnect_every_s": 0.0, "disconnect_for_s": 0.0},
+    "jitter": {"jitter_pct": 15.0, "drop_pct": 0.0, "disconnect_every_s": 0.0, "disconnect_for_s": 0.0},
+    "lossy":  {"jitter_pct": 5.0,  "drop_pct": 3.0, "disconnect_every_s": 0.0, "disconnect_for_s": 0.0},
+    "flaky":  {"jitter_pct": 5.0,  "drop_pct": 1.0, "disconnect_every_s": 5.0, "disconnect_for_s": 0.5},
+}
+
+# 시뮬레이션 백엔드의 루프백: 진동 모터가 켜져 있으면 설정된 지연 뒤부터 이 버튼이 눌린 것으로 보고합니다 (입력 지연 측정용).
+SIM_LOOPBACK_BUTTON = "RB"
+
+class _SimulatedSlot:
+    """시뮬레이션 장치 한 개의 패킷 스케줄 상태."""
+    def __init__(self, seed: int, start_ns: int):
+        self.rng = random.Random(seed)
+        self.start_ns = start_ns
+        self.index = 0                 # 스케줄상 패킷 순번 (손실 포함)
+        self.next_ts_ns = start_ns     # 다음 패킷 도착 예정 시각
+        self.state = XINPUT_STATE(); self.raw = memoryview(self.state).cast("B")
+        self.generated = 0; self.dropped = 0
+        self.loopback = False; self.loopback_target = False; self.loopback_at_ns = 0 # 루프백 버튼의 현재/예정 상태와 반영 시각
+
+class SimulatedBackend(InputBackend):
+    """
+    결정적(seed 기반) 가상 컨트롤러 백엔드.
+    - 설정된 폴링레이트(125~8000Hz)로 XINPUT_STATE 호환 패킷을 생성합니다.
+    - 프로파일에 따라 지터, 패킷 손실, 주기적 연결 끊김을 재현합니다.
+    - clock을 주입하면 가상 시간으로 구동할 수 있어 헤드리스 벤치마크/CI에 사용됩니다.
+    - 진동 모터를 켜고 끄면 latency_ms=(평균, 표준편차) 분포의 지연 뒤 첫 패킷부터 SIM_LOOPBACK_BUTTON이 눌리고 풀립니다 (입력 지연 측정 검증용).
+    """
+    name = "sim"
+    supports_wait = True
+
+    def __init__(self, rate_hz: int = 1000, profile: str = "ideal", seed: int = 0,
+                 connected: Tuple[int, ...] = (0,), clock: Callable[[], int] = time.perf_counter_ns, latency_ms: Tuple[float, float] = (0.0, 0.0)):
+        if rate_hz <= 0: raise ValueError(f"잘못된 시뮬레이션 폴링레이트: {rate_hz}")
+        if profile not in SIM_PROFILES: raise ValueError(f"알 수 없는 시뮬레이션 프로파일: {profile} (가능: {', '.join(SIM_PROFILES)})")
+        self.rate_hz = int(rate_hz); self.profile = profile; self.seed = int(seed)
+        self.period_ns = 1_000_000_000 // self.rate_hz
+        p = SIM_PROFILES[profile]
+        self._jitter_ns = int(self.period_ns * p["jitter_pct"] / 100.0)
+        self._drop_p = p["drop_pct"] / 100.0
+        self._disc_every_ns = int(p["disconnect_every_s"] * 1e9); self._disc_for_ns = int(p["disconnect_for_s"] * 1e9)
+        self._clock = clock
+        self._lock = threading.Lock() # GUI와 측정 스레드가 동시에 호출할 수 있으므로 스케줄 갱신을 보호
+        start = clock()
+        self._slots = {idx: _SimulatedSlot(self.seed * 31 + idx, start) for idx in connected if 0 <= idx < self.max_devices}
+        self._vibration = {idx: (0, 0) for idx in self._slots}
+        self.latency_ms = (max(0.0, float(latency_ms[0])), max(0.0, float(latency_ms[1])))
+        self._latency_rng = random.Random(self.seed * 31 + 17)
+
+    def _is_disconnected(self, slot: _SimulatedSlot, now_ns: int) -> bool:
+        if self._disc_every_ns <= 0: return False
+        phase = (now_ns - slot.start_ns) % self._disc_every_ns
+        return phase >= self._disc_every_ns - self._disc_for_ns
+
+    def _apply_packet(self, slot: _SimulatedSlot, ts_ns: int):
+        """패킷 순번으로부터 결정적인 게임패드 값을 생성합니다. 매 패킷마다 스틱 값이 반드시 변합니다."""
+        k = slot.generated; gp = slot.state.Gamepad
+        if slot.loopback != slot.loopback_target and ts_ns >= slot.loopback_at_ns: slot.loopback = slot.loopback_target
+        theta = k * 0.05
+        gp.sThumbLX = int(20000 * math.cos(theta)); gp.sThumbLY = int(20000 * math.sin(theta))
+        gp.sThumbRX = (k * 7) % 32767; gp.sThumbRY = -((k * 3) % 32767)
+        gp.bLeftTrigger = k & 0xFF; gp.bRightTrigger = 255 - (k & 0xFF)
+        gp.wButtons = (XINPUT_GAMEPAD_A if (k // 500) % 2 else 0) | (BUTTON_MASKS[SIM_LOOPBACK_BUTTON] if slot.loopback else 0)
+        slot.state.dwPacketNumber = (slot.state.dwPacketNumber + 1) & 0xFFFFFFFF
+
+    def _advance(self, slot: _SimulatedSlot, now_ns: int, out: Optional[List[Tuple[int, XINPUT_STATE]]] = None):
+        # 오래 폴링되지 않았다면 1초 이전까지는 난수 없이 건너뛰어 따라잡기 비용을 제한합니다.
+        behind = now_ns - slot.next_ts_ns
+        if behind > 1_000_000_000:
+            skip = (behind - 1_000_000_000) // self.period_ns
+            slot.index += skip; slot.next_ts_ns += skip * self.period_ns
+        while slot.next_ts_ns <= now_ns:
+            slot.index += 1
+            if self._drop_p > 0 and slot.rng.random() < self._drop_p: slot.dropped += 1
+            else:
+                slot.generated += 1; self._apply_packet(slot, slot.next_ts_ns)
+                if out is not None:
+                    packet = XINPUT_STATE(); ctypes.memmove(ctypes.byref(packet), ctypes.byref(slot.state), ctypes.sizeof(XINPUT_STATE))
+                    out.append((slot.next_ts_ns, packet))
+            nominal = slot.start_ns + slot.index * self.period_ns # 지터는 누적되지 않도록 공칭 격자 기준으로 적용
+            slot.next_ts_ns = nominal + (slot.rng.randint(-self._jitter_ns, self._jitter_ns) if self._jitter_ns else 0)
+
+    def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]:
+        state = XINPUT_STATE()
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED, state
+        with self._lock:
+            now = self._clock()
+            self._advance(slot, now)
+            if self._is_disconnected(slot, now): return ERROR_DEVICE_NOT_CONNECTED, state
+            ctypes.memmove(ctypes.byref(state), ctypes.byref(slot.state), ctypes.sizeof(XINPUT_STATE))
+        return ERROR_SUCCESS, state
+
+    def get_state_into(self, idx: int, buf: StateBuffer) -> int:
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED
+        with self._lock:
+            now = self._clock()
+            self._advance(slot, now)
+            if self._is_disconnected(slot, now): return ERROR_DEVICE_NOT_CONNECTED
+            buf.raw[:] = slot.raw
+        return ERROR_SUCCESS
+
+    def wait_packets(self, idx: int, timeout_s: float) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        # 다음 예정 시각까지 잠든 뒤, 그 사이 생성된 패킷을 예정 시각(가상의 커널 타임스탬프)과 함께 반환합니다.
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED, []
+        with self._lock: wait_ns = slot.next_ts_ns - self._clock()
+        if wait_ns > 0: time.sleep(min(wait_ns / 1e9, timeout_s))
+        packets: List[Tuple[int, XINPUT_STATE]] = []
+        with self._lock:
+            now = self._clock()
+            self._advance(slot, now, packets)
+            if self._is_disconnected(slot, now): return ERROR_DEVICE_NOT_CONNECTED, []
+        return ERROR_SUCCESS, packets
+
+    def set_vibration(self, idx: int, left: int, right: int) -> bool:
+        slot = self._slots.get(idx)
+        if slot is None: return False
+        self._vibration[idx] = (int(max(0, min(65535, left))), int(max(0, min(65535, right))))
+        on = any(self._vibration[idx])
+        with self._lock:
+            if on != slot.loopback_target:
+                mean_ms, sd_ms = self.latency_ms
+                delay_ms = max(0.0, self._latency_rng.gauss(mean_ms, sd_ms)) if sd_ms else mean_ms
+                slot.loopback_target = on; slot.loopback_at_ns = self._clock() + int(delay_ms * 1_000_000)
+        return True
+
+    def get_capabilities(self, idx: int) -> Optional[XINPUT_CAPABILITIES]:
+        if idx not in self._slots: return None
+        caps = XINPUT_CAPABILITIES(); caps.Type = 0x01; caps.SubType = XINPUT_DEVSUBTYPE_GAMEPAD; return caps
+    def get_device_ids(self, idx: int) -> Optional[Tuple[int, int]]:
+        return (0x045E, 0x0B12) if idx in self._slots else None # Xbox Series 컨트롤러 ID를 흉내 냄
+
+    def get_battery_info(self, idx: int) -> Optional[dict]:
+        if idx not in self._slots: return None
+        return {"type": BATTERY_TYPE_WIRED, "level": BATTERY_LEVEL_FULL}
+
+    def packet_counts(self, idx: int) -> Tuple[int, int]:
+        """(생성된 패킷 수, 손실된 패킷 수)를 반환합니다. 측정 정확도 검증용."""
+        slot = self._slots.get(idx)
+        return (slot.generated, slot.dropped) if slot else (0, 0)
+
+# ----- 캡처 재생 백엔드 -----
+REPLAY_SPEED_MAX = 0.0 # 재생 속도 0: 벽시계와 무관하게 가능한 한 빠르게
+
+def parse_replay_speed(text: str) -> Optional[float]:
+    """재생 속도 문자열('1', '4x', '0.5', 'max')을 배수로 바꿉니다. 속도 표기가 아니면 None."""
+    t = text.strip().lower()
+    if t == "max": return REPLAY_SPEED_MAX
+    try: speed = float(t[:-1] if t.endswith("x") else t)
+    except ValueError: return None
+    return speed if speed >= 0 and math.isfinite(speed) else None
+
+class _ReplaySlot:
+    """재생 중인 캡처 파일 한 개의 진행 상태. 레코드는 mmap에서 필요할 때만 읽습니다."""
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = CaptureReader(path)
+        if not self.reader.with_states or not len(self.reader):
+            self.reader.close(); raise ValueError(f"패킷 상태가 기록된 캡처만 재생할 수 있습니다: {path}")
+        ts = self.reader.timestamps().tolist(); first = ts[0]
+        self.offsets = [t - first for t in ts] # 첫 레코드 기준 상대 시각(ns)
+        self.intervals = sum(1 for a, b in zip(self.offsets, self.offsets[1:]) if b - a > 1000) # CaptureReader.intervals_ns()와 같은 규칙
+        self.state = XINPUT_STATE(); self.raw = memoryview(self.state).cast("B")
+        self.rewind()
+
+    def rewind(self):
+        """
+        재생 전 상태로 되돌립니다. 대기 상태는 첫 레코드에서 왼쪽 스틱 X의 최하위 비트만 바꾼 값(패킷 번호 0)이므로,
+        표준 모드에서도 첫 레코드가 변화로 기록되어 재생 간격이 원본 캡처의 간격과 정확히 같아집니다 (화면에는 드러나지 않는 1/32768 차이).
+        """
+        self.pos = 0; self.read_pos = 0 # 재생 시각이 지난 레코드 수, 그중 read_packets로 전달한 레코드 수
+        self.origin_ns = 0; self.base_ns = 0
+        self.raw[:] = memoryview(self.reader.state(0)).cast("B")
+        self.state.dwPacketNumber = 0; self.state.Gamepad.sThumbLX ^= 1
+
+class ReplayBackend(InputBackend):
+    """
+    녹화된 캡처 파일(.gpcap)을 실제 장치처럼 재생하는 백엔드. 측정 스레드, 분석 파이프라인, 게임패드/입력 기록 위젯이 그대로 동작합니다.
+    - 파일 하나가 슬롯 하나이며 (지정 순서대로 슬롯 0부터), 상태가 기록된 캡처만 재생할 수 있습니다.
+    - speed: 1은 실시간, N은 N배속, 0(REPLAY_SPEED_MAX)은 호출마다 CHUNK개씩 즉시 내보내는 최대 속도입니다.
+      최대 속도 재생은 수집 → 분석 파이프라인의 처리량 벤치마크로도 쓰입니다 (benchmark_replay).
+    - 패킷은 기록된 타임스탬프 간격을 그대로 유지한 채 전달되므로 재생 속도와 무관하게 간격 통계가 원본 캡처와 같습니다.
+      타임스탬프는 재생 시작 시각보다 캡처 길이만큼 앞선 과거 시각으로 옮기므로, 하이브리드 대기는 유휴 하한으로만 잠듭니다.
+    - 패킷 번호는 레코드 순번으로 다시 매깁니다 (원본은 변화가 있는 패킷만 남기므로, 원래 번호 차이가 누락으로 집계되지 않게).
+    - 재생은 측정 시작(discard_packets) 후 첫 패킷 요청 때 처음부터 시작됩니다. 상태 조회는 재생 위치를 옮기지 않으므로 측정 전에는 첫 레코드가 보이고,
+      측정 준비 과정의 상태 조회(보정 등)가 첫 레코드를 먼저 소비하지 않습니다. 끝까지 내보내면 stream_ended()가 True가 되어 측정이 정상 종료됩니다.
+    """
+    name = "replay"
+    kernel_timestamps = True
+    supports_wait = True
+    CHUNK = 4096 # 최대 속도 재생에서 한 번에 내보내는 레코드 수
+
+    def __init__(self, paths: List[str], speed: float = 1.0, clock: Callable[[], int] = time.perf_counter_ns):
+        if not paths: raise ValueError("재생할 캡처 파일이 없습니다.")
+        if len(paths) > self.max_devices: raise ValueError(f"캡처 파일은 최대 {self.max_devices}개까지 재생할 수 있습니다.")
+        if speed < 0: raise ValueError(f"잘못된 재생 속도: {speed}")
+        self.paths = list(paths); self.speed = float(speed); self._clock = clock
+        self._lock = threading.Lock() # GUI와 측정 스레드가 동시에 호출할 수 있으므로 재생 위치 갱신을 보호
+        self._slots = {}
+        try:
+            for idx, path in enumerate(paths): self._slots[idx] = _ReplaySlot(path)
+        except (OSError, ValueError): self.close(); raise
+
+    def _release(self, slot: _ReplaySlot):
+        """재생 시각이 지난 레코드까지 재생 위치를 옮기고 최신 상태를 갱신합니다. 잠금을 잡은 상태에서 호출합니다."""
+        offsets = slot.offsets
+        if slot.pos >= len(offsets): return
+        now = self._clock()
+        if not slot.origin_ns: slot.origin_ns = now; slot.base_ns = now - offsets[-1]
+        if self.speed: end = bisect.bisect_right(offsets, (now - slot.origin_ns) * self.speed, slot.pos)
+        else: end = min(len(offsets), slot.pos + self.CHUNK)
+        if end == slot.pos: return
+        slot.raw[:] = memoryview(slot.reader.state(end - 1)).cast("B"); slot.state.dwPacketNumber = end & 0xFFFFFFFF
+        slot.pos = end
+
+    def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]:
+        state = XINPUT_STATE()
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED, state
+        with self._lock: ctypes.memmove(ctypes.byref(state), ctypes.byref(slot.state), ctypes.sizeof(XINPUT_STATE))
+        return ERROR_SUCCESS, state
+
+    def get_state_into(self, idx: int, buf: StateBuffer) -> int:
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED
+        with self._lock: buf.raw[:] = slot.raw
+        return ERROR_SUCCESS
+
+    def read_packets(self, idx: int) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED, []
+        with self._lock:
+            self._release(slot)
+            start = slot.read_pos; end = min(slot.pos, start + self.CHUNK); slot.read_pos = end
+            base = slot.base_ns; offsets = slot.offsets; state = slot.reader.state
+        packets: List[Tuple[int, XINPUT_STATE]] = []
+        for i in range(start, end):
+            packet = state(i); packet.dwPacketNumber = (i + 1) & 0xFFFFFFFF
+            packets.append((base + offsets[i], packet))
+        return ERROR_SUCCESS, packets
+
+    def wait_packets(self, idx: int, timeout_s: float) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        # 전달할 레코드가 없으면 다음 레코드의 재생 시각까지 잠듭니다 (최대 속도 재생과 재생 종료 후에는 바로 반환).
+        slot = self._slots.get(idx)
+        if slot is None: return ERROR_DEVICE_NOT_CONNECTED, []
+        wait_ns = 0
+        with self._lock:
+            self._release(slot)
+            if self.speed and slot.read_pos == slot.pos < len(slot.offsets):
+                wait_ns = slot.origin_ns + int(slot.offsets[slot.pos] / self.speed) - self._clock()
+        if wait_ns > 0: time.sleep(min(wait_ns / 1e9, timeout_s))
+        return self.read_packets(idx)
+
+    def discard_packets(self, idx: int) -> None:
+        slot = self._slots.get(idx)
+        if slot is not None:
+            with self._lock: slot.rewind()
+
+    def stream_ended(self, idx: int) -> bool:
+        slot = self._slots.get(idx)
+        return slot is not None and slot.read_pos >= len(slot.offsets)
+
+    def capture_metadata(self, idx: int) -> dict:
+        """슬롯에 연결된 캡처 파일의 메타데이터 (측정 모드, 원래 백엔드 등)."""
+        slot = self._slots.get(idx)
+        return slot.reader.metadata if slot else {}
+
+    def interval_count(self, idx: int) -> int:
+        """재생으로 얻을 수 있는 최대 간격 수 (자이로 모드 기준)."""
+        slot = self._slots.get(idx)
+        return slot.intervals if slot else 0
+
+    def get_capabilities(self, idx: int) -> Optional[XINPUT_CAPABILITIES]:
+        if idx not in self._slots: return None
+        caps = XINPUT_CAPABILITIES(); caps.Type = 0x01; caps.SubType = XINPUT_DEVSUBTYPE_GAMEPAD; return caps
+    def get_battery_info(self, idx: int) -> Optional[dict]:
+        if idx not in self._slots: return None
+        return {"type": BATTERY_TYPE_WIRED, "level": BATTERY_LEVEL_FULL}
+    def get_device_ids(self, idx: int) -> Optional[Tuple[int, int]]:
+        vid, _, pid = self.capture_metadata(idx).get("vid_pid", "").partition(":")
+        try: return (int(vid, 16), int(pid, 16)) if pid else None
+        except ValueError: return None
+    def get_device_name(self, idx: int) -> Optional[str]:
+        slot = self._slots.get(idx)
+        return f"재생 {os.path.splitext(os.path.basename(slot.path))[0]}" if slot else None
+
+    def close(self) -> None:
+        for slot in self._slots.values(): slot.reader.close()
+        self._slots = {}
+
+# ----- Linux evdev 상수 -----
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+SYN_REPORT, SYN_DROPPED = 0, 3
+ABS_X, ABS_Y, ABS_Z, ABS_RX, ABS_RY, ABS_RZ, ABS_HAT0X, ABS_HAT0Y = 0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x10, 0x11
+EVIOCSCLOCKID = 0x400445A0 # _IOW('E', 0xa0, int)
+EVIOCGABS_BASE = 0x80184540 # _IOR('E', 0x40 + abs, struct input_absinfo)
+EVIOCGID = 0x80084502       # _IOR('E', 0x02, struct input_id)
+EVIOCGNAME_256 = 0x81004506 # _IOC(_IOC_READ, 'E', 0x06, 256)
+CLOCK_MONOTONIC = 1
+_INPUT_EVENT = struct.Struct("llHHi") # struct input_event (timeval, type, code, value)
+_INPUT_ABSINFO = struct.Struct("6i")  # value, minimum, maximum, fuzz, flat, resolution
+# xpad 드라이버 기준 evdev 버튼 코드 → XInput 버튼 비트
+_EVDEV_BUTTONS = {
+    0x130: XINPUT_GAMEPAD_A, 0x131: XINPUT_GAMEPAD_B, 0x133: XINPUT_GAMEPAD_X, 0x134: XINPUT_GAMEPAD_Y,
+    0x136: XINPUT_GAMEPAD_LEFT_SHOULDER, 0x137: XINPUT_GAMEPAD_RIGHT_SHOULDER,
+    0x13A: XINPUT_GAMEPAD_BACK, 0x13B: XINPUT_GAMEPAD_START,
+    0x13D: XINPUT_GAMEPAD_LEFT_THUMB, 0x13E: XINPUT_GAMEPAD_RIGHT_THUMB,
+    0x220: XINPUT_GAMEPAD_DPAD_UP, 0x221: XINPUT_GAMEPAD_DPAD_DOWN, 0x222: XINPUT_GAMEPAD_DPAD_LEFT, 0x223: XINPUT_GAMEPAD_DPAD_RIGHT,
+}
+# 축 코드 → (XINPUT_GAMEPAD 필드, 출력 최솟값, 출력 최댓값, 반전 여부). evdev의 Y축은 아래가 양수입니다.
+_EVDEV_AXES = {
+    ABS_X: ("sThumbLX", -32768, 32767, False), ABS_Y: ("sThumbLY", -32768, 32767, True),
+    ABS_RX: ("sThumbRX", -32768, 32767, False), ABS_RY: ("sThumbRY", -32768, 32767, True),
+    ABS_Z: ("bLeftTrigger", 0, 255, False), ABS_RZ: ("bRightTrigger", 0, 255, False),
+}
+
+def find_evdev_gamepads() -> List[str]:
+    """/proc/bus/input/devices에서 조이스틱 핸들러(jsN)를 가진 evdev 노드 경로를 찾습니다."""
+    paths = []
+    try:
+        with open("/proc/bus/input/devices", encoding="utf-8", errors="replace") as f: blocks = f.read().split("\n\n")
+    except OSError: return paths
+    for block in blocks:
+        for line in block.splitlines():
+            if line.startswith("H: Handlers="):
+                handlers = line.split("=", 1)[1].split()
+                if any(h.startswith("js") for h in handlers):
+                    paths += [f"/dev/input/{h}" for h in handlers if h.startswith("event")]
+    return paths
+
+class _EvdevSlot:
+    """evdev 장치(또는 녹화된 이벤트 스트림 파일) 하나의 읽기 상태."""
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+        self.connected = False
+        self.live = True                   # 문자 장치이면 True, 녹화 파일이면 False
+        self.eof = False                   # 녹화 파일을 끝까지 읽었으면 True
+        self.pending = b""                 # 이벤트 경계에 걸친 잔여 바이트
+        self.state = XINPUT_STATE()        # SYN_REPORT까지 누적 중인 상태
+        self.latest = XINPUT_STATE()       # 마지막으로 완성된 패킷
+        self.packets: Deque[Tuple[int, XINPUT_STATE]] = deque(maxlen=65536)
+        self.dropping = False              # SYN_DROPPED 이후 다음 SYN_REPORT까지 무시
+        self.hat = {ABS_HAT0X: 0, ABS_HAT0Y: 0}
+        self.ranges = {code: None for code in _EVDEV_AXES} # 장치가 보고한 (최솟값, 최댓값)
+        self.name: Optional[str] = None; self.ids: Optional[Tuple[int, int]] = None
+
+class EvdevBackend(InputBackend):
+    """
+    Linux evdev(/dev/input/event*) 입력 백엔드.
+    - 각 이벤트의 커널 타임스탬프(CLOCK_MONOTONIC)를 SYN_REPORT 단위 패킷에 붙여 제공하므로,
+      폴링 간격이 사용자 공간 스케줄링 노이즈 없이 커널 기준으로 측정됩니다.
+    - 경로에는 uinput 가상 장치나 `cat /dev/input/eventN > 파일`로 녹화한 이벤트 스트림 파일도 지정할 수 있습니다.
+      녹화 파일은 패킷을 요청할 때(read_packets/wait_packets)만 FILE_CHUNK_EVENTS개씩 읽으므로 파일 길이와 무관하게 패킷 큐가 넘치지 않고,
+      측정 시작(discard_packets)마다 처음부터 다시 읽으며, 끝에 닿으면 stream_ended()로 측정을 정상 종료시킵니다.
+    """
+    name = "evdev"
+    kernel_timestamps = True
+    supports_wait = True
+    FILE_CHUNK_EVENTS = 1024 # 녹화 파일에서 한 번에 읽는 이벤트 수 (패킷 큐 최대 길이보다 작아야 함)
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        paths = list(paths) if paths else find_evdev_gamepads()
+        if not paths: raise OSError("evdev 게임패드 장치를 찾을 수 없습니다. (/dev/input 접근 권한을 확인하세요)")
+        self._slots = [_EvdevSlot(p) for p in paths[:self.max_devices]]
+        self._lock = threading.Lock()
+        errors = [error for error in map(self._open, self._slots) if error]
+        if len(errors) == len(self._slots): raise OSError(f"evdev 장치를 열 수 없습니다: {'; '.join(errors)}")
+        for error in errors: print(f"evdev 장치 열기 실패: {error}") # 일부만 실패하면 나머지 장치로 계속
+
+    def _open(self, slot: _EvdevSlot) -> Optional[str]:
+        """장치(또는 녹화 파일)를 엽니다. 실패하면 경로가 담긴 오류 메시지를 반환합니다."""
+        try: slot.fd = os.open(slot.path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError as e:
+            slot.connected = False; return f"{slot.path} ({e.strerror or e})"
+        slot.connected = True
+        slot.live = stat.S_ISCHR(os.fstat(slot.fd).st_mode)
+        try:
+            import fcntl
+            fcntl.ioctl(slot.fd, EVIOCSCLOCKID, struct.pack("i", CLOCK_MONOTONIC))
+            buf = bytearray(8); fcntl.ioctl(slot.fd, EVIOCGID, buf); _, vid, pid, _ = struct.unpack("4H", buf); slot.ids = (vid, pid) if vid else None
+            buf = bytearray(256); fcntl.ioctl(slot.fd, EVIOCGNAME_256, buf); slot.name = buf.split(b"\0", 1)[0].decode("utf-8", "replace") or None
+            for code in _EVDEV_AXES:
+                buf = bytearray(_INPUT_ABSINFO.size); fcntl.ioctl(slot.fd, EVIOCGABS_BASE + code, buf)
+                _, lo, hi, _, _, _ = _INPUT_ABSINFO.unpack(buf)
+                if hi > lo: slot.ranges[code] = (lo, hi)
+        except (ImportError, OSError): pass # 일반 파일(녹화 스트림)은 ioctl을 지원하지 않으므로 xpad 기본 범위를 사용
+        return None
+
+    def _scale_axis(self, slot: _EvdevSlot, code: int, value: int) -> int:
+        field, out_lo, out_hi, invert = _EVDEV_AXES[code]
+        rng = slot.ranges[code]
+        if rng is not None and rng != (out_lo, out_hi):
+            lo, hi = rng; value = out_lo + (value - lo) * (out_hi - out_lo) // (hi - lo)
+        if invert: value = -1 - value if out_lo < 0 else out_hi - value
+        return max(out_lo, min(out_hi, value))
+
+    def _handle_event(self, slot: _EvdevSlot, ts_ns: int, etype: int, code: int, value: int):
+        gp = slot.state.Gamepad
+        if etype == EV_SYN:
+            if code == SYN_DROPPED: slot.dropping = True
+            elif code == SYN_REPORT:
+                if slot.dropping: slot.dropping = False; return
+                slot.state.dwPacketNumber = (slot.state.dwPacketNumber + 1) & 0xFFFFFFFF
+                packet = XINPUT_STATE(); ctypes.memmove(ctypes.byref(packet), ctypes.byref(slot.state), ctypes.sizeof(XINPUT_STATE))
+                slot.latest = packet; slot.packets.append((ts_ns, packet))
+        elif etype == EV_KEY and code in _EVDEV_BUTTONS:
+            mask = _EVDEV_BUTTONS[code]
+            gp.wButtons = (gp.wButtons | mask) if value else (gp.wButtons & ~mask)
+        elif etype == EV_ABS:
+            if code in _EVDEV_AXES: setattr(gp, _EVDEV_AXES[code][0], self._scale_axis(slot, code, value))
+            elif code in slot.hat:
+                slot.hat[code] = value
+                buttons = gp.wButtons & ~(XINPUT_GAMEPAD_DPAD_UP | XINPUT_GAMEPAD_DPAD_DOWN | XINPUT_GAMEPAD_DPAD_LEFT | XINPUT_GAMEPAD_DPAD_RIGHT)
+                if slot.hat[ABS_HAT0X] < 0: buttons |= XINPUT_GAMEPAD_DPAD_LEFT
+                elif slot.hat[ABS_HAT0X] > 0: buttons |= XINPUT_GAMEPAD_DPAD_RIGHT
+                if slot.hat[ABS_HAT0Y] < 0: buttons |= XINPUT_GAMEPAD_DPAD_UP
+                elif slot.hat[ABS_HAT0Y] > 0: buttons |= XINPUT_GAMEPAD_DPAD_DOWN
+                gp.wButtons = buttons
+
+    def _drain(self, slot: _EvdevSlot):
+        """읽을 수 있는 이벤트를 비차단 방식으로 읽어 패킷으로 조립합니다. 실제 장치는 모두, 녹화 파일은 한 덩어리만 읽습니다."""
+        if slot.fd is None or slot.eof: return
+        size = _INPUT_EVENT.size
+        while True:
+            try: chunk = os.read(slot.fd, size * (256 if slot.live else self.FILE_CHUNK_EVENTS))
+            except BlockingIOError: break
+            except OSError: # ENODEV: 장치 분리
+                os.close(slot.fd); slot.fd = None; slot.connected = False; break
+            if not chunk: slot.eof = not slot.live; break # 녹화 파일의 끝
+            data = slot.pending + chunk; usable = len(data) - len(data) % size
+            for sec, usec, etype, code, value in _INPUT_EVENT.iter_unpack(data[:usable]):
+                self._handle_event(slot, sec * 1_000_000_000 + usec * 1000, etype, code, value)
+            slot.pending = data[usable:]
+            if not slot.live: break
+
+    def _rewind(self, slot: _EvdevSlot):
+        """녹화 파일을 처음부터 다시 읽도록 읽기 위치와 조립 중인 상태를 초기화합니다."""
+        try: os.lseek(slot.fd, 0, os.SEEK_SET)
+        except OSError: return
+        slot.pending = b""; slot.eof = False; slot.dropping = False; slot.packets.clear()
+        slot.state = XINPUT_STATE(); slot.latest = XINPUT_STATE(); slot.hat = {ABS_HAT0X: 0, ABS_HAT0Y: 0}
+
+    def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]:
+        state = XINPUT_STATE()
+        if not 0 <= idx < len(self._slots): return ERROR_DEVICE_NOT_CONNECTED, state
+        slot = self._slots[idx]
+        with self._lock:
+            if slot.live: self._drain(slot) # 녹화 파일은 상태 조회(미리보기, 보정)로 스트림을 소비하지 않음
+            if not slot.connected: return ERROR_DEVICE_NOT_CONNECTED, state
+            ctypes.memmove(ctypes.byref(state), ctypes.byref(slot.latest), ctypes.sizeof(XINPUT_STATE))
+        return ERROR_SUCCESS, state
+
+    def read_packets(self, idx: int) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        if not 0 <= idx < len(self._slots): return ERROR_DEVICE_NOT_CONNECTED, []
+        slot = self._slots[idx]
+        with self._lock:
+            self._drain(slot)
+            packets = list(slot.packets); slot.packets.clear()
+            if not slot.connected and not packets: return ERROR_DEVICE_NOT_CONNECTED, []
+        return ERROR_SUCCESS, packets
+
+    def wait_packets(self, idx: int, timeout_s: float) -> Tuple[int, List[Tuple[int, XINPUT_STATE]]]:
+        if not 0 <= idx < len(self._slots): return ERROR_DEVICE_NOT_CONNECTED, []
+        fd = self._slots[idx].fd
+        if fd is not None and not self._slots[idx].packets:
+            try: select.select([fd], [], [], timeout_s)
+            except (OSError, ValueError): pass # 대기 중 장치가 닫힌 경우 아래 read_packets에서 처리
+        return self.read_packets(idx)
+
+    def discard_packets(self, idx: int) -> None:
+        # 실제 장치는 대기 패킷을 버리고, 녹화 파일은 전체가 측정 대상이므로 처음으로 되감습니다.
+        if not 0 <= idx < len(self._slots): return
+        slot = self._slots[idx]
+        with self._lock:
+            if slot.fd is None: return
+            if slot.live: self._drain(slot); slot.packets.clear()
+            else: self._rewind(slot)
+
+    def stream_ended(self, idx: int) -> bool:
+        if not 0 <= idx < len(self._slots): return False
+        slot = self._slots[idx]
+        return not slot.live and slot.eof and not slot.packets
+
+    def get_capabilities(self, idx: int) -> Optional[XINPUT_CAPABILITIES]:
+        if not 0 <= idx < len(self._slots) or not self._slots[idx].connected: return None
+        caps = XINPUT_CAPABILITIES(); caps.Type = 0x01; caps.SubType = XINPUT_DEVSUBTYPE_GAMEPAD; return caps
+    def get_device_ids(self, idx: int) -> Optional[Tuple[int, int]]: return self._slots[idx].ids if 0 <= idx < len(self._slots) else None
+    def get_device_name(self, idx: int) -> Optional[str]: return self._slots[idx].name if 0 <= idx < len(self._slots) else None
+
+    def close(self) -> None:
+        with self._lock:
+            for slot in self._slots:
+                if slot.fd is not None: os.close(slot.fd); slot.fd = None
+
+def create_backend(spec: str = "xinput") -> InputBackend:
+    """
+    백엔드 지정 문자열로부터 입력 백엔드를 생성합니다.
+    - "xinput": Windows XInput 드라이버
+    - "sim[:rate[:profile[:seed[:slots[:latency]]]]]": 가상 컨트롤러 (예: "sim:1000:jitter:7:0,1", 진동 루프백 지연 평균 4ms·표준편차 1ms는 "sim:1000:ideal:0:0:4/1")
+    - "evdev[:path1,path2]": Linux evdev 장치 또는 녹화된 이벤트 스트림 (경로 생략 시 자동 검색)
+    - "replay:capture1.gpcap[,capture2.gpcap][:speed]": 캡처 파일 재생 (speed: 1 = 실시간(기본), 4x = 4배속, max = 최대 속도)
+    """
+    kind, _, rest = spec.partition(":")
+    if kind == "xinput": return XInput()
+    if kind == "sim":
+        parts = rest.split(":") if rest else []
+        rate = int(parts[0]) if len(parts) > 0 and parts[0] else 1000
+        profile = parts[1] if len(parts) > 1 and parts[1] else "ideal"
+        seed = int(parts[2]) if len(parts) > 2 and parts[2] else 0
+        slots = tuple(int(x) for x in parts[3].split(",")) if len(parts) > 3 and parts[3] else (0,)
+        mean_ms, _, sd_ms = parts[4].partition("/") if len(parts) > 4 else ("", "", "")
+        return SimulatedBackend(rate, profile, seed, slots, latency_ms=(float(mean_ms or 0), float(sd_ms or 0)))
+    if kind == "evdev": return EvdevBackend(rest.split(",") if rest else None)
+    if kind == "replay":
+        # 경로에 드라이브 문자(C:)가 있을 수 있으므로 마지막 ':' 뒤가 속도 표기일 때만 속도로 해석합니다.
+        head, sep, tail = rest.rpartition(":")
+        speed = parse_replay_speed(tail) if sep else None
+        paths = head if speed is not None else rest
+        return ReplayBackend([p for p in paths.split(",") if p], 1.0 if speed is None else speed)
+    raise ValueError(f"알 수 없는 입력 백엔드: {spec}")
+
+# 샘플링 전략: 하이브리드(보정된 스핀/양보/수면), 순수 스핀(최대 정밀도), 이벤트(백엔드 차단 대기)
+SAMPLER_STRATEGIES = {"hybrid": "하이브리드", "spin": "스핀", "event": "이벤트"}
+
+def measure_timer_resolution(samples: int = 10) -> dict:
+    """
+    현재 환경의 타이머 특성을 측정합니다.
+    - clock_ns: perf_counter_ns()가 구분할 수 있는 최소 시간 간격
+    - sleep_floor_ns: time.sleep(0.0001)이 실제로 잠드는 시간의 중앙값 (OS 타이머 해상도의 하한)
+    - yield_ns: time.sleep(0)으로 CPU를 양보하는 데 걸리는 시간의 중앙값
+    """
+    clock_deltas, sleeps, yields = [], [], []
+    for _ in range(max(3, samples)):
+        a = time.perf_counter_ns(); b = time.perf_counter_ns()
+        while b == a: b = time.perf_counter_ns()
+        clock_deltas.append(b - a)
+        t0 = time.perf_counter_ns(); time.sleep(0.0001); sleeps.append(time.perf_counter_ns() - t0)
+        t0 = time.perf_counter_ns(); time.sleep(0); yields.append(time.perf_counter_ns() - t0)
+    return {"clock_ns": min(clock_deltas), "sleep_floor_ns": int(median(sleeps)), "yield_ns": int(median(yields))}
+
+CALIBRATION_MS = 30 # 측정 전 샘플러 보정에 쓰는 스핀 폴링 시간
+
+def calibrate_sampler(backend: InputBackend, idx: int, duration_ms: float = CALIBRATION_MS) -> dict:
+    """
+    측정 직전의 샘플러 자체 보정. measure_timer_resolution()의 타이머 특성에 더해, 실제 백엔드로 duration_ms 동안 스핀 폴링하여 측정합니다.
+    - call_ns / call_p99_ns: get_state 1회 호출 비용의 중앙값/P99
+    - loop_ns / loop_p99_ns / loop_max_ns: 폴링 루프 1회 주기의 중앙값/P99/최대. 중앙값은 이 PC에서 가능한 폴링 주기의 하한이고,
+      P99와의 차이는 스케줄링 지터, 최대값은 선점에 의한 정지 시간입니다.
+    결과는 측정 신뢰 구간(measurement_confidence)과 언더샘플링 판정의 근거가 되며 캡처 메타데이터에도 기록됩니다.
+    """
+    info = measure_timer_resolution()
+    buf = StateBuffer(); get = backend.get_state_into; clock = time.perf_counter_ns
+    calls: List[int] = []; loops: List[int] = []
+    end_ns = clock() + int(duration_ms * 1_000_000); prev_ns = clock()
+    while prev_ns < end_ns and len(calls) < 200_000:
+        t0 = clock(); get(idx, buf); t1 = clock()
+        calls.append(t1 - t0); loops.append(t1 - prev_ns); prev_ns = t1
+    calls.sort(); loops.sort(); n = len(loops); p99 = min(n - 1, int(n * 0.99))
+    info.update({"call_ns": calls[n // 2], "call_p99_ns": calls[p99], "loop_ns": loops[n // 2], "loop_p99_ns": loops[p99],
+                 "loop_max_ns": loops[-1], "calibration_loops": n})
+    return info
+
+GC_MODES = {"off": "제어 안 함", "freeze": "고정", "disable": "중지"}
+
+class GcWindow:
+    """
+    측정 구간의 가비지 컬렉터 제어 (프로세스 전역이므로 겹치는 구간은 참조 횟수로 묶음).
+    - freeze: 시작 시 한 번 수집한 뒤 살아 있는 객체를 영구 세대로 옮겨(gc.freeze), 측정 중 일어나는 수집이 훑는 객체 수를 줄입니다.
+    - disable: freeze에 더해 측정 동안 자동 수집을 멈춥니다. 순환 참조 쓰레기가 쌓일 수 있으므로 내구 측정에서는 freeze로 대체합니다.
+    - 구간 동안 일어난 수집 횟수를 세어, 수집 정지가 간격 이상치의 원인이었는지 리포트에서 확인할 수 있게 합니다.
+    """
+    _lock = threading.Lock(); _depth = 0; _was_enabled = True
+
+    def __init__(self, mode: str = "freeze"):
+        if mode not in GC_MODES: raise ValueError(f"알 수 없는 GC 모드: {mode}")
+        self.mode = mode; self.frozen = 0; self._start: Optional[int] = None; self._end: Optional[int] = None
+
+    @staticmethod
+    def _collections() -> int: return sum(s["collections"] for s in gc.get_stats())
+    def collections(self) -> int:
+        """구간 동안 일어난 수집 횟수 (구간 진행 중이면 지금까지)."""
+        if self._start is None: return 0
+        return (self._end if self._end is not None else self._collections()) - self._start
+
+    def __enter__(self) -> "GcWindow":
+        if self.mode != "off":
+            with GcWindow._lock:
+                if GcWindow._depth == 0:
+                    GcWindow._was_enabled = gc.isenabled(); gc.collect(); gc.freeze()
+                    if self.mode == "disable": gc.disable()
+                GcWindow._depth += 1
+            self.frozen = gc.get_freeze_count()
+        self._start = self._collections(); self._end = None
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._end = self._collections()
+        if self.mode != "off":
+            with GcWindow._lock:
+                GcWindow._depth -= 1
+                if GcWindow._depth == 0:
+                    gc.unfreeze()
+                    if GcWindow._was_enabled: gc.enable()
+        return False
+
+FIDELITY_AUTO = -1 # 고정밀 측정의 코어 자동 선택 (허용된 마지막 코어)
+
+class FidelityWindow:
+    """
+    고정밀 측정 구간. 측정 스레드 안에서 진입하여 그 스레드의 스케줄링 조건을 조이고, 구간이 끝나면 적용한 역순으로 모두 되돌립니다.
+    - 코어 고정: Windows SetThreadAffinityMask(GetProcessAffinityMask와 교집합), Linux os.sched_setaffinity. 자동 선택은 인터럽트와 GUI 이벤트 루프가 몰리는 코어 0을 피해 허용된 마지막 코어입니다.
+    - 타이머: Windows timeBeginPeriod(1), Linux 스레드 타이머 여유(timer slack) 1ns
+    - 우선순위: QThread.TimeCriticalPriority, Linux에서는 권한이 있으면 SCHED_FIFO (실시간 스로틀링이 CPU 독점을 막음)
+    - 인터프리터 스레드 전환 간격(sys.setswitchinterval): 분석/GUI 스레드가 GIL을 쥐고 있을 때 수집 스레드가 빨리 되찾도록 줄입니다. 프로세스 전역이므로 참조 횟수로 묶습니다.
+    설정마다 적용 결과는 applied, 실패는 failed에 남아 리포트에 기록되며, 실패해도 측정은 그대로 진행됩니다.
+    """
+    SWITCH_INTERVAL_S = 0.0005
+    FIFO_PRIORITY = 1
+    _lock = threading.Lock(); _depth = 0; _switch_interval = 0.005
+
+    def __init__(self, cpu: Optional[int] = None):
+        self.cpu = cpu; self.applied: List[str] = []; self.failed: List[str] = []; self._undo: List[Tuple[str, Callable[[], None]]] = []
+
+    @property
+    def enabled(self) -> bool: return self.cpu is not None
+
+    def __enter__(self) -> "FidelityWindow":
+        if not self.enabled: return self
+        self.applied.clear(); self.failed.clear(); self._undo.clear()
+        # 타이머 여유는 실시간 정책으로 바꾸기 전에 줄여야 합니다 (실시간 스레드는 여유가 0으로 고정되어 이전 값을 읽을 수 없음).
+        for name, apply in (("affinity", self._affinity), ("timer", self._timer), ("priority", self._priority), ("realtime", self._realtime), ("switch", self._switch)):
+            try: desc, undo = apply()
+            except (OSError, ValueError, AttributeError) as e: self.failed.append(f"{name}: {e}"); continue
+            if desc: self.applied.append(desc)
+            if undo: self._undo.append((name, undo))
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        while self._undo:
+            name, undo = self._undo.pop()
+            try: undo()
+            except (OSError, ValueError, AttributeError) as e: self.failed.append(f"restore {name}: {e}")
+        return False
+
+    def _affinity(self):
+        if os.name == "nt":
+            k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            k32.GetCurrentThread.restype = ctypes.c_void_p
+            k32.GetCurrentProcess.restype = ctypes.c_void_p
+            k32.SetThreadAffinityMask.restype = ctypes.c_size_t; k32.SetThreadAffinityMask.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+            k32.GetProcessAffinityMask.argtypes = (ctypes.c_void_p, ctypes.POINTER(ctypes.c_size_t), ctypes.POINTER(ctypes.c_size_t))
+            # 마스크는 프로세스가 속한 프로세서 그룹(최대 64코어) 기준이므로, os.cpu_count()가 아니라 프로세스 마스크에서 코어를 고릅니다.
+            process_mask, system_mask = ctypes.c_size_t(), ctypes.c_size_t()
+            if not k32.GetProcessAffinityMask(k32.GetCurrentProcess(), ctypes.byref(process_mask), ctypes.byref(system_mask)): raise ctypes.WinError(ctypes.get_last_error())
+            if not process_mask.value: raise OSError("프로세스가 여러 프로세서 그룹에 걸쳐 있어 코어 마스크를 정할 수 없습니다")
+            allowed = [i for i in range(process_mask.value.bit_length()) if process_mask.value >> i & 1]
+            cpu = allowed[-1] if self.cpu == FIDELITY_AUTO else self.cpu
+            if cpu not in allowed: raise ValueError(f"CPU {cpu}은(는) 허용된 코어 {allowed}에 없습니다 (프로세서 그룹 내 번호)")
+            handle = k32.GetCurrentThread(); prev = k32.SetThreadAffinityMask(handle, 1 << cpu)
+            if not prev: raise ctypes.WinError(ctypes.get_last_error())
+            return f"CPU {cpu}", lambda: k32.SetThreadAffinityMask(handle, prev)
+        allowed = os.sched_getaffinity(0) # Linux에서 0은 호출한 스레드
+        cpu = max(allowed) if self.cpu == FIDELITY_AUTO else self.cpu
+        if cpu not in allowed: raise ValueError(f"CPU {cpu}은(는) 허용된 코어 {sorted(allowed)}에 없습니다")
+        os.sched_setaffinity(0, {cpu})
+        return f"CPU {cpu}", lambda: os.sched_setaffinity(0, allowed)
+
+    def _timer(self):
+        if os.name == "nt":
+            winmm = ctypes.WinDLL("winmm")
+            if winmm.timeBeginPeriod(1) != 0: raise OSError("timeBeginPeriod(1) 실패")
+            return "timer 1 ms (timeBeginPeriod)", lambda: winmm.timeEndPeriod(1)
+        if not sys.platform.startswith("linux"): raise OSError("이 플랫폼에서는 타이머 해상도를 조정할 수 없습니다")
+        libc = ctypes.CDLL(None, use_errno=True); PR_SET_TIMERSLACK, PR_GET_TIMERSLACK = 29, 30
+        prev = libc.prctl(PR_GET_TIMERSLACK, 0, 0, 0, 0)
+        if prev < 0 or libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(1), 0, 0, 0) != 0: raise OSError(ctypes.get_errno(), "prctl(PR_SET_TIMERSLACK) 실패")
+        return f"timer slack 1 ns (was {prev:,} ns)", lambda: libc.prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(prev), 0, 0, 0)
+
+    def _priority(self):
+        thread = QThread.currentThread(); prev = thread.priority()
+        if prev == QThread.InheritPriority: prev = QThread.NormalPriority # 실행 중인 스레드에는 InheritPriority를 다시 지정할 수 없음
+        thread.setPriority(QThread.TimeCriticalPriority)
+        return "QThread TimeCritical", lambda: thread.setPriority(prev)
+
+    def _realtime(self):
+        if not hasattr(os, "sched_setscheduler"): return None, None # Windows는 TimeCritical 우선순위가 최상위
+        policy, param = os.sched_getscheduler(0), os.sched_getparam(0)
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.FIFO_PRIORITY))
+        return f"SCHED_FIFO {self.FIFO_PRIORITY}", lambda: os.sched_setscheduler(0, policy, param)
+
+    def _switch(self):
+        with FidelityWindow._lock:
+            if FidelityWindow._depth == 0: FidelityWindow._switch_interval = sys.getswitchinterval(); sys.setswitchinterval(self.SWITCH_INTERVAL_S)
+            FidelityWindow._depth += 1
+        def undo():
+            with FidelityWindow._lock:
+                FidelityWindow._depth -= 1
+                if FidelityWindow._depth == 0: sys.setswitchinterval(FidelityWindow._switch_interval)
+        return f"GIL switch {self.SWITCH_INTERVAL_S * 1e6:.0f} us", undo
+
+def _optional_numpy():
+    """NumPy가 설치되어 있으면 모듈을, 없으면 None을 반환합니다 (선택적 의존성)."""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+class IntervalRing:
+    """
+    간격(ns) 기록용 단일 생산자/단일 소비자 순환 버퍼.
+    - 미리 할당된 array('q')에 값을 쓰고, 단조 증가하는 쓰기 커서(write_count)를 그 다음에 갱신합니다.
+      생산자만 커서를 갱신하므로 잠금 없이 소비자가 커서까지의 구간을 읽을 수 있습니다.
+    - 읽기는 memoryview 구간(최대 2개)으로 복사 없이 제공되며, 한 바퀴 이상 뒤처진 구간은 덮어쓰여 읽을 수 없습니다.
+    - spill_path를 지정하면 버퍼가 한 바퀴 찰 때마다 파일에 덧붙여 무제한 길이의 측정을 보존합니다.
+    """
+    stride = 1 # 항목 하나가 차지하는 int64 칸 수
+
+    def __init__(self, capacity: int, spill_path: Optional[str] = None):
+        self.capacity = max(1, int(capacity))
+        self._buf = array("q", bytes(8 * self.capacity * self.stride))
+        self._view = memoryview(self._buf)
+        self.write_count = 0
+        self.spill_path = spill_path
+        self._spill = open(spill_path, "wb") if spill_path else None
+        self.spilled = 0 # 파일로 내보낸 값의 개수 (항상 capacity의 배수)
+
+    def append(self, value: int) -> Optional[int]:
+        """생산자 전용. 값을 기록한 뒤 커서를 증가시킵니다. 버퍼가 가득 차 있었다면 덮어쓴 값을 반환합니다."""
+        count = self.write_count; i = count % self.capacity
+        evicted = self._buf[i] if count >= self.capacity else None
+        self._buf[i] = value
+        self.write_count = count + 1
+        if self._spill is not None and (count + 1) % self.capacity == 0:
+            self._spill.write(self._view); self.spilled += self.capacity
+        return evicted
+
+    def __len__(self) -> int: return self.write_count
+
+    def oldest(self) -> int:
+        """메모리에 남아 있는 가장 오래된 값의 순번."""
+        return max(0, self.write_count - self.capacity)
+
+    def views(self, start: Optional[int] = None, end: Optional[int] = None) -> List[memoryview]:
+        """순번 [start, end) 구간을 복사 없이 memoryview 목록으로 반환합니다. 덮어쓰인 앞부분은 잘려 나갑니다."""
+        end = self.write_count if end is None else min(end, self.write_count)
+        start = self.oldest() if start is None else max(start, self.oldest())
+        if start >= end: return []
+        a, b = start % self.capacity, end % self.capacity or self.capacity
+        k = self.stride
+        if end - start <= self.capacity - a: return [self._view[a * k:(a + end - start) * k]]
+        return [self._view[a * k:], self._view[:b * k]]
+
+    def latest(self, n: int) -> List[memoryview]:
+        return self.views(self.write_count - n)
+
+    def tolist(self, start: Optional[int] = None, end: Optional[int] = None) -> List[int]:
+        out: List[int] = []
+        for v in self.views(start, end): out.extend(v.tolist())
+        return out
+
+    def as_numpy(self, start: Optional[int] = None, end: Optional[int] = None):
+        """NumPy가 있으면 구간을 ndarray로 반환합니다 (구간이 연속이면 복사 없음). 없으면 None."""
+        np = _optional_numpy()
+        if np is None: return None
+        parts = [np.frombuffer(v, dtype=np.int64) for v in self.views(start, end)]
+        if not parts: return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def all_values(self) -> array:
+        """파일로 내보낸 값과 메모리에 남은 값을 합쳐 전체 기록을 array('q')로 반환합니다 (값마다 Python 정수 객체를 만들지 않음)."""
+        values = array("q")
+        if self.spilled:
+            if self._spill is not None: self._spill.flush()
+            with open(self.spill_path, "rb") as f: values.frombytes(f.read(self.spilled * 8))
+        for view in self.views(self.spilled or None): values.frombytes(view.cast("B"))
+        return values
+
+    def close(self):
+        if self._spill is not None: self._spill.close(); self._spill = None
+
+class PacketRing(IntervalRing):
+    """
+    캡처 파일로 보낼 패킷 기록용 순환 버퍼.
+    - 레코드 하나는 int64 타임스탬프와 (선택) XINPUT_STATE 16바이트로, 캡처 파일의 레코드 배치와 동일합니다.
+    - 상태는 memmove로 버퍼에 직접 복사되므로 패킷마다 bytes 객체를 만들지 않습니다.
+    """
+    def __init__(self, capacity: int, with_states: bool = True):
+        self.stride = 3 if with_states else 1
+        super().__init__(capacity)
+        self._base = self._buf.buffer_info()[0]
+
+    def append_packet(self, ts_ns: int, state: XINPUT_STATE):
+        """생산자 전용. 타임스탬프와 상태를 기록한 뒤 커서를 증가시킵니다."""
+        count = self.write_count; i = (count % self.capacity) * self.stride
+        self._buf[i] = ts_ns
+        if self.stride == 3: ctypes.memmove(self._base + (i + 1) * 8, ctypes.addressof(state), ctypes.sizeof(XINPUT_STATE))
+        self.write_count = count + 1
+
+# ----- 캡처 파일 형식 (.gpcap) -----
+# [헤더] 매직(6) | 형식 버전(u16) | 플래그(u16) | 메타데이터 길이(u32) | 메타데이터(JSON, UTF-8, 8바이트 정렬 공백 패딩)
+# [레코드] int64 타임스탬프(ns) [+ XINPUT_STATE 16바이트 (dwPacketNumber + XINPUT_GAMEPAD)] 반복, 리틀 엔디언
+# 레코드 수는 파일 크기로부터 계산하므로 측정 도중 비정상 종료되어도 그때까지의 기록을 읽을 수 있습니다.
+CAPTURE_MAGIC = b"GPCAP\0"
+CAPTURE_FORMAT_VERSION = 1
+CAPTURE_FLAG_STATES = 0x0001
+_CAPTURE_HEADER = struct.Struct("<6sHHI")
+
+class CaptureWriter:
+    """측정 중 패킷 레코드를 캡처 파일에 순차적으로 덧붙이는 스트리밍 기록기."""
+    def __init__(self, path: str, metadata: dict, with_states: bool = True):
+        self.path = path; self.with_states = with_states
+        self.stride = 3 if with_states else 1
+        self.records = 0
+        meta = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+        meta += b" " * (-(_CAPTURE_HEADER.size + len(meta)) % 8)
+        self._f = open(path, "wb", buffering=1 << 20)
+        self._f.write(_CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_FORMAT_VERSION, CAPTURE_FLAG_STATES if with_states else 0, len(meta)))
+        self._f.write(meta)
+
+    def write_views(self, views: List[memoryview]):
+        """PacketRing.views()가 반환한 구간을 그대로 기록합니다."""
+        for v in views: self._f.write(v); self.records += len(v) // self.stride
+
+    def close(self):
+        if self._f is not None: self._f.close(); self._f = None
+
+class CaptureReader:
+    """
+    mmap 기반 캡처 파일 판독기. 파일 전체를 읽지 않고 매핑하므로 대용량 캡처도 즉시 열립니다.
+    - NumPy가 있으면 타임스탬프를 복사 없이 ndarray 뷰로, 없으면 memoryview로 제공합니다.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _CAPTURE_HEADER.size: self._file.close(); raise ValueError(f"캡처 파일이 아닙니다: {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, meta_len = _CAPTURE_HEADER.unpack_from(self._mm, 0)
+        if magic != CAPTURE_MAGIC or version > CAPTURE_FORMAT_VERSION:
+            self.close(); raise ValueError(f"지원하지 않는 캡처 파일입니다: {path}")
+        self.metadata: dict = json.loads(self._mm[_CAPTURE_HEADER.size:_CAPTURE_HEADER.size + meta_len].decode("utf-8"))
+        self.with_states = bool(flags & CAPTURE_FLAG_STATES)
+        self.stride = 3 if self.with_states else 1
+        self._data_offset = _CAPTURE_HEADER.size + meta_len
+        self.count = (size - self._data_offset) // (8 * self.stride) # 잘린 마지막 레코드는 무시
+        self._raw = memoryview(self._mm)
+        self._words = self._raw[self._data_offset:self._data_offset + self.count * 8 * self.stride].cast("q")
+
+    def __len__(self) -> int: return self.count
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def timestamps(self):
+        """모든 레코드의 타임스탬프(ns). NumPy ndarray 뷰 또는 memoryview."""
+        np = _optional_numpy()
+        if np is not None: return np.frombuffer(self._mm, dtype=np.int64, count=self.count * self.stride, offset=self._data_offset)[::self.stride]
+        return self._words[::self.stride]
+
+    def intervals_ns(self):
+        """PollingThread와 같은 규칙(1µs 이하 간격 제외)으로 간격(ns)을 계산합니다."""
+        ts = self.timestamps()
+        np = _optional_numpy()
+        if np is not None:
+            d = np.diff(ts); del ts
+            return d[d > 1000]
+        ts = ts.tolist()
+        return [b - a for a, b in zip(ts, ts[1:]) if b - a > 1000]
+
+    def state(self, i: int) -> XINPUT_STATE:
+        """i번째 레코드의 XINPUT_STATE 사본."""
+        if not self.with_states: raise ValueError("이 캡처에는 패킷 상태가 기록되어 있지 않습니다.")
+        return XINPUT_STATE.from_buffer_copy(self._mm, self._data_offset + i * 24 + 8)
+
+    def close(self):
+        for view in (getattr(self, "_words", None), getattr(self, "_raw", None)):
+            if view is not None: view.release()
+        try: self._mm.close()
+        except (BufferError, AttributeError): pass # 외부에 남은 NumPy 뷰가 해제될 때 함께 정리됨
+        self._file.close()
+
+def report_path_for_capture(capture_path: str) -> str:
+    """캡처 파일 경로에 대응하는 텍스트 리포트 경로 (Capture_*.gpcap → Report_*.txt)."""
+    folder, name = os.path.split(os.path.splitext(capture_path)[0])
+    if name.startswith("Capture_"): name = "Report_" + name[len("Capture_"):]
+    return os.path.join(folder, name + ".txt")
+
+def export_capture_to_text(capture_path: str, txt_path: str, sampler: Optional[dict] = None) -> dict:
+    """캡처 파일로부터 텍스트 리포트를 생성합니다."""
+    with CaptureReader(capture_path) as cap:
+        device = cap.metadata.get("device", ""); intervals = cap.intervals_ns()
+    return write_text_report(txt_path, intervals, device, sampler)
+
+# 샘플러 폴링 주기가 장치 패킷 주기의 이 배수보다 낮으면 언더샘플링으로 봅니다.
+KEEPUP_MIN_X = 2.0
+# 패킷 번호 누락률(%)이 이 값을 넘으면 경고합니다. 폴링 주기가 충분해도 수집 스레드가 멈추면(GIL, 스케줄링) 생기므로 언더샘플링과 따로 봅니다.
+MISSED_MAX_PCT = 2.0
+
+def sampler_keepup(stats: dict, sampler: dict) -> Optional[float]:
+    """샘플러 폴링 주기(poll_hz)가 장치 중앙값 폴링레이트의 몇 배인지 반환합니다. 커널 타임스탬프/이벤트 측정은 None."""
+    poll_hz, device_hz = sampler.get("poll_hz"), stats.get("median_hz")
+    return poll_hz / device_hz if poll_hz and device_hz else None
+
+def is_undersampled(stats: dict, sampler: dict) -> bool:
+    """샘플러 폴링 주기가 장치 주기의 KEEPUP_MIN_X배에 못 미치면 True."""
+    keepup = sampler_keepup(stats, sampler)
+    return keepup is not None and keepup < KEEPUP_MIN_X
+
+def has_missed_packets(sampler: dict, max_pct: float = MISSED_MAX_PCT) -> bool:
+    """폴링 사이에 지나가 버린 패킷(패킷 번호 차이)의 비율이 max_pct(%)를 넘으면 True."""
+    return (sampler.get("missed_pct") or 0) > max_pct
+
+# 간격 분산 중 샘플러의 시각 양자화가 차지하는 비율(%)이 이 값을 넘으면, 안정도/표준편차는 장치보다 PC(샘플러)를 반영한다고 봅니다.
+SAMPLER_NOISE_MAX_PCT = 50.0
+
+def measurement_confidence(stats: dict, sampler: dict) -> dict:
+    """
+    측정값의 95% 신뢰 구간과 샘플러가 결과에 섞은 불확실성을 추정합니다.
+    - resolution_ms: 간격 하나의 시각 분해능. 직접 폴링은 실제 폴링 루프 주기(패킷은 두 폴링 사이 어딘가에서 도착), 커널 타임스탬프/이벤트는 클럭 해상도입니다.
+      간격은 양 끝 시각의 오차(각각 0~분해능 균등)의 차이를 가지므로 간격 하나의 오차는 ±분해능, 표준편차는 분해능/√6입니다.
+    - mean_hz_ci: 평균 간격의 표본 오차(1.96·σ/√n)에 양 끝 시각의 양자화(분해능/n)를 더한 구간을 Hz로 환산
+    - median_hz_ci: 순서 통계량으로 구한 중앙값 신뢰 구간(analyze_intervals의 median_ci_ms)을 Hz로 환산. 증분 스냅샷에는 없습니다.
+    - sampler_noise_pct: 관측된 간격 분산 중 샘플러 양자화 분산(분해능²/6)의 비율. SAMPLER_NOISE_MAX_PCT를 넘으면 sampler_limited입니다.
+    """
+    n, mu, sigma = stats.get("samples", 0), stats.get("mean_ms"), stats.get("stdev_ms")
+    if n < 10 or not mu or sigma is None: return {}
+    if sampler.get("poll_hz"): res_ms = 1000.0 / sampler["poll_hz"]
+    else: res_ms = max(sampler.get("clock_res_ns") or 1, 1) / 1_000_000.0
+    half = 1.96 * sigma / math.sqrt(n) + res_ms / n
+    noise_pct = min(100.0, res_ms * res_ms / 6.0 / (sigma * sigma) * 100.0) if sigma > 0 else 0.0 # 분산이 없으면 샘플러가 섞은 분산도 없음
+    result = {"resolution_ms": res_ms, "mean_hz_ci": (1000.0 / (mu + half), 1000.0 / (mu - half) if mu > half else math.inf),
+              "sampler_noise_pct": noise_pct, "sampler_limited": noise_pct > SAMPLER_NOISE_MAX_PCT}
+    if stats.get("median_ci_ms"):
+        lo, hi = stats["median_ci_ms"]; result["median_hz_ci"] = (1000.0 / hi if hi > 0 else 0.0, 1000.0 / lo if lo > 0 else math.inf)
+    return result
+
+def write_combined_report(path: str, rows: List[Tuple[str, dict, dict]]) -> None:
+    """다중 장치 측정의 통합 요약 리포트. rows는 (장치명, 분석 결과, 샘플러 정보) 목록입니다."""
+    out = ["Gamepad Polling Rate Test Report (Multi-Device)\n" + "="*40 + "\n", f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", f"Devices: {len(rows)}\n" + "="*40 + "\n\n"]
+    out.append("[Devices]\n" + f"  {'Device':<28}{'Samples':>9}{'Mean Hz':>10}{'Median Hz':>11}{'Stab %':>8}{'P99 ms':>9}{'Poll Hz':>10}{'Keep-up':>9}{'Missed %':>10}\n")
+    for device, stats, sampler in rows:
+        p99 = stats.get("percentiles_ms", {}).get(99.0, 0.0); keepup = sampler_keepup(stats, sampler)
+        out.append(f"  {device[:27]:<28}{stats.get('samples', 0):>9,}{stats.get('mean_hz', 0):>10.2f}{stats.get('median_hz', 0):>11.2f}{stats.get('stability_pct', 0):>8.1f}{p99:>9.4f}"
+                   f"{sampler.get('poll_hz') or 0:>10.1f}{(f'{keepup:.2f}x' if keepup is not None else '-'):>9}{sampler.get('missed_pct', 0):>10.2f}"
+                   + ("  UNDERSAMPLED" if is_undersampled(stats, sampler) else "") + ("  MISSED" if has_missed_packets(sampler) else "") + "\n")
+    with open(path, "w", encoding="utf-8") as f: f.write("".join(out))
+
+def write_soak_report(path: str, rows: List[Tuple[str, SoakAggregator, dict]]) -> None:
+    """내구 측정 리포트. rows는 (장치명, 구간 집계기, 샘플러 정보) 목록이며 장치별 요약과 분 단위 추이를 기록합니다."""
+    out = ["Gamepad Soak Test Report\n" + "="*40 + "\n", f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", f"Devices: {len(rows)}\n" + "="*40 + "\n\n"]
+    for device, soak, sampler in rows:
+        s = soak.summary(); worst = s["worst_minute"]
+        out += [f"[{device}]\n", f"  Duration: {s['seconds']:,} s ({s['seconds'] / 60:.1f} min)\n", f"  Samples: {s['samples']:,}\n", f"  Average Rate: {s['rate_hz']:.2f} Hz\n"]
+        out.append(f"  Stability (per-second, sample-weighted): {s['stability_pct']:.2f}%\n" if s["stability_pct"] is not None else "  Stability: -\n")
+        out += [f"  Max Gap: {s['max_gap_ms']:.4f} ms\n", f"  Disconnects: {s['disconnects']:,}\n"]
+        if worst is not None: out.append(f"  Worst Minute: #{worst[0] + 1} at {worst[2]:.2f} Hz (max gap {worst[4] / 1e6:.4f} ms)\n")
+        if s["drift_pct"] is not None: out.append(f"  Rate Drift (first vs last {SoakAggregator.DRIFT_MINUTES} min): {s['drift_pct']:+.2f}%\n")
+        if "packets_seen" in sampler: out.append(f"  Missed Packets: {sampler.get('packets_missed', 0):,} ({sampler.get('missed_pct', 0):.2f}%)\n")
+        out += format_fidelity_lines(sampler)
+        out.append(f"  Minute Log: {soak.log_path or '-'}\n  Raw Capture: {sampler.get('capture') or 'not recorded'}\n\n")
+        out.append(f"[Per-Minute: {device}]" + (f" (last {len(soak.minutes)} minutes)" if soak.minutes and soak.minutes[0][0] else "") + "\n")
+        out.append(f"  {'Minute':>6}{'Samples':>10}{'Rate Hz':>10}{'Stab %':>8}{'Max Gap ms':>12}{'Disc':>6}\n")
+        out += [f"  {m[0] + 1:>6}{m[1]:>10,}{m[2]:>10.2f}{('-' if m[3] is None else f'{m[3]:.1f}'):>8}{m[4] / 1e6:>12.4f}{m[5]:>6}\n" for m in soak.minutes]
+        out.append("\n")
+    with open(path, "w", encoding="utf-8") as f: f.write("".join(out))
+
+def write_latency_report(path: str, latencies_ns, device: str, sampler: dict) -> dict:
+    """입력 지연 측정 리포트. 자극(진동)부터 응답이 반영된 첫 패킷까지의 지연 분포와 원본 값을 기록하고 분석 결과를 반환합니다."""
+    stats = analyze_intervals(latencies_ns)
+    out = ["Gamepad Input Latency Report\n" + "="*40 + "\n", f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n", f"Device: {device}\n",
+           f"Method: vibration stimulus -> first packet with {sampler.get('response_button', '')} pressed\n" + "="*40 + "\n\n"]
+    out += ["[Summary]\n", f"  Events: {len(latencies_ns):,} / {sampler.get('latency_stimuli', 0):,} stimuli\n", f"  Timeouts: {sampler.get('latency_timeouts', 0):,}\n",
+            f"  False Starts: {sampler.get('latency_false_starts', 0):,}\n", f"  Mean Latency: {stats.get('mean_ms', 0):.3f} ms\n", f"  Median Latency: {stats.get('median_ms', 0):.3f} ms\n"]
+    if "percentiles_ms" in stats:
+        out += [f"  Min / Max: {stats['min_ms']:.4f} / {stats['max_ms']:.4f} ms\n", f"  Std Dev: {stats['stdev_ms']:.4f} ms\n"]
+        out += [f"  P{q:g}: {v:.4f} ms\n" for q, v in stats["percentiles_ms"].items()]
+        edges, counts = stats["histogram"]
+        out.append("\n[Histogram (ms)]\n"); out += [f"  {edges[i]:.4f} - {edges[i + 1]:.4f}: {c:,}\n" for i, c in enumerate(counts) if c]
+    out += ["\n[Sampler]\n", f"  Strategy: {sampler.get('sampler')}\n", f"  Stimulus Call: {sampler.get('stimulus_call_us', 0):.1f} us avg\n"]
+    if sampler.get("poll_hz"): out.append(f"  Poll Rate: {sampler['poll_hz']:.1f} Hz (timestamp resolution {1000.0 / sampler['poll_hz']:.4f} ms)\n")
+    out.append(f"  Timer Floor: {sampler.get('timer_floor_us', 0):.1f} us\n"); out += format_fidelity_lines(sampler); out.append("\n[Raw Latency Data (ms)]\n")
+    with open(path, "w", encoding="utf-8") as f: f.write("".join(out)); f.write(format_interval_lines(latencies_ns))
+    return stats
+
+def format_sampler_report(report: dict) -> str:
+    """샘플러 자체 오버헤드 정보를 한 줄 요약 문자열로 변환합니다."""
+    if not report.get("sampler"): return ""
+    parts = [f"샘플링: {SAMPLER_STRATEGIES.get(report['sampler'], report['sampler'])}"]
+    if report.get("loop_us") is not None: parts.append(f"루프 {report['loop_us']:.1f}µs")
+    if report.get("cpu_pct") is not None: parts.append(f"CPU {report['cpu_pct']:.0f}%")
+    if report.get("timer_floor_us") is not None: parts.append(f"타이머 하한 {report['timer_floor_us']:.0f}µs")
+    if report.get("loop_max_us") is not None: parts.append(f"최대 루프 {report['loop_max_us']:.0f}µs")
+    keepup = sampler_keepup(report, report)
+    if keepup is not None: parts.append(f"여유 {keepup:.1f}×")
+    if report.get("missed_pct"): parts.append(f"누락 {report['missed_pct']:.1f}%")
+    if report.get("call_us") is not None: parts.append(f"호출 {report['call_us']:.1f}µs")
+    if report.get("fidelity"):
+        cores = [a for a in report.get("fidelity_applied") or () if a.startswith("CPU")]
+        parts.append("고정밀" + (f" ({', '.join(cores)})" if cores else "") + (" ⚠ 일부 실패" if report.get("fidelity_failed") else ""))
+    conf = measurement_confidence(report, report) if "latency_stimuli" not in report else {}
+    if conf: lo, hi = conf["mean_hz_ci"]; parts.append(f"평균 ±{(hi - lo) / 2:.2f}Hz" + (" · 지터 대부분이 샘플러 몫" if conf["sampler_limited"] else ""))
+    if is_undersampled(report, report): parts.append("⚠ 언더샘플링")
+    if has_missed_packets(report): parts.append("⚠ 패킷 누락")
+    return " · ".join(parts)
+
+def format_soak_status(snap: dict) -> str:
+    """내구 측정 진행 상황(경과 시간, 최근 1초/1분 폴링레이트, 최대 간격, 연결 끊김)을 한 줄로 요약합니다."""
+    elapsed = int(snap.get("soak_elapsed_s", 0)); parts = [f"내구 {elapsed // 3600}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}", f"최근 1초 {snap.get('soak_second_hz', 0):,}Hz"]
+    if snap.get("soak_minute_hz") is not None: parts.append(f"최근 1분 {snap['soak_minute_hz']:.1f}Hz")
+    parts += [f"최대 간격 {snap.get('soak_max_gap_ms', 0):.2f}ms", f"끊김 {snap.get('soak_disconnects', 0)}"]
+    return " · ".join(parts)
+
+def format_device_summary(rows: List[Tuple[str, dict]]) -> str:
+    """다중 장치 측정의 통합 보기: 장치별 스냅샷을 한 줄씩 요약합니다."""
+    lines = []
+    for device, snap in rows:
+        line = f"{device}: {snap.get('median_hz') or 0:.1f}Hz · 안정도 {snap.get('stability_pct') or 0:.1f}% · {snap.get('samples', 0):,}개"
+        keepup = sampler_keepup(snap, snap)
+        if keepup is not None: line += f" · 여유 {keepup:.1f}×"
+        if snap.get("missed_pct"): line += f" · 누락 {snap['missed_pct']:.1f}%"
+        if is_undersampled(snap, snap) or has_missed_packets(snap): line += " ⚠"
+        lines.append(line)
+    return "\n".join(lines)
 
 class PollingThread(QThread):
     """
     별도 스레드에서 컨트롤러 입력을 지속적으로 폴링하여 입력 간 시간 간격을 측정합니다.
     - 메인 GUI 스레드의 블로킹을 방지하기 위해 QThread를 상속받아 사용합니다.
     - threading.Event를 통해 외부에서 안전하게 스레드를 종료시킬 수 있습니다.
+    - 측정 파이프라인의 1단계(수집)로서 간격을 순환 버퍼에 기록만 하며, 통계 계산과 보고는 AnalysisThread가 담당합니다.
+    - 폴링 경로는 미리 할당한 세 StateBuffer를 돌려 쓰고(삼중 버퍼) 새 패킷일 때만 참조를 교체하므로, 폴링마다 상태 객체나 바이트열을 만들지 않습니다.
     """
-    statsUpdated = Signal(dict)
     deviceError = Signal(str)
     measurementFinished = Signal()
 
-    def __init__(self, device_index: int, max_samples: int = 1000, include_gyro: bool = False):
+    # 하이브리드 전략: 이 시간 이상 입력 변화가 없으면 유휴 상태로 보고 타이머 하한만큼 잠듭니다.
+    IDLE_AFTER_NS = 100_000_000
+    SOAK_RING = 1 << 16       # 내구 측정의 간격 버퍼 크기 (분석 스레드가 따라잡을 여유만 있으면 됨)
+    RECONNECT_POLL_S = 0.25   # 내구 측정 중 연결이 끊겼을 때 재연결 확인 주기
+    SWAP_SEQ_MASK = 0x7F      # 교체 순번 범위 (CPython이 미리 만들어 둔 작은 정수 안에 머물러 할당이 없음)
+
+    def __init__(self, device_index: int, max_samples: int = 1000, include_gyro: bool = False, backend: Optional[InputBackend] = None, strategy: str = "hybrid", spill_path: Optional[str] = None,
+                 capture_path: Optional[str] = None, capture_meta: Optional[dict] = None, capture_states: bool = True, duration_s: Optional[float] = None, gc_mode: str = "freeze",
+                 fidelity: Optional[int] = None):
         super().__init__()
         self.device_index = device_index
         self.max_samples = max(20, int(max_samples))
+        # 내구 측정: 샘플 수 대신 시간 예산으로 끝나며, 연결이 끊겨도 횟수만 세고 재연결을 기다립니다.
+        self.duration_ns = int(duration_s * 1e9) if duration_s else 0; self.deadline_ns = 0; self.disconnects = 0
         self.include_gyro = include_gyro
         self._stop = threading.Event()
-        self.xi = XInput()
-        self._lock = threading.Lock() # 스레드 간 데이터 공유를 위한 Lock
-        self._intervals_ns: Deque[int] = deque(maxlen=self.max_samples) # 통계 표시용 순환 버퍼
-        self._all_intervals_ns: List[int] = [] # 최종 리포트용 전체 데이터
-        self._last_state = XINPUT_STATE()
+        self.xi = backend if backend is not None else XInput()
+        if strategy not in SAMPLER_STRATEGIES: raise ValueError(f"알 수 없는 샘플링 전략: {strategy}")
+        # 이벤트 모드를 지원하지 않는 백엔드는 하이브리드로 대체합니다.
+        self.strategy = strategy if strategy != "event" or self.xi.supports_wait else "hybrid"
+        self.timer_info: dict = {}
+        self._loops = 0; self._loop_start_ns = 0; self._loop_end_ns = 0; self._cpu_start_ns = 0; self._cpu_end_ns = 0
+        self.loop_max_ns = 0           # 수집 루프 1회의 최대 소요 시간 (보고 작업에 의한 교란 여부 확인용)
+        self._expected_interval_ns = 0 # 관측된 패킷 간격의 지수 이동 평균 (하이브리드 수면 예측용)
+        self._last_seen_ns = 0         # 마지막으로 패킷 변화를 관측한 시각
+        self._prev_poll_ns = 0         # 다중 장치 측정에서 이 장치를 마지막으로 폴링한 시각
+        self.packets_seen = 0; self.packets_missed = 0 # 관측한 패킷 수와, 폴링 사이에 지나가 버린 패킷 수 (패킷 번호 차이)
+        self.disconnected = False
+        self.ring = IntervalRing(self.SOAK_RING if self.duration_ns else self.max_samples, spill_path) # 잠금 없이 GUI와 공유되는 간격 순환 버퍼
+        # 캡처 파일: 수집 스레드는 패킷 버퍼에 기록만 하고, 파일 쓰기는 분석 스레드가 담당합니다.
+        self.capture_path = capture_path; self.capture_meta = dict(capture_meta or {})
+        self.packets = PacketRing(1 << 16, capture_states) if capture_path else None
+        self.capture_writer: Optional[CaptureWriter] = None
+        # 삼중 버퍼: _bufs[_back]에 새 상태를 읽고, 새 패킷이면 교체하여 _last_state(전면, _bufs[_front])로 올립니다.
+        # 세 번째 버퍼 덕분에 방금 내려간 전면 버퍼는 한 번 더 교체된 뒤에야 다시 쓰이며, _swaps(교체 순번)로 GUI의 복사가 그 사이에 끝났는지 확인합니다.
+        self._bufs = (StateBuffer(), StateBuffer(), StateBuffer()); self._back = 0; self._front = 1
+        self._last_state = self._bufs[1].state
+        self._swaps = 0 # 0..SWAP_SEQ_MASK를 도는 교체 순번 (작은 정수라 증가해도 할당이 없음)
         self._last_change_ts_ns: Optional[int] = None
+        # 가비지 컬렉터 제어 (장시간 측정에서 수집을 멈추면 순환 참조 쓰레기가 쌓이므로 freeze로 대체)
+        self.gc = GcWindow("freeze" if gc_mode == "disable" and self.duration_ns else gc_mode)
+        self.fidelity = FidelityWindow(fidelity) # 고정밀 측정: None이면 끔, 아니면 고정할 코어 (FIDELITY_AUTO는 자동)
     
-    def snapshot_intervals_ns(self) -> List[int]:
-        with self._lock: return list(self._all_intervals_ns)
+    def snapshot_intervals_ns(self) -> array:
+        return self.ring.all_values()
+    def latest_state(self) -> Optional[Tuple[int, XINPUT_STATE]]:
+        """
+        수집 루프가 마지막으로 관측한 상태의 사본 (준비 전이면 None).
+        - 전면에서 내려간 버퍼는 다음 교체 때 후면이 되어 수집 스레드가 덮어쓰므로, 복사 전후의 교체 순번이 두 번 이상 달라졌다면
+          반쯤 쓰인 상태를 읽었을 수 있습니다. 이 경우 다시 복사합니다 (복사가 패킷 두 개 간격보다 오래 걸릴 때만 재시도).
+        - 호출자가 오래 들고 있어도 값이 바뀌지 않도록 복사해서 돌려줍니다.
+        """
+        if not self._loop_start_ns: return None
+        while True:
+            seq = self._swaps
+            state = XINPUT_STATE.from_buffer_copy(self._last_state)
+            if (self._swaps - seq) & self.SWAP_SEQ_MASK < 2: break
+        return (ERROR_DEVICE_NOT_CONNECTED if self.disconnected else ERROR_SUCCESS), state
     def stop(self): self._stop.set()
+
+    def _mark_overhead(self):
+        """측정 스레드에서 호출하여 경과 시간과 스레드 CPU 시간을 기록합니다 (thread_time_ns는 호출 스레드 기준)."""
+        self._loop_end_ns = time.perf_counter_ns(); self._cpu_end_ns = time.thread_time_ns()
+
+    def sampler_report(self) -> dict:
+        """사용된 샘플링 전략과 샘플러 자체 오버헤드(루프 주기, CPU 점유율, 타이머 해상도)를 반환합니다."""
+        wall_ns = self._loop_end_ns - self._loop_start_ns if self._loop_end_ns else 0
+        cpu_ns = self._cpu_end_ns - self._cpu_start_ns
+        report = {"sampler": self.strategy, "loops": self._loops,
+                  "loop_us": (wall_ns / self._loops / 1000.0) if self._loops and wall_ns > 0 else None,
+                  "cpu_pct": min(100.0, cpu_ns / wall_ns * 100.0) if wall_ns > 0 else None,
+                  "loop_max_us": self.loop_max_ns / 1000.0, "packets_seen": self.packets_seen, "packets_missed": self.packets_missed,
+                  "missed_pct": self.packets_missed / (self.packets_seen + self.packets_missed) * 100.0 if self.packets_seen else 0.0,
+                  "gc_mode": self.gc.mode, "gc_collections": self.gc.collections(), "gc_frozen": self.gc.frozen,
+                  "fidelity": self.fidelity.enabled, "fidelity_applied": list(self.fidelity.applied), "fidelity_failed": list(self.fidelity.failed)}
+        # 상태를 직접 폴링하는 경우에만 폴링 주기가 측정 정밀도를 결정합니다 (커널 타임스탬프/이벤트 방식은 무관).
+        if report["loop_us"] and not self.xi.kernel_timestamps and self.strategy != "event": report["poll_hz"] = 1e6 / report["loop_us"]
+        if self.timer_info:
+            report["timer_floor_us"] = self.timer_info["sleep_floor_ns"] / 1000.0
+            report["clock_res_ns"] = self.timer_info["clock_ns"]
+        if "call_ns" in self.timer_info:
+            cal = self.timer_info
+            report.update({"call_us": cal["call_ns"] / 1000.0, "call_p99_us": cal["call_p99_ns"] / 1000.0, "cal_loop_us": cal["loop_ns"] / 1000.0,
+                           "cal_loop_p99_us": cal["loop_p99_ns"] / 1000.0, "cal_stall_us": cal["loop_max_ns"] / 1000.0, "cal_loops": cal["calibration_loops"]})
+            if "poll_hz" in report and cal["loop_ns"]: report["cal_poll_hz"] = 1e9 / cal["loop_ns"] # 스핀 폴링으로 낼 수 있는 최대 폴링 주기
+        return report
+
+    def _idle(self, now_ns: int):
+        """전략에 따라 다음 폴링까지 대기합니다. 이벤트 전략은 백엔드 대기로 처리되므로 호출되지 않습니다."""
+        if self.strategy == "spin": return
+        floor_ns = self.timer_info.get("sleep_floor_ns", 1_000_000)
+        since_ns = now_ns - self._last_seen_ns
+        if since_ns >= self.IDLE_AFTER_NS:
+            time.sleep(floor_ns / 1e9); return # 유휴 상태: 정밀도가 필요 없으므로 CPU를 반납
+        # 다음 패킷 예상 시각보다 타이머 하한(+여유 25%)만큼 일찍 깨어나도록 잠들고, 그 이후에는 양보하거나 스핀합니다.
+        remaining_ns = self._expected_interval_ns - since_ns - self._expected_interval_ns // 4
+        if self._expected_interval_ns and remaining_ns > 2 * floor_ns: time.sleep((remaining_ns - floor_ns) / 1e9)
+        elif self.timer_info.get("yield_ns", 0) * 8 < self._expected_interval_ns: time.sleep(0) # 양보 비용이 간격에 비해 충분히 작을 때만 양보
     
+    def _swap(self):
+        """후면 버퍼(방금 읽은 상태)를 전면(_last_state)으로 올립니다. 참조 교체뿐이므로 할당이 없습니다."""
+        back = self._back; self._back = 3 - back - self._front; self._front = back
+        self._last_state = self._bufs[back].state; self._swaps = (self._swaps + 1) & self.SWAP_SEQ_MASK
+
+    def _poll_state(self) -> int:
+        """폴링 백엔드에서 후면 버퍼로 상태를 읽습니다."""
+        return self.xi.get_state_into(self.device_index, self._bufs[self._back])
+
+    def _on_packet(self, ts_ns: int, current_state: XINPUT_STATE) -> bool:
+        """패킷 목록(이벤트/커널 타임스탬프) 경로: 상태를 후면 버퍼로 복사한 뒤 _on_polled와 같이 처리합니다."""
+        self._bufs[self._back].raw[:] = memoryview(current_state).cast("B")
+        return self._on_polled(ts_ns)
+
+    def _on_polled(self, ts_ns: int) -> bool:
+        """
+        후면 버퍼에 새로 읽은 상태를 전면 버퍼와 비교하여 필요한 경우 간격을 기록합니다.
+        - 폴링 백엔드는 perf_counter_ns() 시각을, 커널 타임스탬프 백엔드는 이벤트 시각을 전달합니다.
+        - 패킷 번호가 그대로인 폴링(대부분의 반복)은 memoryview 비교 한 번으로 끝나며 아무것도 할당하지 않습니다.
+        - 목표 샘플 수에 도달하면 True를 반환합니다.
+        """
+        back = self._bufs[self._back]; front = self._bufs[self._front]
+        if back.packet == front.packet: return False
+        current_state = back.state
+        delta = (current_state.dwPacketNumber - self._last_state.dwPacketNumber) & 0xFFFFFFFF
+        self.packets_seen += 1
+        # 첫 패킷의 번호 차이는 측정 준비(샘플러 보정 등) 동안 지나간 패킷이므로 누락으로 세지 않습니다.
+        if 1 < delta < 0x10000 and self.packets_seen > 1: self.packets_missed += delta - 1
+        if self._last_seen_ns:
+            gap = ts_ns - self._last_seen_ns
+            if 0 < gap < self.IDLE_AFTER_NS:
+                self._expected_interval_ns = gap if not self._expected_interval_ns else (self._expected_interval_ns * 7 + gap) // 8
+        self._last_seen_ns = ts_ns
+        should_record = False
+        if self.include_gyro:
+            # 자이로(모션) 모드: 모든 패킷 변화를 측정
+            should_record = True
+        else:
+            # 표준 모드: 데드존 없이 모든 게임패드 입력값의 변화를 측정 (12바이트 뷰 비교)
+            if back.gamepad != front.gamepad:
+                should_record = True
+
+        finished = False
+        if should_record:
+            if self.packets is not None: self.packets.append_packet(ts_ns, current_state)
+            if self._last_change_ts_ns is not None:
+                dt = ts_ns - self._last_change_ts_ns
+                if dt > 1000:
+                    self.ring.append(dt)
+                    finished = not self.duration_ns and self.ring.write_count >= self.max_samples
+            self._last_change_ts_ns = ts_ns
+
+        # _swap()과 같음 (메서드 조회 할당을 피해 직접 교체). 순번은 전면 교체 후에 올려 GUI가 교체 전 순번으로 새 전면을 읽어도 재시도하지 않게 합니다.
+        idx = self._back; self._back = 3 - idx - self._front; self._front = idx
+        self._last_state = current_state; self._swaps = (self._swaps + 1) & self.SWAP_SEQ_MASK
+        return finished
+
+    def _prepare(self) -> Optional[str]:
+        """측정 시작 준비(장치 확인, 타이머 보정, 캡처 파일 생성). 실패 시 오류 메시지를 반환합니다."""
+        if self._poll_state() != ERROR_SUCCESS: return f"{self.xi.name} 포트 #{self.device_index + 1}에서 장치를 찾을 수 없습니다."
+        self._swap()
+        ids = self.xi.get_device_ids(self.device_index)
+        if ids and "vid_pid" not in self.capture_meta: self.capture_meta["vid_pid"] = f"{ids[0]:04X}:{ids[1]:04X}" # 결과 저장소에서 같은 모델끼리 묶는 키
+        if not self.timer_info: self.timer_info = calibrate_sampler(self.xi, self.device_index)
+        timestamped = self.xi.kernel_timestamps
+        if timestamped: self.xi.discard_packets(self.device_index) # 측정 시작 이전에 쌓인 패킷은 버림
+        # 커널 타임스탬프는 첫 패킷을 기준점으로 삼고, 폴링 방식은 측정 시작 시각을 기준점으로 삼습니다.
+        if self.strategy == "event": self._last_change_ts_ns = None
+        else: self._last_change_ts_ns = None if timestamped else time.perf_counter_ns()
+        if self.packets is not None:
+            meta = {"app_version": VERSION, "backend": self.xi.name, "device_index": self.device_index,
+                    "mode": "gyro" if self.include_gyro else "standard", "sampler": self.strategy,
+                    "timer": self.timer_info, "kernel_timestamps": timestamped or self.strategy == "event",
+                    "created": datetime.now().isoformat(timespec="seconds"), **self.capture_meta}
+            try: self.capture_writer = CaptureWriter(self.capture_path, meta, self.packets.stride == 3)
+            except OSError as e: return f"캡처 파일을 만들 수 없습니다: {e}"
+            # 폴링 방식의 첫 간격은 측정 시작 시각이 기준점이므로, 재분석 시 같은 간격이 나오도록 기준 레코드를 남깁니다.
+            if self._last_change_ts_ns is not None: self.packets.append_packet(self._last_change_ts_ns, self._last_state)
+        self._loop_start_ns = self._last_seen_ns = self._prev_poll_ns = time.perf_counter_ns(); self._cpu_start_ns = time.thread_time_ns()
+        self.deadline_ns = self._loop_start_ns + self.duration_ns if self.duration_ns else 0
+        return None
+
+    def _on_disconnect(self) -> bool:
+        """연결 끊김 처리. 내구 측정이면 횟수를 세고 재연결을 기다리며 계속하고(False), 아니면 오류를 알리고 종료합니다(True)."""
+        if not self.disconnected: self.disconnected = True; self.disconnects += 1
+        if self.duration_ns: time.sleep(self.RECONNECT_POLL_S); return False
+        self.deviceError.emit("장치 연결 끊어짐"); return True
+
+    def _on_reconnect(self, adopt: bool = False):
+        """재연결 직후의 상태(adopt이면 후면 버퍼)는 기준으로만 삼습니다 (패킷 번호가 새로 시작될 수 있음). 끊긴 동안의 공백은 다음 간격에 포함됩니다."""
+        self.disconnected = False
+        if adopt: self._swap()
+
     def run(self):
-        res, self._last_state = self.xi.get_state(self.device_index)
-        if res != ERROR_SUCCESS: self.deviceError.emit("XInput 장치를 찾을 수 없습니다."); return
-        self._last_change_ts_ns = time.perf_counter_ns()
-        last_report_time_ns = time.perf_counter_ns()
+        with self.gc, self.fidelity: self._run()
+
+    def _run(self):
+        error = self._prepare()
+        if error: self.deviceError.emit(error); return
+        timestamped = self.xi.kernel_timestamps
+        last_mark_ns = prev_ns = self._loop_start_ns
+        # PySide QObject의 메서드 조회는 매번 새 바운드 메서드(GC 추적 객체)를 만들므로, 매 반복 부르는 메서드는 루프 밖에서 한 번만 조회합니다.
+        poll_state, on_polled, idle = self._poll_state, self._on_polled, self._idle
 
         while not self._stop.is_set():
-            res, current_state = self.xi.get_state(self.device_index)
-            if res != ERROR_SUCCESS: self.deviceError.emit("장치 연결 끊어짐"); break
-            now_ns = time.perf_counter_ns()
-
-            if current_state.dwPacketNumber != self._last_state.dwPacketNumber:
-                
-                should_record = False
-                if self.include_gyro:
-                    # 자이로(모션) 모드: 모든 패킷 변화를 측정
-                    should_record = True
-                else:
-                    # 표준 모드: 데드존 없이 모든 게임패드 입력값의 변화를 측정
-                    gamepad_changed = (ctypes.string_at(ctypes.byref(current_state.Gamepad), ctypes.sizeof(XINPUT_GAMEPAD)) != ctypes.string_at(ctypes.byref(self._last_state.Gamepad), ctypes.sizeof(XINPUT_GAMEPAD)))
-                    if gamepad_changed:
-                        should_record = True
-
-                if should_record:
-                    dt = now_ns - self._last_change_ts_ns
-                    if dt > 1000:
-                        with self._lock: 
-                            self._intervals_ns.append(dt)
-                            self._all_intervals_ns.append(dt)
-                            if len(self._all_intervals_ns) >= self.max_samples:
-                                self.statsUpdated.emit(compute_polling_stats(list(self._intervals_ns)))
-                                self.measurementFinished.emit()
-                                break
-                    self._last_change_ts_ns = now_ns
-
-                self._last_state = current_state
+            finished = False
+            if self.deadline_ns and time.perf_counter_ns() >= self.deadline_ns: self._mark_overhead(); self.measurementFinished.emit(); break
+            if self.strategy == "event":
+                res, packets = self.xi.wait_packets(self.device_index, 0.05)
+                if res != ERROR_SUCCESS:
+                    if self._on_disconnect(): break
+                    continue
+                if self.disconnected: self._on_reconnect()
+                now_ns = time.perf_counter_ns()
+                for ts_ns, current_state in packets:
+                    if self._on_packet(ts_ns, current_state): finished = True; break
+                if not packets and self.xi.stream_ended(self.device_index): finished = True # 녹화 파일·재생할 캡처를 모두 전달함
+            elif timestamped:
+                res, packets = self.xi.read_packets(self.device_index)
+                if res != ERROR_SUCCESS:
+                    if self._on_disconnect(): break
+                    continue
+                if self.disconnected: self._on_reconnect()
+                for ts_ns, current_state in packets:
+                    if self._on_packet(ts_ns, current_state): finished = True; break
+                if not packets and self.xi.stream_ended(self.device_index): finished = True # 녹화 파일·재생할 캡처를 모두 전달함
+                now_ns = time.perf_counter_ns()
+            else:
+                res = poll_state()
+                if res != ERROR_SUCCESS:
+                    if self._on_disconnect(): break
+                    continue
+                if self.disconnected: self._on_reconnect(True)
+                now_ns = time.perf_counter_ns()
+                finished = on_polled(now_ns)
+            self._loops += 1
+            if now_ns - prev_ns > self.loop_max_ns: self.loop_max_ns = now_ns - prev_ns
+            prev_ns = now_ns
+
+            if finished:
+                self._mark_overhead()
+                self.measurementFinished.emit()
+                break
             
-            if now_ns - last_report_time_ns >= 50_000_000:
-                last_report_time_ns = now_ns
-                with self._lock: intervals = list(self._intervals_ns)
-                self.statsUpdated.emit(compute_polling_stats(intervals))
+            if now_ns - last_mark_ns >= 50_000_000:
+                last_mark_ns = now_ns
+                self._mark_overhead()
             
-            time.sleep(0.0001)
+            if self.strategy != "event": idle(now_ns)
+
+        self._mark_overhead()
+        self.ring.close()
+
+class MultiPollingThread(QThread):
+    """
+    연결된 여러 장치를 하나의 수집 루프에서 번갈아 폴링하는 다중 장치 측정 스레드.
+    - 장치마다 PollingThread 인스턴스를 '채널'로 두어 간격 버퍼, 캡처 파일, 분석 파이프라인을 그대로 재사용합니다 (채널 스레드는 시작하지 않음).
+    - 모든 장치가 같은 루프를 공유하므로 장치별 폴링 주기와 패킷 번호 누락률을 기록하여 언더샘플링을 드러냅니다.
+    - 한 장치의 연결이 끊어져도 나머지 장치의 측정은 계속됩니다.
+    """
+    deviceError = Signal(str)
+    channelError = Signal(int, str)
+    measurementFinished = Signal()
+
+    def __init__(self, device_indices: List[int], max_samples: int = 1000, include_gyro: bool = False, backend: Optional[InputBackend] = None, strategy: str = "hybrid",
+                 capture_paths: Optional[List[Optional[str]]] = None, capture_meta: Optional[List[dict]] = None, capture_states: bool = True, duration_s: Optional[float] = None, gc_mode: str = "freeze",
+                 fidelity: Optional[int] = None):
+        super().__init__()
+        if not device_indices: raise ValueError("측정할 장치가 없습니다.")
+        if strategy not in SAMPLER_STRATEGIES: raise ValueError(f"알 수 없는 샘플링 전략: {strategy}")
+        self.xi = backend if backend is not None else XInput()
+        # 이벤트 전략은 장치 하나의 대기에 묶이므로 여러 장치를 번갈아 볼 때는 하이브리드로 대체합니다.
+        self.strategy = "hybrid" if strategy == "event" else strategy
+        paths = capture_paths or [None] * len(device_indices); metas = capture_meta or [{}] * len(device_indices)
+        self.channels = [PollingThread(idx, max_samples, include_gyro, backend=self.xi, strategy=self.strategy, capture_path=path, capture_meta=meta, capture_states=capture_states, duration_s=duration_s)
+                         for idx, path, meta in zip(device_indices, paths, metas)]
+        self.soak = bool(duration_s)
+        # 수집 루프는 이 스레드 하나이므로 GC 구간도 하나를 채널들이 공유합니다 (리포트의 수집 횟수가 같게 나옴).
+        self.gc = GcWindow("freeze" if gc_mode == "disable" and self.soak else gc_mode)
+        self.fidelity = FidelityWindow(fidelity)
+        for ch in self.channels: ch.gc = self.gc; ch.fidelity = self.fidelity
+        self._stop = threading.Event()
+
+    def stop(self): self._stop.set()
+
+    def _idle(self, now_ns: int, active: List[PollingThread], hot: dict):
+        """다음 패킷이 가장 먼저 올 것으로 예상되는 장치를 기준으로 대기합니다 (유휴 장치는 기준에서 제외)."""
+        if self.strategy == "spin": return
+        best = active[0]; best_ns = PollingThread.IDLE_AFTER_NS
+        for ch in active:
+            since_ns = now_ns - ch._last_seen_ns
+            remaining = ch._expected_interval_ns - since_ns if since_ns < ch.IDLE_AFTER_NS else ch.IDLE_AFTER_NS
+            if remaining < best_ns: best = ch; best_ns = remaining
+        hot[best.device_index][2](now_ns)
+
+    def run(self):
+        with self.gc, self.fidelity: self._run()
+
+    def _run(self):
+        timer_info = calibrate_sampler(self.xi, self.channels[0].device_index) # 채널들이 같은 백엔드와 스레드를 쓰므로 한 번만 보정
+        active: List[PollingThread] = []
+        for ch in self.channels:
+            ch.timer_info = timer_info; error = ch._prepare()
+            if error: self.channelError.emit(ch.device_index, error); ch.ring.close()
+            else: active.append(ch)
+        if not active: self.deviceError.emit("측정 가능한 장치가 없습니다."); return
+        timestamped = self.xi.kernel_timestamps
+        finished_count = 0; last_mark_ns = time.perf_counter_ns(); now_ns = last_mark_ns
+
+        deadline_ns = active[0].deadline_ns
+        # 채널 메서드는 QObject 조회 할당을 피하려고 미리 묶어 둡니다: 장치 인덱스 → (상태 읽기, 비교/기록, 대기)
+        hot = {ch.device_index: (ch._poll_state, ch._on_polled, ch._idle) for ch in active}; idle = self._idle
+        while active and not self._stop.is_set():
+            if deadline_ns and time.perf_counter_ns() >= deadline_ns: # 내구 측정의 시간 예산 소진
+                for ch in active: ch._mark_overhead(); ch.ring.close()
+                active.clear(); finished_count += 1; break
+            for ch in tuple(active):
+                finished = False
+                if timestamped:
+                    res, packets = self.xi.read_packets(ch.device_index)
+                    if res == ERROR_SUCCESS:
+                        for ts_ns, current_state in packets:
+                            if ch._on_packet(ts_ns, current_state): finished = True; break
+                        if not packets and self.xi.stream_ended(ch.device_index): finished = True # 녹화 파일·재생할 캡처를 모두 전달함
+                    now_ns = time.perf_counter_ns()
+                else:
+                    poll_state, on_polled, _ = hot[ch.device_index]
+                    res = poll_state()
+                    now_ns = time.perf_counter_ns()
+                    if res == ERROR_SUCCESS and not ch.disconnected: finished = on_polled(now_ns)
+                if res != ERROR_SUCCESS:
+                    if self.soak: # 내구 측정: 횟수만 세고 이 장치는 재연결될 때까지 건너뜀
+                        if not ch.disconnected: ch.disconnected = True; ch.disconnects += 1
+                        continue
+                    ch.disconnected = True; self.channelError.emit(ch.device_index, "장치 연결 끊어짐")
+                    ch._mark_overhead(); ch.ring.close(); active.remove(ch); continue
+                if ch.disconnected: ch._on_reconnect(not timestamped); continue
+                ch._loops += 1
+                if now_ns - ch._prev_poll_ns > ch.loop_max_ns: ch.loop_max_ns = now_ns - ch._prev_poll_ns
+                ch._prev_poll_ns = now_ns
+                if finished:
+                    ch._mark_overhead(); ch.ring.close(); active.remove(ch); finished_count += 1
+
+            if now_ns - last_mark_ns >= 50_000_000:
+                last_mark_ns = now_ns
+                for ch in active: ch._mark_overhead()
+            if active: idle(now_ns, active, hot)
+
+        for ch in active: ch._mark_overhead(); ch.ring.close()
+        if not active and not self._stop.is_set():
+            if finished_count: self.measurementFinished.emit()
+            else: self.deviceError.emit("모든 장치의 연결이 끊어졌습니다.")
+
+class LatencyProbeThread(PollingThread):
+    """
+    입력 지연(자극 → 첫 반영 패킷) 측정 스레드.
+    - 진동 모터 켜기(set_vibration)를 자극으로 삼고, 응답 버튼(response_mask)이 눌린 첫 패킷의 시각까지를 지연 한 건으로 기록합니다.
+      실제 장치는 진동을 감지해 버튼 입력을 넣는 루프백 장치(센서, 릴레이 등)가 필요하며, 시뮬레이션 백엔드는 설정된 지연 분포로 같은 동작을 재현합니다.
+    - 지연은 PollingThread의 간격 순환 버퍼에 기록되므로 AnalysisThread의 증분 통계와 그래프를 그대로 사용합니다.
+    - 응답 대기 중에는 스핀(하이브리드는 양보 포함) 폴링하며, 이벤트/커널 타임스탬프 백엔드는 패킷 자체의 시각을 사용합니다.
+    - 자극 시점이 장치 폴링 주기와 위상 고정되지 않도록 자극 사이에 무작위 대기를 둡니다.
+    """
+    GAP_S = (0.05, 0.15)     # 자극 사이 무작위 대기 범위
+    RESPONSE_TIMEOUT_S = 1.0 # 이 시간 안에 반영되지 않으면 무응답으로 집계
+    STIMULUS = (65535, 65535)
+
+    def __init__(self, device_index: int, events: int = 100, backend: Optional[InputBackend] = None, strategy: str = "hybrid",
+                 response_button: str = SIM_LOOPBACK_BUTTON, capture_meta: Optional[dict] = None, seed: Optional[int] = None, gc_mode: str = "freeze", fidelity: Optional[int] = None):
+        super().__init__(device_index, events, False, backend=backend, strategy=strategy, capture_meta=capture_meta, gc_mode=gc_mode, fidelity=fidelity)
+        if response_button not in BUTTON_MASKS: raise ValueError(f"알 수 없는 응답 버튼: {response_button}")
+        self.response_button = response_button; self.response_mask = BUTTON_MASKS[response_button]
+        self.timeouts = 0; self.false_starts = 0; self.stimulus_ns = 0; self.stimuli = 0
+        self._wait_ns = 0 # 응답 대기에 쓴 시간 (자극 사이 대기를 빼고 폴링 주기를 계산)
+        self._rng = random.Random(seed)
+
+    def sampler_report(self) -> dict:
+        report = super().sampler_report()
+        for key in ("packets_seen", "packets_missed", "missed_pct", "poll_hz"): report.pop(key, None) # 지연 측정은 패킷을 모두 보지 않음
+        if self._loops and self._wait_ns:
+            report["loop_us"] = self._wait_ns / self._loops / 1000.0
+            if not self.xi.kernel_timestamps and self.strategy != "event": report["poll_hz"] = 1e6 / report["loop_us"] # 지연 값의 시간 해상도
+        report.update({"latency_stimuli": self.stimuli, "latency_timeouts": self.timeouts, "latency_false_starts": self.false_starts,
+                       "stimulus_call_us": self.stimulus_ns / self.stimuli / 1000.0 if self.stimuli else 0.0, "response_button": self.response_button})
+        return report
+
+    def _wait_response(self, pressed: bool, deadline_ns: int) -> Optional[int]:
+        """응답 버튼이 pressed 상태인 첫 패킷의 시각을 반환합니다. 시간 초과 또는 중지 시 None, 연결 끊김 시 -1."""
+        idx, mask, timestamped = self.device_index, self.response_mask, self.xi.kernel_timestamps
+        start_ns = time.perf_counter_ns()
+        try: return self._poll_response(idx, mask, timestamped, pressed, deadline_ns)
+        finally: self._wait_ns += time.perf_counter_ns() - start_ns
+
+    def _poll_response(self, idx: int, mask: int, timestamped: bool, pressed: bool, deadline_ns: int) -> Optional[int]:
+        """
+        응답 대기 루프. 상태는 PollingThread와 같이 삼중 버퍼의 후면에 읽고 새 패킷일 때만 _swap()으로 전면에 올리므로,
+        폴링마다 상태 객체를 만들지 않고 GUI의 latest_state()도 교체 순번 검사를 그대로 사용합니다.
+        """
+        bufs, poll_state, swap = self._bufs, self._poll_state, self._swap
+        while not self._stop.is_set():
+            if self.strategy == "event" or timestamped:
+                res, packets = self.xi.wait_packets(idx, 0.01) if self.strategy == "event" else self.xi.read_packets(idx)
+                if res != ERROR_SUCCESS: self.disconnected = True; return -1
+                self._loops += 1
+                for ts_ns, state in packets:
+                    bufs[self._back].raw[:] = memoryview(state).cast("B"); swap()
+                    if bool(self._last_state.Gamepad.wButtons & mask) == pressed: return ts_ns
+            else:
+                if poll_state() != ERROR_SUCCESS: self.disconnected = True; return -1
+                ts_ns = time.perf_counter_ns(); self._loops += 1
+                if bufs[self._back].packet != bufs[self._front].packet: swap()
+                if bool(self._last_state.Gamepad.wButtons & mask) == pressed: return ts_ns
+            if time.perf_counter_ns() >= deadline_ns: return None
+            if self.strategy == "hybrid": time.sleep(0)
+        return None
+
+    def _run(self):
+        error = self._prepare()
+        if error: self.deviceError.emit(error); return
+        idx, timeout_ns = self.device_index, int(self.RESPONSE_TIMEOUT_S * 1e9)
+        try:
+            while not self._stop.is_set() and self.ring.write_count < self.max_samples:
+                # 재무장: 모터를 끄고 응답 버튼이 풀린 것을 확인한 뒤 무작위로 쉽니다.
+                self.xi.set_vibration(idx, 0, 0)
+                released = self._wait_response(False, time.perf_counter_ns() + timeout_ns)
+                if released == -1: self.deviceError.emit("장치 연결 끊어짐"); break
+                if released is None:
+                    if not self._stop.is_set(): self.deviceError.emit(f"응답 버튼({self.response_button})이 눌린 채로 풀리지 않습니다.")
+                    break
+                if self._stop.wait(self._rng.uniform(*self.GAP_S)): break
+                t0 = time.perf_counter_ns(); ok = self.xi.set_vibration(idx, *self.STIMULUS); self.stimulus_ns += time.perf_counter_ns() - t0; self.stimuli += 1
+                if not ok: self.deviceError.emit("진동(자극)을 보낼 수 없는 장치입니다."); break
+                ts_ns = self._wait_response(True, t0 + timeout_ns)
+                if ts_ns == -1: self.deviceError.emit("장치 연결 끊어짐"); break
+                if ts_ns is None: self.timeouts += 1
+                elif ts_ns < t0: self.false_starts += 1 # 자극 전에 이미 눌린 패킷 (루프백 외 입력)
+                else: self.ring.append(ts_ns - t0)
+                self._mark_overhead()
+            else:
+                if self.ring.write_count >= self.max_samples: self._mark_overhead(); self.measurementFinished.emit()
+        finally:
+            self.xi.set_vibration(idx, 0, 0)
+            self._mark_overhead(); self.ring.close()
+
+class _BenchStateSource(InputBackend):
+    """할당 벤치마크용 입력 원본: 미리 만든 상태를 순서대로 돌려주며, 같은 상태를 packet_every번 반복해 '변화 없는 폴링'을 재현합니다."""
+    name = "bench"
+
+    def __init__(self, packets: int = 64, packet_every: int = 8):
+        self._states = []
+        for k in range(packets):
+            state = XINPUT_STATE(); state.dwPacketNumber = 1000 + k; state.Gamepad.sThumbLX = 100 * k; self._states.append(state)
+        raws = [memoryview(state).cast("B") for state in self._states]
+        self._seq = itertools.cycle([raw for raw in raws for _ in range(packet_every)]) # 순번 계산 없이 미리 만든 뷰를 순환
+    def get_state(self, idx: int) -> Tuple[int, XINPUT_STATE]:
+        state = XINPUT_STATE(); memoryview(state).cast("B")[:] = next(self._seq); return ERROR_SUCCESS, state
+    def get_state_into(self, idx: int, buf: StateBuffer) -> int:
+        buf.raw[:] = next(self._seq); return ERROR_SUCCESS
+
+def benchmark_alloc(polls: int = 100_000, packet_every: int = 8):
+    """
+    수집 루프의 폴링 1회당 메모리 할당을 기존 방식(매번 새 XINPUT_STATE + string_at 바이트열 비교)과 삼중 버퍼 방식(PollingThread._on_polled)으로 비교 출력합니다.
+    - 드라이버 대신 _BenchStateSource를 쓰고 시계 호출은 미리 만든 타임스탬프로 대신하여, 상태 읽기/비교/기록 경로 자체의 할당만 셉니다.
+    - 할당 여부는 폴링 직전 대비 tracemalloc 최고 사용량 증가로 판정하므로 즉시 해제되는 일시 할당까지 검출됩니다.
+    - 할당 0회는 새 패킷이 없는 폴링(수집 루프 반복의 대부분)에 대한 보장입니다. 새 패킷 폴링도 상태 객체·바이트열은 만들지 않지만,
+      패킷 번호 차이·간격·카운터 계산에 일시적인 Python 정수(256 초과 값은 매번 새 객체)가 필요하므로 0이 아니며, 그 크기를 따로 출력합니다.
+    """
+    import tracemalloc
+    timestamps = [1_000_000_000 + i * 125_000 for i in range(polls)] # 8kHz 폴링 가정
+
+    def legacy_runner():
+        src = _BenchStateSource(packet_every=packet_every); last = [src.get_state(0)[1]]
+        def poll(ts_ns: int):
+            res, state = src.get_state(0)
+            if state.dwPacketNumber == last[0].dwPacketNumber: return
+            ctypes.string_at(ctypes.byref(state.Gamepad), ctypes.sizeof(XINPUT_GAMEPAD)) != ctypes.string_at(ctypes.byref(last[0].Gamepad), ctypes.sizeof(XINPUT_GAMEPAD))
+            last[0] = state
+        return poll, lambda: id(last[0])
+    def buffered_runner():
+        thread = PollingThread(0, polls, backend=_BenchStateSource(packet_every=packet_every), strategy="spin", gc_mode="off")
+        thread.timer_info = {"clock_ns": 1, "sleep_floor_ns": 1_000_000, "yield_ns": 0}; thread._prepare()
+        poll_state, on_polled = thread._poll_state, thread._on_polled # 수집 루프와 같이 미리 조회
+        def poll(ts_ns: int):
+            if poll_state() == ERROR_SUCCESS: on_polled(ts_ns)
+        return poll, lambda: thread._back
+
+    print(f"{'path':>10} | {'idle polls allocating':>22} | {'bytes/idle poll':>15} | {'bytes/packet poll':>17} | {'ns/poll':>8}")
+    for label, make in (("legacy", legacy_runner), ("buffered", buffered_runner)):
+        poll, _ = make()
+        t0 = time.perf_counter_ns()
+        for ts in timestamps: poll(ts)
+        per_poll_ns = (time.perf_counter_ns() - t0) / polls
+        poll, marker = make(); idle = idle_hits = idle_bytes = packet = packet_bytes = 0
+        for ts in timestamps[:packet_every * 128]: poll(ts) # 원본 순환(cycle)의 첫 바퀴 저장 등 지연 생성되는 캐시를 미리 채움
+        tracemalloc.start()
+        for i, ts in enumerate(timestamps[:min(polls, 20_000)]):
+            mark = marker(); before = tracemalloc.get_traced_memory()[0]; tracemalloc.reset_peak()
+            poll(ts)
+            grown = tracemalloc.get_traced_memory()[1] - before
+            if i == 0: continue # 첫 반복은 측정 변수(before) 자신의 정수 할당이 섞이므로 제외
+            if marker() == mark: idle += 1; idle_hits += grown > 0; idle_bytes += grown # 전면 상태가 그대로면 변화 없는 폴링
+            else: packet += 1; packet_bytes += grown
+        tracemalloc.stop()
+        print(f"{label:>10} | {idle_hits:>12,} / {idle:<7,} | {idle_bytes / max(1, idle):>15.1f} | {packet_bytes / max(1, packet):>17.1f} | {per_poll_ns:>8.0f}")
+    print("참고: 새 패킷 폴링의 바이트는 간격·카운터 계산용 일시 정수 객체입니다 (상태 객체·바이트열 없음, 순수 Python에서는 0으로 만들 수 없음).")
+
+class AnalysisThread(QThread):
+    """
+    측정 파이프라인의 2단계(분석). 수집 스레드의 순환 버퍼를 자체 읽기 커서로 소비하여 증분 통계를 갱신합니다.
+    - 최신 스냅샷은 참조 교체만으로 게시되며, GUI는 latest_snapshot()으로 자신의 주기에 맞춰 가져갑니다.
+    - 수집 스레드는 시그널 전송이나 딕셔너리 생성을 하지 않으므로 보고 작업이 샘플링 주기를 교란하지 않습니다.
+    - 내구 측정에서는 통계를 최근 LIVE_WINDOW개 간격으로 제한하고(슬라이딩 윈도우), 전체 추이는 SoakAggregator의 구간 집계로 남깁니다.
+    """
+    LIVE_WINDOW = 1 << 16
+
+    def __init__(self, capture: PollingThread, period_ms: int = 20, soak_log_path: Optional[str] = None, on_minute: Optional[Callable[[tuple], None]] = None):
+        super().__init__()
+        self.capture = capture
+        self.period_s = period_ms / 1000.0
+        self.stats = StreamingPollingStats()
+        self._stop = threading.Event()
+        self._read = 0 # 다음에 읽을 순환 버퍼 순번
+        self._latest: dict = {"samples": 0}
+        self.passes = 0; self.busy_ns = 0; self.max_pass_ns = 0; self.lost = 0
+        self._packet_read = 0; self.packets_lost = 0
+        self.plot = IntervalPlotFeed(); self._plot: dict = self.plot.snapshot()
+        self.soak = SoakAggregator(soak_log_path, on_minute) if capture.duration_ns else None; self._live: Deque[int] = deque()
+
+    def stop(self): self._stop.set()
+    def latest_snapshot(self) -> dict: return self._latest
+    def latest_plot(self) -> dict: return self._plot
+
+    def consume(self):
+        """버퍼에 새로 기록된 간격을 모두 소비하고 스냅샷을 게시합니다."""
+        t0 = time.perf_counter_ns()
+        ring = self.capture.ring; end = ring.write_count
+        start = max(self._read, ring.oldest())
+        self.lost += start - self._read # 한 바퀴 이상 뒤처져 덮어쓰인 샘플
+        add = self.stats.add; plot_add = self.plot.add; soak = self.soak
+        if soak is None:
+            for view in ring.views(start, end):
+                for v in view: add(v); plot_add(v)
+        else:
+            soak.note_disconnects(self.capture.disconnects)
+            soak_add = soak.add; live = self._live; remove = self.stats.remove; limit = self.LIVE_WINDOW
+            for view in ring.views(start, end):
+                for v in view:
+                    add(v); plot_add(v); soak_add(v); live.append(v)
+                    if len(live) > limit: remove(live.popleft())
+        self._read = end
+        self._drain_packets()
+        elapsed = time.perf_counter_ns() - t0
+        self.passes += 1; self.busy_ns += elapsed
+        if elapsed > self.max_pass_ns: self.max_pass_ns = elapsed
+        self._latest = {**self.stats.snapshot(), **self.capture.sampler_report(), **self.counters()}
+        if soak is not None and self.capture._loop_start_ns: self._latest.update(soak.snapshot(), soak_elapsed_s=(time.perf_counter_ns() - self.capture._loop_start_ns) / 1e9)
+        if end != start: self._plot = self.plot.snapshot()
+
+    def _drain_packets(self):
+        """수집 스레드의 패킷 버퍼를 캡처 파일로 흘려보냅니다."""
+        packets, writer = self.capture.packets, self.capture.capture_writer
+        if packets is None or writer is None: return
+        end = packets.write_count; start = max(self._packet_read, packets.oldest())
+        self.packets_lost += start - self._packet_read
+        writer.write_views(packets.views(start, end)); self._packet_read = end
+
+    def counters(self) -> dict:
+        """분석 단계의 오버헤드 카운터."""
+        return {"analysis_passes": self.passes, "analysis_lost": self.lost, "capture_lost": self.packets_lost,
+                "analysis_pass_us": (self.busy_ns / self.passes / 1000.0) if self.passes else 0.0,
+                "analysis_max_us": self.max_pass_ns / 1000.0}
+
+    def run(self):
+        while not self._stop.wait(self.period_s): self.consume()
+        self.consume()
+        if self.soak is not None: self.soak.finish()
+        if self.capture.capture_writer is not None: self.capture.capture_writer.close()
+
+# ----- 결과 저장소 (SQLite) -----
+
+RESULTS_DB_NAME = "GamePadTester_results.db" # GUI 리포트와 같은 프로그램 폴더에 만드는 기본 결과 저장소
+
+def resolve_results_db(path: str) -> str:
+    """결과 저장소 경로를 정합니다. 상대 경로는 작업 폴더가 아니라 프로그램 폴더 기준이므로 GUI, 헤드리스 기록, 조회 명령이 항상 같은 파일을 씁니다."""
+    return path if os.path.isabs(path) else os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), path)
+
+def _kolmogorov_p(d: float, n_a: int, n_b: int) -> float:
+    """두 표본 KS 통계량 d의 점근 p값 (Kolmogorov 분포, 표본 크기 보정 포함). 급수가 수렴하지 않을 만큼 d가 작으면 1."""
+    en = math.sqrt(n_a * n_b / (n_a + n_b)); lam = (en + 0.12 + 0.11 / en) * d
+    total, sign = 0.0, 1.0
+    for j in range(1, 101):
+        term = sign * 2.0 * math.exp(-2.0 * j * j * lam * lam); total += term; sign = -sign
+        if abs(term) <= 1e-10 * abs(total) or abs(term) < 1e-12: return min(1.0, max(0.0, total))
+    return 1.0
+
+def ks_two_sample(a, b) -> Tuple[float, float]:
+    """두 원본 간격 표본의 Kolmogorov–Smirnov 검정. (D, p값)을 반환하며 NumPy가 있으면 정렬과 이분 탐색으로 벡터화합니다."""
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b: raise ValueError("비교할 간격이 없습니다.")
+    np = _optional_numpy()
+    if np is not None:
+        a = np.sort(np.asarray(a)); b = np.sort(np.asarray(b)); xs = np.concatenate((a, b))
+        d = float(np.max(np.abs(np.searchsorted(a, xs, side="right") / n_a - np.searchsorted(b, xs, side="right") / n_b)))
+    else:
+        a = sorted(a); b = sorted(b); i = j = 0; d = 0.0
+        while i < n_a and j < n_b:
+            x = min(a[i], b[j])
+            while i < n_a and a[i] <= x: i += 1
+            while j < n_b and b[j] <= x: j += 1
+            d = max(d, abs(i / n_a - j / n_b))
+    return d, _kolmogorov_p(d, n_a, n_b)
+
+def _cdf_from_quantiles(q: List[float], x: float) -> float:
+    """등간격 분위수 목록 q(0~100%)를 선형 보간한 누적분포 F(x)."""
+    if x < q[0]: return 0.0
+    if x >= q[-1]: return 1.0
+    k = bisect.bisect_right(q, x) - 1; span = q[k + 1] - q[k]
+    return (k + ((x - q[k]) / span if span > 0 else 0.0)) / (len(q) - 1)
+
+def ks_from_quantiles(qa: List[float], qb: List[float], n_a: int, n_b: int) -> Tuple[float, float]:
+    """원본 캡처가 없을 때 저장된 분위수로 근사한 KS 검정 (D의 오차는 분위수 간격 1% 이내)."""
+    d = max(abs(_cdf_from_quantiles(qa, x) - _cdf_from_quantiles(qb, x)) for x in (*qa, *qb))
+    return d, _kolmogorov_p(d, n_a, n_b)
+
+class ResultsStore:
+    """
+    측정 결과의 로컬 저장소 (SQLite). 측정마다 요약 통계 한 행과 0~100 분위수, 리포트/원본 캡처 경로를 남깁니다.
+    - (장치명|VID:PID, 모드, 시각)과 (모드, 시각) 복합 인덱스를 두므로 수천 건에서도 장치/모델별 조회와 추이는 인덱스 범위 탐색으로 끝납니다.
+    - compare()는 두 측정의 지표·백분위수 차이와 분포 검정(KS)을 계산합니다. 두 원본 캡처가 남아 있으면 원본으로, 없으면 저장된 분위수로 근사합니다.
+    - 리포트 저장 스레드와 GUI에서 함께 쓰이므로 연결 하나를 잠금으로 보호합니다. sqlite3는 사용하는 시점에 불러옵니다.
+    """
+    SCHEMA_VERSION = 1
+    COLUMNS = ("samples", "mean_hz", "median_hz", "mean_ms", "median_ms", "stdev_ms", "stability_pct", "min_ms", "max_ms",
+               "p1_ms", "p5_ms", "p95_ms", "p99_ms", "p999_ms", "poll_hz", "missed_pct")
+    METRICS = COLUMNS + ("undersampled",)
+    _PERCENTILE_COLUMNS = {1.0: "p1_ms", 5.0: "p5_ms", 95.0: "p95_ms", 99.0: "p99_ms", 99.9: "p999_ms"}
+
+    def __init__(self, path: str):
+        self.path = path; self._db = None; self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+            db = sqlite3.connect(self.path, check_same_thread=False); db.row_factory = sqlite3.Row
+            if db.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                db.executescript(f"""
+                    CREATE TABLE IF NOT EXISTS runs (
+                        id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, device TEXT NOT NULL, vid_pid TEXT, mode TEXT NOT NULL,
+                        backend TEXT, sampler TEXT, {', '.join(f'{c} REAL' for c in self.COLUMNS)}, undersampled INTEGER,
+                        quantiles BLOB, report_path TEXT, capture_path TEXT);
+                    CREATE INDEX IF NOT EXISTS runs_device ON runs(device, mode, timestamp);
+                    CREATE INDEX IF NOT EXISTS runs_vid_pid ON runs(vid_pid, mode, timestamp);
+                    CREATE INDEX IF NOT EXISTS runs_mode ON runs(mode, timestamp);
+                    CREATE INDEX IF NOT EXISTS runs_timestamp ON runs(timestamp);
+                    PRAGMA user_version = {self.SCHEMA_VERSION};""")
+            self._db = db
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None: self._db.close(); self._db = None
+
+    def record(self, device: str, mode: str, stats: dict, sampler: Optional[dict] = None, vid_pid: Optional[str] = None, backend: Optional[str] = None,
+               report_path: Optional[str] = None, capture_path: Optional[str] = None, timestamp: Optional[str] = None) -> int:
+        """
+        측정 한 건을 기록하고 행 ID를 반환합니다.
+        - stats: analyze_intervals()의 결과, 또는 내구 측정이면 SoakAggregator.summary() (평균 폴링레이트·안정도·최대 간격만 기록)
+        """
+        sampler = sampler or {}
+        if "rate_hz" in stats: stats = {"samples": stats["samples"], "mean_hz": stats["rate_hz"], "stability_pct": stats["stability_pct"], "max_ms": stats["max_gap_ms"]}
+        if mode == "latency": stats = {k: v for k, v in stats.items() if k not in ("mean_hz", "median_hz", "stability_pct")} # 폴링레이트 전용 지표는 지연 분포에서 의미가 없음
+        values = {c: stats.get(c) for c in self.COLUMNS}
+        values.update({col: stats.get("percentiles_ms", {}).get(q) for q, col in self._PERCENTILE_COLUMNS.items()})
+        values.update({"poll_hz": sampler.get("poll_hz"), "missed_pct": sampler.get("missed_pct") if "packets_seen" in sampler else None})
+        quantiles = array("d", stats["quantiles_ms"]).tobytes() if stats.get("quantiles_ms") else None
+        row = {"timestamp": timestamp or datetime.now().isoformat(timespec="seconds"), "device": device, "vid_pid": vid_pid, "mode": mode,
+               "backend": backend, "sampler": sampler.get("sampler"), **values, "undersampled": int(is_undersampled(stats, sampler)) if sampler else None,
+               "quantiles": quantiles, "report_path": report_path and os.path.abspath(report_path), "capture_path": capture_path and os.path.abspath(capture_path)}
+        with self._lock:
+            db = self._connect()
+            with db: cur = db.execute(f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", tuple(row.values()))
+            return cur.lastrowid
+
+    def record_capture(self, capture: PollingThread, stats: dict, sampler: dict, report_path: Optional[str] = None) -> int:
+        """측정 스레드의 메타데이터(장치명, VID:PID, 백엔드, 모드)와 함께 기록합니다."""
+        if isinstance(capture, LatencyProbeThread): mode = "latency"
+        elif capture.duration_ns: mode = "soak"
+        else: mode = "gyro" if capture.include_gyro else "standard"
+        meta = capture.capture_meta
+        return self.record(meta.get("device", f"#{capture.device_index + 1}"), mode, stats, sampler, meta.get("vid_pid"), capture.xi.name,
+                           report_path, sampler.get("capture") or capture.capture_path)
+
+    @staticmethod
+    def _where(device: Optional[str], vid_pid: Optional[str], mode: Optional[str], since: Optional[str], until: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (("device", device), ("vid_pid", vid_pid), ("mode", mode)):
+            if value is not None: clauses.append(f"{column} = ?"); params.append(value)
+        if since: clauses.append("timestamp >= ?"); params.append(since)
+        if until: clauses.append("timestamp < ?"); params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def runs(self, device: Optional[str] = None, vid_pid: Optional[str] = None, mode: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """조건에 맞는 측정을 최신순으로 반환합니다 (분위수 제외). since/until은 ISO 형식 시각 문자열입니다."""
+        where, params = self._where(device, vid_pid, mode, since, until)
+        with self._lock:
+            rows = self._connect().execute(f"SELECT * FROM runs{where} ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [{k: row[k] for k in row.keys() if k != "quantiles"} for row in rows]
+
+    def trend(self, metric: str = "median_hz", device: Optional[str] = None, vid_pid: Optional[str] = None, mode: Optional[str] = "standard",
+              since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[str, float]]:
+        """지표 하나의 시간순 추이 [(시각, 값)]. 예: 같은 VID:PID 패드 모델의 중앙값 Hz 변화."""
+        if metric not in self.METRICS: raise ValueError(f"알 수 없는 지표: {metric}")
+        where, params = self._where(device, vid_pid, mode, since, until)
+        where += (" AND " if where else " WHERE ") + f"{metric} IS NOT NULL"
+        with self._lock:
+            return [tuple(row) for row in self._connect().execute(f"SELECT timestamp, {metric} FROM runs{where} ORDER BY timestamp", params)]
+
+    def get(self, run_id: int) -> Optional[dict]:
+        with self._lock: row = self._connect().execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None: return None
+        run = dict(zip(row.keys(), row)); blob = run.pop("quantiles")
+        run["quantiles_ms"] = array("d", blob).tolist() if blob else None
+        return run
+
+    def compare(self, a_id: int, b_id: int) -> dict:
+        """
+        측정 A 대비 B의 차이.
+        - deltas: 지표별 (A, B, B−A, 변화율 %)
+        - ks_d / ks_p / ks_source: 간격 분포의 KS 검정. 두 원본 캡처가 있으면 "raw", 없으면 저장된 분위수로 근사한 "quantiles"
+        """
+        a, b = self.get(a_id), self.get(b_id)
+        for run_id, run in ((a_id, a), (b_id, b)):
+            if run is None: raise ValueError(f"측정 #{run_id}을(를) 찾을 수 없습니다.")
+        deltas = {}
+        for metric in self.COLUMNS:
+            va, vb = a[metric], b[metric]
+            if va is not None and vb is not None: deltas[metric] = (va, vb, vb - va, (vb - va) / va * 100.0 if va else None)
+        result = {"a": a, "b": b, "deltas": deltas, "ks_d": None, "ks_p": None, "ks_source": None}
+        paths = (a["capture_path"], b["capture_path"])
+        if all(p and p.endswith(".gpcap") and os.path.exists(p) for p in paths):
+            samples = []
+            for path in paths:
+                with CaptureReader(path) as cap: samples.append(cap.intervals_ns())
+            result["ks_d"], result["ks_p"] = ks_two_sample(*samples); result["ks_source"] = "raw"
+        elif a["quantiles_ms"] and b["quantiles_ms"] and a["samples"] and b["samples"]:
+            result["ks_d"], result["ks_p"] = ks_from_quantiles(a["quantiles_ms"], b["quantiles_ms"], int(a["samples"]), int(b["samples"])); result["ks_source"] = "quantiles"
+        return result
+
+def format_run_table(runs: List[dict]) -> str:
+    """결과 저장소 조회 결과를 표 형식 텍스트로 변환합니다."""
+    def cell(v, fmt: str) -> str: return format(v, fmt) if v is not None else "-"
+    lines = [f"{'ID':>6}  {'Timestamp':<19}  {'Device':<24}{'VID:PID':<11}{'Mode':<10}{'Samples':>9}{'Median Hz':>11}{'Stab %':>8}{'P99 ms':>9}"]
+    for r in runs:
+        lines.append(f"{r['id']:>6}  {r['timestamp']:<19}  {r['device'][:23]:<24}{(r['vid_pid'] or '-'):<11}{r['mode']:<10}{cell(r['samples'], ',.0f'):>9}"
+                     f"{cell(r['median_hz'], '.2f'):>11}{cell(r['stability_pct'], '.1f'):>8}{cell(r['p99_ms'], '.4f'):>9}")
+    return "\n".join(lines)
+
+def format_comparison(result: dict) -> str:
+    """compare() 결과를 텍스트로 변환합니다."""
+    a, b = result["a"], result["b"]
+    lines = [f"A: #{a['id']} {a['timestamp']} {a['device']} ({a['mode']})", f"B: #{b['id']} {b['timestamp']} {b['device']} ({b['mode']})", "",
+             f"{'Metric':<15}{'A':>12}{'B':>12}{'B-A':>12}{'Change':>10}"]
+    for metric, (va, vb, diff, pct) in result["deltas"].items():
+        lines.append(f"{metric:<15}{va:>12.4f}{vb:>12.4f}{diff:>+12.4f}{(f'{pct:+.2f}%' if pct is not None else '-'):>10}")
+    if result["ks_source"]:
+        verdict = "distributions differ" if result["ks_p"] < 0.05 else "no significant difference"
+        lines += ["", f"KS test ({result['ks_source']}): D = {result['ks_d']:.4f}, p = {result['ks_p']:.3g} -> {verdict} at 5%"]
+    else: lines += ["", "KS test: not available (no raw captures or stored quantiles)"]
+    return "\n".join(lines)
+
+def benchmark_store(runs: int = 5000, seed: int = 0):
+    """
+    결과 저장소의 기록/조회 비용을 출력합니다. 임시 파일에 runs건(패드 모델 20종, 장치 100대, 하루 간격)을 기록한 뒤
+    장치별 최신 목록, 모델별 추이, 전체 최신 목록, 두 측정 비교(분위수 KS)의 1회 평균 시간을 잽니다.
+    """
+    import tempfile
+    rng = random.Random(seed); start = datetime(2024, 1, 1).timestamp()
+    with tempfile.TemporaryDirectory() as folder:
+        store = ResultsStore(os.path.join(folder, RESULTS_DB_NAME))
+        t0 = time.perf_counter()
+        for i in range(runs):
+            interval = 1000.0 / rng.choice((125, 250, 500, 1000)); jitter = interval * rng.uniform(0.005, 0.05)
+            quantiles = sorted(interval + rng.gauss(0, jitter) for _ in STORE_QUANTILES)
+            stats = {"samples": 4000, "mean_ms": interval, "median_ms": quantiles[50], "mean_hz": 1000.0 / interval, "median_hz": 1000.0 / quantiles[50],
+                     "stdev_ms": jitter, "stability_pct": rng.uniform(90, 100), "percentiles_ms": {99.0: quantiles[99]}, "quantiles_ms": quantiles}
+            store.record(f"Pad {i % 100}", "standard", stats, {"sampler": "hybrid"}, f"045E:{i % 20:04X}", "sim",
+                         timestamp=datetime.fromtimestamp(start + i * 86400 / (runs / 365)).isoformat(timespec="seconds"))
+        t_insert = (time.perf_counter() - t0) / runs
+        queries = [("runs(device)", lambda: store.runs(device="Pad 7")), ("trend(vid_pid)", lambda: store.trend("median_hz", vid_pid="045E:0007")),
+                   ("runs(all)", lambda: store.runs()), ("compare", lambda: store.compare(1, runs))]
+        print(f"{runs:,} runs, insert {t_insert * 1e3:.2f} ms/run (one transaction each)")
+        print(f"{'query':>16} | {'rows':>6} | {'ms/query':>9}")
+        for name, query in queries:
+            reps = 200; t0 = time.perf_counter()
+            for _ in range(reps): result = query()
+            rows = len(result) if isinstance(result, list) else 2
+            print(f"{name:>16} | {rows:>6} | {(time.perf_counter() - t0) / reps * 1e3:>9.3f}")
+        store.close()
+
+def benchmark_replay(path: Optional[str] = None, records: int = 100_000, seed: int = 0):
+    """
+    캡처를 최대 속도로 재생하여 수집(PollingThread) → 분석(AnalysisThread) 파이프라인의 처리량을 전략별로 출력합니다.
+    - path가 없으면 임시 폴더에 records개의 가상 8kHz 캡처(시뮬레이션 jitter 프로파일, 가상 시계)를 만들어 씁니다.
+    - 'capture'는 수집 스레드가 스트림 끝에 닿은 시점, 'end-to-end'는 분석 스레드가 마지막 간격까지 반영한 시점 기준입니다.
+    - 재생 결과의 증분 통계(샘플 수, 평균, 중앙값)가 원본 캡처의 analyze_intervals와 같은지 함께 확인합니다.
+    """
+    import tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        if path is None:
+            path = os.path.join(folder, "replay_bench.gpcap"); clock = [1_000_000_000]
+            sim = SimulatedBackend(8000, "jitter", seed, clock=lambda: clock[0])
+            writer = CaptureWriter(path, {"device": "bench", "mode": "gyro", "backend": "sim"}); written = 0
+            while written < records:
+                clock[0] += 500_000_000 # 시뮬레이터의 따라잡기 생략(1초)에 걸리지 않도록 0.5초씩 진행
+                _, packets = sim.wait_packets(0, 0.0)
+                chunk = b"".join(struct.pack("<q", ts) + bytes(packet) for ts, packet in packets[:records - written])
+                writer.write_views([memoryview(chunk).cast("q")]); written = writer.records
+            writer.close()
+        with CaptureReader(path) as cap:
+            expected = analyze_intervals(cap.intervals_ns()); count = len(cap)
+        gyro = True # 모든 패킷 변화를 간격으로 기록하므로 원본 캡처의 간격과 1:1로 대응
+        print(f"{os.path.basename(path)}: {count:,} records, {expected.get('samples', 0):,} intervals")
+        print(f"{'sampler':>8} | {'capture ms':>10} | {'capture pkt/s':>13} | {'end-to-end pkt/s':>16} | {'ns/packet':>9} | {'lost':>5} | {'stats match':>11}")
+        for strategy in ("hybrid", "event"):
+            backend = ReplayBackend([path], REPLAY_SPEED_MAX)
+            thread = PollingThread(0, max(20, expected.get("samples", 0)), gyro, backend=backend, strategy=strategy, gc_mode="off")
+            analysis = AnalysisThread(thread)
+            t0 = time.perf_counter_ns(); thread.start(); analysis.start()
+            thread.wait(); t_capture = time.perf_counter_ns() - t0
+            analysis.stop(); analysis.wait(); t_total = time.perf_counter_ns() - t0
+            backend.close()
+            snap = analysis.latest_snapshot(); packets = thread.packets_seen
+            match = (snap.get("samples") == expected.get("samples") and abs(snap.get("mean_ms", 0) - expected.get("mean_ms", 0)) < 1e-9
+                     and abs(snap.get("median_ms", 0) - expected.get("median_ms", 0)) < 1e-9)
+            print(f"{strategy:>8} | {t_capture / 1e6:>10.1f} | {packets / (t_capture / 1e9):>13,.0f} | {packets / (t_total / 1e9):>16,.0f} | "
+                  f"{t_capture / max(1, packets):>9.0f} | {analysis.counters()['analysis_lost']:>5} | {'yes' if match else 'NO':>11}")
+
+class ReportWriterThread(QThread):
+    """
+    측정 종료 후 작업(스레드 정리, 캡처 → 텍스트 리포트 내보내기)을 GUI 밖에서 순서대로 처리하는 작업 큐.
+    - stop_measure는 작업을 넣기만 하고 즉시 반환하므로 파일 크기나 저장 위치와 무관하게 창이 멈추지 않습니다.
+    - 연속 측정으로 작업이 쌓이면 들어온 순서대로 처리하며, 결과는 시그널로 알립니다.
+    - store가 있으면 리포트마다 요약을 결과 저장소에 기록합니다 (기록 실패는 리포트 저장에 영향을 주지 않음).
+    """
+    reportSaved = Signal(str)
+    reportFailed = Signal(str, str)
+
+    def __init__(self, store: Optional[ResultsStore] = None):
+        super().__init__()
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.store = store
+
+    def submit(self, capture_path: str, capture: PollingThread, analysis: Optional[AnalysisThread] = None, extra: Optional[dict] = None):
+        """측정 스레드의 종료를 기다린 뒤 리포트를 만드는 작업을 예약합니다."""
+        self._jobs.put((None, capture, [(capture_path, capture, analysis)], dict(extra or {})))
+
+    def submit_group(self, summary_path: str, driver: MultiPollingThread, analyses: List[AnalysisThread], extra: Optional[dict] = None):
+        """다중 장치 측정: 수집 스레드의 종료를 기다린 뒤 장치별 리포트와 통합 요약 리포트를 만드는 작업을 예약합니다."""
+        members = [(ch.capture_path, ch, analysis) for ch, analysis in zip(driver.channels, analyses) if ch.capture_path]
+        self._jobs.put((summary_path, driver, members, dict(extra or {})))
+
+    def submit_soak(self, report_path: str, driver: PollingThread | MultiPollingThread, analyses: List[AnalysisThread], extra: Optional[dict] = None):
+        """내구 측정: 수집/분석 스레드의 종료를 기다린 뒤 구간 집계로 내구 리포트를 만드는 작업을 예약합니다 (원본 캡처는 요청 시에만 기록됨)."""
+        channels = driver.channels if isinstance(driver, MultiPollingThread) else [driver]
+        self._jobs.put((report_path, driver, [(ch.capture_path, ch, analysis) for ch, analysis in zip(channels, analyses)], {**(extra or {}), "soak": True}))
+
+    def submit_latency(self, report_path: str, probe: LatencyProbeThread, analysis: AnalysisThread, extra: Optional[dict] = None):
+        """입력 지연 측정: 측정 스레드의 종료를 기다린 뒤 지연 리포트를 만드는 작업을 예약합니다."""
+        self._jobs.put((report_path, probe, [(None, probe, analysis)], {**(extra or {}), "latency": True}))
+
+    def pending(self) -> int: return self._jobs.qsize()
+    def stop(self): self._jobs.put(None) # 남은 작업을 모두 처리한 뒤 종료
+
+    def _record(self, capture: PollingThread, stats: dict, sampler: dict, report_path: str):
+        if self.store is None: return
+        try: self.store.record_capture(capture, stats, sampler, report_path)
+        except Exception as e: print(f"결과 저장소 기록 실패: {e}")
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None: break
+            summary_path, driver, members, extra = job
+            driver.wait()
+            if extra.pop("soak", False): self._write_soak(summary_path, members, extra); continue
+            if extra.pop("latency", False): self._write_latency(summary_path, members[0], extra); continue
+            rows = []
+            for capture_path, capture, analysis in members:
+                txt_path = report_path_for_capture(capture_path)
+                try:
+                    if analysis is not None: analysis.wait()
+                    if capture.ring.write_count == 0:
+                        if os.path.exists(capture_path): os.remove(capture_path) # 간격이 하나도 없으면 캡처를 남기지 않음
+                        continue
+                    sampler = {**capture.sampler_report(), **(analysis.counters() if analysis is not None else {}), **extra}
+                    stats = export_capture_to_text(capture_path, txt_path, sampler); self._record(capture, stats, sampler, txt_path)
+                    rows.append((capture.capture_meta.get("device", f"#{capture.device_index + 1}"), stats, sampler))
+                    if summary_path is None: self.reportSaved.emit(txt_path) # 다중 장치 측정은 통합 리포트만 알림
+                except Exception as e:
+                    self.reportFailed.emit(txt_path, str(e))
+            if summary_path and rows:
+                try: write_combined_report(summary_path, rows); self.reportSaved.emit(summary_path)
+                except Exception as e: self.reportFailed.emit(summary_path, str(e))
+
+    def _write_latency(self, report_path: str, member: tuple, extra: dict):
+        _, probe, analysis = member
+        try:
+            analysis.wait()
+            if probe.ring.write_count == 0: self.reportFailed.emit(report_path, "응답이 기록된 자극이 없습니다."); return
+            sampler = {**probe.sampler_report(), **analysis.counters(), **extra}
+            stats = write_latency_report(report_path, probe.snapshot_intervals_ns(), probe.capture_meta.get("device", f"#{probe.device_index + 1}"), sampler)
+            self._record(probe, stats, sampler, report_path); self.reportSaved.emit(report_path)
+        except Exception as e:
+            self.reportFailed.emit(report_path, str(e))
+
+    def _write_soak(self, report_path: str, members: list, extra: dict):
+        try:
+            rows = []
+            for capture_path, capture, analysis in members:
+                analysis.wait()
+                rows.append((capture.capture_meta.get("device", f"#{capture.device_index + 1}"), analysis.soak, {**capture.sampler_report(), **analysis.counters(), **extra, "capture": capture_path}))
+            write_soak_report(report_path, rows)
+            for (_, capture, _), (_, soak, sampler) in zip(members, rows): self._record(capture, soak.summary(), sampler, report_path)
+            self.reportSaved.emit(report_path)
+        except Exception as e:
+            self.reportFailed.emit(report_path, str(e))
 
 class UpdateCheckThread(QThread):
     """백그라운드에서 최신 버전 정보를 확인하는 스레드."""
     updateAvailable = Signal(str)
     def run(self):
         try:
+            from urllib import request as url_request
             req = url_request.Request("https://api.github.com/repos/deuxdoom/GamePadTester/releases/latest", headers={'Accept': 'application/vnd.github.v3+json'})
             with url_request.urlopen(req, timeout=5) as response:
                 data = json.loads(response.read().decode('utf-8'))
@@ -241,6 +2631,286 @@ class UpdateCheckThread(QThread):
         except Exception as e:
             print(f"업데이트 확인 실패: {e}")
 
+class DeviceNameResolver(QObject):
+    """
+    연결된 패드의 제품명을 확인하는 상주 서비스.
+    - SDL(Pygame)은 초기화한 스레드에서만 이벤트와 장치 목록을 다뤄야 하고 Windows에서는 메인 스레드를 요구하므로,
+      첫 화면 표시 후 GUI 스레드에서 한 번만 초기화하고 타이머로 조이스틱 연결/해제(hotplug) 이벤트나 재검색 요청을 확인합니다.
+    - 목록은 이벤트가 있을 때만 다시 읽으며(초기화는 반복하지 않음), 슬롯 연결 여부는 DeviceStateService 캐시로 확인합니다.
+    - XInput 슬롯과 Pygame 조이스틱은 인덱스가 아니라 USB VID:PID로 짝지으며, ID를 알 수 없을 때만 인덱스 일치로 대체합니다.
+    - GUI는 names()로 캐시된 이름을 즉시 읽고, 목록이 바뀌면 namesChanged로 알림을 받습니다.
+    """
+    namesChanged = Signal()
+
+    POLL_MS = 500 # 이벤트 확인 주기
+
+    def __init__(self, backend: InputBackend, states: "DeviceStateService", parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.xi = backend; self._states = states
+        self._names: dict[int, str] = {}
+        self._pygame = None; self._hotplug = False; self._rescan = False
+        self._timer = QTimer(self); self._timer.setInterval(self.POLL_MS); self._timer.timeout.connect(self._poll)
+        self.scans = 0
+
+    def names(self) -> dict[int, str]: return self._names
+    def request_rescan(self): self._rescan = True
+
+    def start(self):
+        """Pygame을 초기화하고 첫 목록을 읽은 뒤 이벤트 확인을 시작합니다. GUI 스레드에서만 호출할 수 있습니다."""
+        if QThread.currentThread() is not QCoreApplication.instance().thread(): raise RuntimeError("DeviceNameResolver는 GUI 스레드에서 시작해야 합니다 (SDL 스레드 제약).")
+        if self._timer.isActive(): return
+        try:
+            import pygame
+            pygame.init(); pygame.joystick.init(); self._pygame = pygame
+        except Exception as e:
+            print(f"Pygame으로 장치명 로딩 실패: {e}")
+        pygame = self._pygame
+        self._hotplug = pygame is not None and hasattr(pygame, "JOYDEVICEADDED")
+        if self._hotplug:
+            # 연결/해제 이벤트만 큐에 쌓이도록 하여 입력 이벤트로 큐가 넘치지 않게 합니다.
+            try: pygame.event.set_blocked(None); pygame.event.set_allowed([pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED])
+            except Exception: self._hotplug = False
+        try: self._publish(self._resolve())
+        except Exception as e: print(f"장치명 확인 실패: {e}")
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        if self._pygame is not None:
+            try: self._pygame.quit()
+            except Exception: pass
+            self._pygame = None
+
+    def _resolve(self) -> dict[int, str]:
+        pygame = self._pygame
+        joysticks: List[Tuple[str, Optional[Tuple[int, int]]]] = []
+        if pygame is not None:
+            for i in range(pygame.joystick.get_count()):
+                js = pygame.joystick.Joystick(i)
+                joysticks.append((js.get_name(), _sdl_guid_vid_pid(js.get_guid()) if hasattr(js, "get_guid") else None))
+        names: dict[int, str] = {}; used: Set[int] = set(); unmatched: List[int] = []
+        for idx in range(self._states.slot_count):
+            if not self._states.is_connected(idx): continue
+            name = self.xi.get_device_name(idx)
+            if name: names[idx] = name; continue
+            ids = self.xi.get_device_ids(idx)
+            match = next((j for j, (_, js_ids) in enumerate(joysticks) if j not in used and ids is not None and js_ids == ids), None)
+            if match is None: unmatched.append(idx)
+            else: used.add(match); names[idx] = joysticks[match][0]
+        for idx in unmatched: # ID로 짝지을 수 없는 슬롯은 기존과 같이 인덱스가 같은 조이스틱을 사용
+            if idx < len(joysticks) and idx not in used: used.add(idx); names[idx] = joysticks[idx][0]
+        self.scans += 1
+        return names
+
+    def _publish(self, names: dict[int, str]):
+        if names != self._names: self._names = names; self.namesChanged.emit()
+
+    @Slot()
+    def _poll(self):
+        pygame = self._pygame; changed = self._rescan
+        if self._hotplug:
+            try: changed = bool(pygame.event.get()) or changed
+            except Exception: self._hotplug = False # 이벤트 시스템을 쓸 수 없으면 재검색 요청에만 의존
+        if not changed: return
+        self._rescan = False
+        try:
+            if pygame is not None and not self._hotplug: pygame.joystick.quit(); pygame.joystick.init()
+            self._publish(self._resolve())
+        except Exception as e: print(f"장치명 확인 실패: {e}")
+
+class DeviceStateService:
+    """
+    GUI가 사용하는 장치 상태의 단일 창구. 슬롯별 최신 패킷, 패킷 번호, 연결 상태를 캐시하여 모든 소비자에게 제공합니다.
+    - 캐시가 허용 지연(staleness budget)보다 오래된 경우에만 드라이버를 호출하므로 여러 타이머와 핸들러가 같은 슬롯을 반복 조회하지 않습니다.
+    - 측정 중인 장치는 수집 스레드가 관측한 최신 상태를 그대로 사용하므로 GUI의 드라이버 호출이 측정과 경쟁하지 않습니다.
+    - GUI 스레드 전용입니다.
+    """
+    DEFAULT_STALENESS_MS = 16     # 화면 갱신 주기와 같은 기본 허용 지연
+    CONNECTION_STALENESS_MS = 500 # 연결 상태 조회의 허용 지연
+
+    def __init__(self, backend: InputBackend, staleness_ms: float = DEFAULT_STALENESS_MS):
+        self.xi = backend
+        self.staleness_ns = int(max(0.0, staleness_ms) * 1_000_000)
+        n = backend.max_devices
+        self._results = [ERROR_DEVICE_NOT_CONNECTED] * n; self._states = [XINPUT_STATE() for _ in range(n)]; self._stamps = [0] * n
+        self._sources: dict[int, PollingThread] = {}
+        self.driver_calls = 0; self.cache_hits = 0; self.shared_reads = 0
+
+    @property
+    def slot_count(self) -> int: return len(self._states)
+
+    def attach(self, captures: List[PollingThread]):
+        """측정 시작 시 호출: 해당 슬롯은 드라이버 대신 수집 스레드의 최신 상태를 사용합니다."""
+        for capture in captures: self._sources[capture.device_index] = capture
+    def detach(self): self._sources.clear()
+
+    def _refresh(self, idx: int, now_ns: int):
+        source = self._sources.get(idx)
+        shared = source.latest_state() if source is not None else None
+        if shared is not None: self.shared_reads += 1; self._results[idx], self._states[idx] = shared
+        else: self.driver_calls += 1; self._results[idx], self._states[idx] = self.xi.get_state(idx)
+        self._stamps[idx] = now_ns
+
+    def state(self, idx: int, max_age_ms: Optional[float] = None) -> Tuple[int, XINPUT_STATE]:
+        """슬롯의 (결과 코드, 최신 상태). 캐시가 max_age_ms(기본: 허용 지연)보다 오래됐을 때만 갱신합니다."""
+        if not 0 <= idx < len(self._states): return ERROR_DEVICE_NOT_CONNECTED, XINPUT_STATE()
+        now_ns = time.perf_counter_ns(); budget_ns = self.staleness_ns if max_age_ms is None else int(max_age_ms * 1_000_000)
+        if not self._stamps[idx] or now_ns - self._stamps[idx] > budget_ns: self._refresh(idx, now_ns)
+        else: self.cache_hits += 1
+        return self._results[idx], self._states[idx]
+
+    def is_connected(self, idx: int, max_age_ms: Optional[float] = CONNECTION_STALENESS_MS) -> bool:
+        return self.state(idx, max_age_ms)[0] == ERROR_SUCCESS
+    def connections(self, max_age_ms: Optional[float] = CONNECTION_STALENESS_MS) -> List[bool]:
+        return [self.is_connected(i, max_age_ms) for i in range(len(self._states))]
+    def packet_number(self, idx: int) -> int: return self._states[idx].dwPacketNumber if 0 <= idx < len(self._states) else 0
+
+    def counters(self) -> dict:
+        """드라이버 호출 수와, 캐시 또는 수집 스레드 상태로 대신 응답한 횟수."""
+        return {"gui_driver_calls": self.driver_calls, "gui_cache_hits": self.cache_hits, "gui_shared_reads": self.shared_reads}
+
+class DeviceInfoCache(QThread):
+    """
+    배터리 및 장치 정보(capabilities)의 TTL 캐시.
+    - 조회는 캐시 값을 즉시 반환하고, 만료된 항목은 낮은 우선순위의 작업 스레드가 비동기로 다시 읽어 infoUpdated로 알립니다.
+    - 배터리 잔량은 분 단위로 변하고 무선 수신기에서는 조회 호출이 느릴 수 있으므로 GUI 스레드에서 드라이버를 호출하지 않습니다.
+    - 장치 연결/해제 시 invalidate()로 해당 슬롯의 캐시를 비웁니다.
+    """
+    infoUpdated = Signal(int)
+
+    BATTERY_TTL_S = 30.0   # 배터리 정보 유효 시간
+    CAPS_TTL_S = 600.0     # 장치 정보는 재연결 전까지 변하지 않으므로 길게 유지
+    MISSING_TTL_S = 5.0    # 조회 실패(None) 결과의 재시도 간격
+
+    def __init__(self, backend: InputBackend):
+        super().__init__()
+        self.xi = backend
+        self._lock = threading.Lock()
+        self._entries: dict[Tuple[str, int], Tuple[float, object]] = {} # (종류, 슬롯) -> (만료 시각, 값)
+        self._pending: Set[Tuple[str, int]] = set()
+        self._generation: dict[int, int] = {} # invalidate() 이전에 시작된 조회 결과를 버리기 위한 슬롯별 세대
+        self._jobs: "queue.Queue[Optional[Tuple[str, int, int]]]" = queue.Queue()
+        self.requests = 0; self.driver_calls = 0; self._started_s = time.monotonic()
+
+    def _get(self, kind: str, idx: int):
+        self.requests += 1
+        key = (kind, idx)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None or entry[0] <= time.monotonic()) and key not in self._pending:
+                self._pending.add(key); self._jobs.put((kind, idx, self._generation.get(idx, 0)))
+        return entry[1] if entry is not None else None
+
+    def battery(self, idx: int) -> Optional[dict]: return self._get("battery", idx)
+    def capabilities(self, idx: int) -> Optional[XINPUT_CAPABILITIES]: return self._get("caps", idx)
+
+    def invalidate(self, idx: int):
+        with self._lock:
+            self._generation[idx] = self._generation.get(idx, 0) + 1
+            self._entries.pop(("battery", idx), None); self._entries.pop(("caps", idx), None)
+            self._pending.discard(("battery", idx)); self._pending.discard(("caps", idx))
+
+    def mark(self) -> Tuple[int, int, float]:
+        """구간 집계의 기준점 (조회 수, 드라이버 호출 수, 시각). saved_per_minute(since=...)에 전달합니다."""
+        return self.requests, self.driver_calls, time.monotonic()
+
+    def saved_per_minute(self, since: Optional[Tuple[int, int, float]] = None) -> float:
+        """since(mark()) 이후 캐시가 대신 응답하여 생략된 드라이버 호출의 분당 비율. since가 없으면 캐시 시작 이후 전체 구간."""
+        requests, calls, start_s = since if since is not None else (0, 0, self._started_s)
+        elapsed_s = time.monotonic() - start_s
+        if elapsed_s <= 0: return 0.0
+        return max(0, (self.requests - requests) - (self.driver_calls - calls)) / (elapsed_s / 60.0)
+
+    def counters(self) -> dict:
+        return {"info_requests": self.requests, "info_driver_calls": self.driver_calls, "info_saved_per_min": self.saved_per_minute()}
+
+    def stop(self): self._jobs.put(None)
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None: break
+            kind, idx, generation = job
+            try: value = self.xi.get_battery_info(idx) if kind == "battery" else self.xi.get_capabilities(idx)
+            except Exception as e: print(f"장치 정보 조회 실패: {e}"); value = None
+            self.driver_calls += 1
+            ttl = self.MISSING_TTL_S if value is None else (self.BATTERY_TTL_S if kind == "battery" else self.CAPS_TTL_S)
+            with self._lock:
+                if self._generation.get(idx, 0) != generation: continue # 조회 중에 연결 상태가 바뀜
+                self._entries[(kind, idx)] = (time.monotonic() + ttl, value); self._pending.discard((kind, idx))
+            self.infoUpdated.emit(idx)
+
+class UiRefreshScheduler(QObject):
+    """
+    GUI 갱신 타이머(입력 표시, 연결 감지)의 주기를 입력 활동과 창/측정 상태에 맞춰 조절합니다.
+    - 활동: 패킷이 바뀌면 즉시 화면 재생 빈도(모니터 refresh rate)로 올립니다.
+    - 유휴: IDLE_AFTER_S 동안 변화가 없으면 낮은 빈도로 내리고, 창이 숨겨졌거나(최소화) 비활성이면 더 내립니다.
+    - 측정 중: 수집 스레드와 CPU를 다투지 않도록 표시 빈도와 연결 감지 빈도에 상한을 둡니다.
+    - 틱 빈도와 틱당 처리 시간(핸들러 실행 시간, 그리기 제외)을 집계하여 리포트에 남깁니다.
+    """
+    IDLE_AFTER_S = 1.0
+    IDLE_MS, BACKGROUND_MS, MEASURING_MIN_MS = 50, 250, 33 # 유휴 / 숨김·비활성 / 측정 중 최소 간격
+    CONNECTION_MS, CONNECTION_SLOW_MS = 500, 2000
+    MODE_NAMES = {"active": "활동", "idle": "유휴", "background": "백그라운드"}
+
+    def __init__(self, window: QWidget, on_tick: Callable[[], None], on_connection_tick: Callable[[], None]):
+        super().__init__(window)
+        self._window, self._on_tick, self._on_connection_tick = window, on_tick, on_connection_tick
+        self.measuring = False; self.mode = "active"; self._last_activity = time.monotonic()
+        self._ui_timer = QTimer(self); self._ui_timer.timeout.connect(self._tick)
+        self._connection_timer = QTimer(self); self._connection_timer.timeout.connect(self._connection_tick)
+        self.reset_counters()
+        window.installEventFilter(self)
+        self._apply(); self._ui_timer.start(); self._connection_timer.start()
+
+    def refresh_ms(self) -> int:
+        """창이 놓인 화면의 재생 빈도에 맞춘 활동 상태의 틱 간격."""
+        screen = self._window.screen(); hz = screen.refreshRate() if screen is not None else 0.0
+        return max(1, int(1000.0 / hz)) if hz > 1.0 else 16
+
+    def note_activity(self):
+        """입력 변화가 있었음을 알립니다. 유휴 상태였다면 바로 활동 주기로 올립니다."""
+        self._last_activity = time.monotonic()
+        if self.mode != "active": self._apply()
+    def set_measuring(self, measuring: bool): self.measuring = measuring; self._apply()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange, QEvent.ActivationChange): QTimer.singleShot(0, self._apply) # 상태 반영 후 판단
+        return False
+
+    def _select(self) -> Tuple[str, int, int]:
+        """현재 상태에 맞는 (모드, 표시 틱 간격 ms, 연결 감지 간격 ms)."""
+        w = self._window; hidden = not w.isVisible() or w.isMinimized()
+        idle = time.monotonic() - self._last_activity > self.IDLE_AFTER_S
+        connection_ms = self.CONNECTION_SLOW_MS if hidden or self.measuring else self.CONNECTION_MS
+        if hidden or (idle and not w.isActiveWindow()): return "background", self.BACKGROUND_MS, connection_ms
+        if idle: return "idle", self.IDLE_MS, connection_ms
+        active_ms = self.refresh_ms(); return "active", max(active_ms, self.MEASURING_MIN_MS) if self.measuring else active_ms, connection_ms
+
+    @Slot()
+    def _apply(self):
+        self.mode, ui_ms, connection_ms = self._select()
+        if self._ui_timer.interval() != ui_ms: self._ui_timer.setInterval(ui_ms)
+        if self._connection_timer.interval() != connection_ms: self._connection_timer.setInterval(connection_ms)
+
+    @Slot()
+    def _tick(self):
+        t0 = time.perf_counter_ns(); self._on_tick(); cost = time.perf_counter_ns() - t0
+        self.ticks += 1; self.tick_ns += cost; self.tick_max_ns = max(self.tick_max_ns, cost)
+        if self.mode == "active" and time.monotonic() - self._last_activity > self.IDLE_AFTER_S: self._apply() # 활동 → 유휴 전환
+    @Slot()
+    def _connection_tick(self):
+        t0 = time.perf_counter_ns(); self._on_connection_tick(); self.connection_ticks += 1; self.connection_ns += time.perf_counter_ns() - t0
+
+    def reset_counters(self):
+        self.ticks = self.connection_ticks = self.tick_ns = self.connection_ns = self.tick_max_ns = 0; self._since = time.perf_counter_ns()
+
+    def counters(self) -> dict:
+        """reset_counters() 이후의 실효 틱 빈도(Hz)와 틱당 평균/최대 처리 시간(us). 연결 감지 틱의 비용은 표시 틱과 따로 집계합니다."""
+        elapsed_s = max(1e-9, (time.perf_counter_ns() - self._since) / 1e9)
+        return {"ui_tick_hz": self.ticks / elapsed_s, "ui_connection_hz": self.connection_ticks / elapsed_s, "ui_tick_us": self.tick_ns / max(1, self.ticks) / 1000.0,
+                "ui_connection_us": self.connection_ns / max(1, self.connection_ticks) / 1000.0, "ui_tick_max_us": self.tick_max_ns / 1000.0, "ui_mode": self.mode, "ui_interval_ms": self._ui_timer.interval()}
+
 # --- UI 위젯 클래스 ---
 
 STYLESHEET = """
@@ -305,6 +2975,76 @@ class StatWidget(QWidget):
         layout.addWidget(self.title_label, 1, Qt.AlignBottom); layout.addSpacing(10); layout.addWidget(self.value_label, 0, Qt.AlignBottom | Qt.AlignRight)
         layout.addSpacing(5); layout.addWidget(self.unit_label, 0, Qt.AlignBottom | Qt.AlignLeft)
     def set_value(self, value: Optional[float], fmt: str = "{:.2f}"): self.value_label.setText(fmt.format(value) if value is not None else "-")
+    def set_labels(self, title: str, unit: str): self.title_label.setText(title); self.unit_label.setText(unit)
+
+class IntervalPlotWidget(QWidget):
+    """
+    측정 중 간격 타임라인(좌)과 최근 간격 히스토그램(우)을 표시하는 위젯.
+    - 입력은 IntervalPlotFeed.snapshot()의 고정 크기 요약이므로 그리기 비용이 샘플 수와 무관합니다.
+    - 새 스냅샷이 올 때만 QImage에 다시 그리고, paintEvent는 그 이미지를 복사만 합니다.
+    """
+    C_BG, C_BORDER, C_GRID, C_LINE, C_SPIKE, C_TEXT = QColor("#ffffff"), QColor("#d0d0d0"), QColor("#e6e6e6"), QColor("#007bff"), QColor("#dc3545"), QColor("#777777")
+    HIST_TICKS_MS = (0.1, 1.0, 10.0)
+
+    def __init__(self):
+        super().__init__()
+        self._snap: Optional[dict] = None; self._image: Optional[QImage] = None; self.renders = 0
+        self._edges = IntervalPlotFeed().hist_edges_ms()
+        self.setMinimumHeight(90); self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def set_data(self, snap: Optional[dict]):
+        if snap is self._snap: return # 분석 스레드가 새 스냅샷을 게시하지 않았음
+        self._snap = snap; self._image = None; self.update()
+
+    def resizeEvent(self, event): self._image = None; super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._image is None: self._image = self._render()
+        QPainter(self).drawImage(0, 0, self._image)
+
+    def _render(self) -> QImage:
+        dpr = self.devicePixelRatioF(); image = QImage(int(self.width() * dpr), int(self.height() * dpr), QImage.Format_ARGB32_Premultiplied); image.setDevicePixelRatio(dpr); image.fill(Qt.transparent)
+        painter = QPainter(image); painter.setRenderHint(QPainter.Antialiasing)
+        frame = QRectF(0.5, 0.5, self.width() - 1, self.height() - 1)
+        painter.setPen(QPen(self.C_BORDER, 1)); painter.setBrush(self.C_BG); painter.drawRoundedRect(frame, 8, 8)
+        font = QFont(self.font()); font.setPointSize(8); painter.setFont(font)
+        snap = self._snap
+        if not snap or not snap["mins"]:
+            painter.setPen(self.C_TEXT); painter.drawText(frame, Qt.AlignCenter, "측정 중 폴링 간격 그래프가 표시됩니다"); painter.end(); return image
+        inner = frame.adjusted(8, 16, -8, -16); split = inner.width() * 0.68
+        self._draw_timeline(painter, QRectF(inner.x(), inner.y(), split - 8, inner.height()), snap)
+        self._draw_histogram(painter, QRectF(inner.x() + split, inner.y(), inner.width() - split, inner.height()), snap["hist"])
+        painter.end(); self.renders += 1; return image
+
+    def _draw_timeline(self, painter: QPainter, rect: QRectF, snap: dict):
+        """버킷별 (최소, 최대) 세로선. 세로 범위는 상위 2% 열을 잘라 정하고, 잘린 열(지연)은 빨간색으로 표시합니다."""
+        mins, maxs = snap["mins"], snap["maxs"]; ordered = sorted(maxs)
+        top_ms = max(ordered[min(len(ordered) - 1, int(len(ordered) * 0.98))] / 1_000_000.0 * 1.25, 0.05)
+        med_ms = sorted(mins)[len(mins) // 2] / 1_000_000.0
+        sx = rect.width() / IntervalPlotFeed.COLUMNS; sy = rect.height() / top_ms
+        def y_of(ms: float) -> float: return rect.bottom() - min(ms, top_ms) * sy
+        painter.setPen(QPen(self.C_GRID, 1)); painter.drawLine(QLineF(rect.left(), y_of(med_ms), rect.right(), y_of(med_ms)))
+        lines, spikes = [], []
+        for i, (lo, hi) in enumerate(zip(mins, maxs)):
+            x = rect.left() + (i + 0.5) * sx; hi_ms = hi / 1_000_000.0
+            (spikes if hi_ms > top_ms else lines).append(QLineF(x, y_of(lo / 1_000_000.0), x, y_of(hi_ms) - 0.5))
+        painter.setPen(QPen(self.C_LINE, max(1.0, sx * 0.8))); painter.drawLines(lines)
+        if spikes: painter.setPen(QPen(self.C_SPIKE, max(1.0, sx * 0.8))); painter.drawLines(spikes)
+        painter.setPen(self.C_TEXT)
+        painter.drawText(QRectF(rect.left(), rect.top() - 15, rect.width(), 14), Qt.AlignLeft | Qt.AlignVCenter, f"간격 타임라인 · {snap['count']:,}개 (열당 {snap['span']:,}개 최소/최대)")
+        painter.drawText(QRectF(rect.left(), rect.bottom() + 1, rect.width(), 14), Qt.AlignLeft | Qt.AlignVCenter, f"중앙 {med_ms:.3f} ms · 상단 {top_ms:.3f} ms")
+
+    def _draw_histogram(self, painter: QPainter, rect: QRectF, hist: Tuple[int, ...]):
+        """최근 간격의 로그 구간 도수. 막대 높이는 최빈 구간 기준입니다."""
+        peak = max(hist) or 1; bar_w = rect.width() / len(hist)
+        painter.setPen(Qt.NoPen); painter.setBrush(self.C_LINE)
+        for i, c in enumerate(hist):
+            if c: h = max(1.0, rect.height() * c / peak); painter.drawRect(QRectF(rect.left() + i * bar_w, rect.bottom() - h, max(1.0, bar_w - 0.5), h))
+        painter.setPen(self.C_TEXT); log_min = self._edges[0]
+        painter.drawText(QRectF(rect.left(), rect.top() - 15, rect.width(), 14), Qt.AlignLeft | Qt.AlignVCenter, f"최근 {IntervalPlotFeed.HIST_WINDOW:,}개 분포")
+        for ms in self.HIST_TICKS_MS:
+            x = rect.left() + math.log10(ms / log_min) * IntervalPlotFeed.HIST_PER_DECADE * bar_w
+            painter.drawText(QRectF(x - 20, rect.bottom() + 1, 40, 14), Qt.AlignCenter, f"{ms:g}ms")
 
 class BatteryWidget(QWidget):
     """배터리 상태 표시 위젯."""
@@ -396,43 +3136,76 @@ class InputHistoryWidget(QWidget):
             painter.drawText(rect, Qt.AlignCenter, text)
 
 class AnalogStickWidget(QWidget):
-    """아날로그 스틱의 위치와 클릭 상태를 시각적으로 표현하는 위젯."""
+    """
+    아날로그 스틱의 위치와 클릭 상태를 시각적으로 표현하는 위젯.
+    - 원판과 십자선은 크기/눌림 상태별로 미리 그린 픽스맵을 재사용하고, 위치가 바뀌면 핸들의 이전/새 영역만 다시 그립니다.
+    """
+    C_BORDER, C_BORDER_ON, C_BG, C_CROSS, C_HANDLE = QColor("#adadad"), QColor("#007bff"), QColor("#f0f0f0"), QColor("#cccccc"), QColor("#333333")
+    HANDLE_RADIUS = 3
+
     def __init__(self):
         super().__init__()
         self.x, self.y = 0.0, 0.0
         self.is_pressed = False
+        self._chrome: dict[bool, QPixmap] = {}
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMinimumSize(100, 100)
 
-    def set_pos(self, x: float, y: float): self.x, self.y = x, -y; self.update()
+    def _geometry(self) -> Tuple[QPointF, float]:
+        size = min(self.width(), self.height()); return QPointF(self.width() / 2, self.height() / 2), size / 2 * 0.9
+
+    def _handle_rect(self) -> QRectF:
+        center, radius = self._geometry(); travel = radius - self.HANDLE_RADIUS; r = self.HANDLE_RADIUS + 1
+        return QRectF(center.x() + self.x * travel - r, center.y() + self.y * travel - r, 2 * r, 2 * r)
+
+    def set_pos(self, x: float, y: float):
+        if (x, -y) == (self.x, self.y): return
+        old = self._handle_rect(); self.x, self.y = x, -y
+        self.update(old.united(self._handle_rect()).toAlignedRect())
     def set_pressed(self, pressed: bool):
         if self.is_pressed != pressed: self.is_pressed = pressed; self.update()
 
-    def paintEvent(self, event):
-        painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
-        size = min(self.width(), self.height()); center = QPointF(self.width() / 2, self.height() / 2); radius = size / 2 * 0.9
-        
-        border_color = QColor("#007bff") if self.is_pressed else QColor("#adadad"); bg_color = QColor("#f0f0f0")
-        painter.setPen(QPen(border_color, 8 if self.is_pressed else 2)); painter.setBrush(bg_color); painter.drawEllipse(center, radius, radius)
+    def resizeEvent(self, event): self._chrome.clear(); super().resizeEvent(event)
 
-        painter.setPen(QPen(QColor("#cccccc"), 1))
+    def _render_chrome(self, pressed: bool) -> QPixmap:
+        dpr = self.devicePixelRatioF(); pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr)); pixmap.setDevicePixelRatio(dpr); pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap); painter.setRenderHint(QPainter.Antialiasing)
+        center, radius = self._geometry()
+        painter.setPen(QPen(self.C_BORDER_ON if pressed else self.C_BORDER, 8 if pressed else 2)); painter.setBrush(self.C_BG); painter.drawEllipse(center, radius, radius)
+        painter.setPen(QPen(self.C_CROSS, 1))
         painter.drawLine(QPointF(center.x() - radius, center.y()), QPointF(center.x() + radius, center.y()))
         painter.drawLine(QPointF(center.x(), center.y() - radius), QPointF(center.x(), center.y() + radius))
-        
-        handle_radius = 3
-        travel_radius = radius - handle_radius
+        painter.end(); return pixmap
+
+    def paintEvent(self, event):
+        chrome = self._chrome.get(self.is_pressed)
+        if chrome is None: chrome = self._chrome[self.is_pressed] = self._render_chrome(self.is_pressed)
+        painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPixmap(0, 0, chrome) # 갱신 영역 밖은 Qt가 잘라냄
+        center, radius = self._geometry(); travel_radius = radius - self.HANDLE_RADIUS
         handle_pos = QPointF(center.x() + self.x * travel_radius, center.y() + self.y * travel_radius)
-        painter.setBrush(QColor("#333333")); painter.setPen(Qt.NoPen); painter.drawEllipse(handle_pos, handle_radius, handle_radius)
+        painter.setBrush(self.C_HANDLE); painter.setPen(Qt.NoPen); painter.drawEllipse(handle_pos, self.HANDLE_RADIUS, self.HANDLE_RADIUS)
 
 class GamepadWidget(QWidget):
-    """게임패드 전체의 시각적 표현을 담당하는 메인 위젯."""
+    """
+    게임패드 전체의 시각적 표현을 담당하는 메인 위젯.
+    - 몸체와 모든 버튼의 '꺼짐' 모습은 크기별로 한 번만 픽스맵에 그려 두고, paintEvent는 눌린 버튼과 트리거 값만 덧그립니다.
+    - update_state는 이전 값과 필드별로 비교하여 바뀐 버튼/트리거의 영역만 무효화하므로, 입력이 없으면 다시 그리지 않습니다.
+    """
+    C_OUTLINE, C_BG, C_BTN_OFF, C_BTN_ON, C_TEXT, C_BORDER, C_SHADOW = QColor("#d0d0d0"), QColor("#ffffff"), QColor("#e9e9e9"), QColor("#007bff"), QColor("#333333"), QColor("#adadad"), QColor(255, 255, 255, 120)
+    _fonts: Optional[Tuple[QFont, QFont, QFont]] = None # (트리거 라벨, 트리거 값/숄더, 페이스 버튼). QApplication 생성 후 첫 그리기에서 만듦
+    FACE_RADIUS = 22
+    # 버튼 이름 → (그리기 종류, 표시 문자)
+    _ELEMENTS = {"LB": ("shoulder", "LB"), "RB": ("shoulder", "RB"), "Y": ("face", "Y"), "X": ("face", "X"), "B": ("face", "B"), "A": ("face", "A"),
+                 "BACK": ("face", "⁝"), "START": ("face", "≡"), "DPAD_UP": ("dpad", ""), "DPAD_DOWN": ("dpad", ""), "DPAD_LEFT": ("dpad", ""), "DPAD_RIGHT": ("dpad", "")}
+
     def __init__(self):
         super().__init__()
-        self.button_states = {}
-        self.trigger_L_val = 0.0
-        self.trigger_R_val = 0.0
+        self.buttons = 0
         self.raw_trigger_L = 0
         self.raw_trigger_R = 0
+        self._rects: Optional[dict[str, QRectF]] = None
+        self._chrome: Optional[QPixmap] = None
         self.stick_L = AnalogStickWidget()
         self.stick_R = AnalogStickWidget()
         layout = QGridLayout(self)
@@ -444,94 +3217,106 @@ class GamepadWidget(QWidget):
         layout.setRowStretch(1, 0)
 
     def update_state(self, gp_state: XINPUT_GAMEPAD):
-        """컨트롤러 상태 정보를 받아 위젯의 시각적 요소를 갱신합니다."""
-        self.button_states = { "DPAD_UP": bool(gp_state.wButtons & XINPUT_GAMEPAD_DPAD_UP), "DPAD_DOWN": bool(gp_state.wButtons & XINPUT_GAMEPAD_DPAD_DOWN), "DPAD_LEFT": bool(gp_state.wButtons & XINPUT_GAMEPAD_DPAD_LEFT), "DPAD_RIGHT": bool(gp_state.wButtons & XINPUT_GAMEPAD_DPAD_RIGHT), "START": bool(gp_state.wButtons & XINPUT_GAMEPAD_START), "BACK": bool(gp_state.wButtons & XINPUT_GAMEPAD_BACK), "LTHUMB": bool(gp_state.wButtons & XINPUT_GAMEPAD_LEFT_THUMB), "RTHUMB": bool(gp_state.wButtons & XINPUT_GAMEPAD_RIGHT_THUMB), "LB": bool(gp_state.wButtons & XINPUT_GAMEPAD_LEFT_SHOULDER), "RB": bool(gp_state.wButtons & XINPUT_GAMEPAD_RIGHT_SHOULDER), "A": bool(gp_state.wButtons & XINPUT_GAMEPAD_A), "B": bool(gp_state.wButtons & XINPUT_GAMEPAD_B), "X": bool(gp_state.wButtons & XINPUT_GAMEPAD_X), "Y": bool(gp_state.wButtons & XINPUT_GAMEPAD_Y) }
+        """컨트롤러 상태 정보를 받아 바뀐 요소의 영역만 다시 그리도록 요청합니다."""
+        rects = self._layout()
+        changed = gp_state.wButtons ^ self.buttons
+        if changed:
+            self.buttons = gp_state.wButtons
+            for name, mask in BUTTON_MASKS.items():
+                if changed & mask and name in rects: self.update(rects[name].toAlignedRect().adjusted(-2, -2, 2, 2))
+            self.stick_L.set_pressed(bool(self.buttons & XINPUT_GAMEPAD_LEFT_THUMB)); self.stick_R.set_pressed(bool(self.buttons & XINPUT_GAMEPAD_RIGHT_THUMB))
+        if gp_state.bLeftTrigger != self.raw_trigger_L: self.raw_trigger_L = gp_state.bLeftTrigger; self.update(rects["LT"].toAlignedRect().adjusted(-2, -2, 2, 2))
+        if gp_state.bRightTrigger != self.raw_trigger_R: self.raw_trigger_R = gp_state.bRightTrigger; self.update(rects["RT"].toAlignedRect().adjusted(-2, -2, 2, 2))
         self.stick_L.set_pos(normalize_stick_value(gp_state.sThumbLX), normalize_stick_value(gp_state.sThumbLY))
         self.stick_R.set_pos(normalize_stick_value(gp_state.sThumbRX), normalize_stick_value(gp_state.sThumbRY))
-        self.stick_L.set_pressed(self.button_states.get("LTHUMB", False)); self.stick_R.set_pressed(self.button_states.get("RTHUMB", False))
-        self.trigger_L_val = gp_state.bLeftTrigger / 255.0
-        self.trigger_R_val = gp_state.bRightTrigger / 255.0
-        self.raw_trigger_L = gp_state.bLeftTrigger
-        self.raw_trigger_R = gp_state.bRightTrigger
-        self.update()
-        
-    def _draw_trigger(self, painter, colors, rect, value, raw_value, text):
-        """트리거 버튼 하나를 그리는 헬퍼 메서드."""
-        C_BORDER, C_BTN_OFF, C_BTN_ON, C_TEXT = colors
-        painter.setPen(QPen(C_BORDER, 1)); painter.setBrush(C_BTN_OFF); painter.drawRoundedRect(rect, 6, 6)
-        if value > 0:
-            fill_h = rect.height() * value
-            fill_rect = QRectF(rect.x(), rect.y() + rect.height() - fill_h, rect.width(), fill_h)
-            painter.setBrush(C_BTN_ON); painter.setPen(Qt.NoPen); painter.drawRoundedRect(fill_rect, 6, 6)
-        
-        # LT/RT 텍스트를 상단에 표시
-        painter.setPen(C_TEXT)
-        font = painter.font()
-        font.setPointSize(10)
-        font.setBold(False)
-        painter.setFont(font)
-        painter.drawText(rect, Qt.AlignTop | Qt.AlignHCenter, text)
 
-        # Raw 아날로그 값을 중앙에 표시
-        font.setPointSize(11)
-        font.setBold(True)
-        painter.setFont(font)
-        # 가독성을 위해 텍스트에 흰색 그림자 효과 추가
-        painter.setPen(QColor(255, 255, 255, 120))
-        painter.drawText(rect.translated(1, 1), Qt.AlignCenter, str(raw_value))
-        painter.setPen(C_TEXT)
-        painter.drawText(rect, Qt.AlignCenter, str(raw_value))
+    def resizeEvent(self, event):
+        self._rects = None; self._chrome = None; super().resizeEvent(event)
 
-
-    def _draw_shoulder_button(self, painter, colors, rect, is_on, text):
-        """숄더 버튼 하나를 그리는 헬퍼 메서드."""
-        C_BORDER, C_BTN_OFF, C_BTN_ON, C_TEXT = colors
-        painter.setPen(QPen(C_BORDER, 1)); painter.setBrush(C_BTN_ON if is_on else C_BTN_OFF); painter.drawRoundedRect(rect, 8, 8)
-        painter.setPen(C_TEXT); painter.drawText(rect, Qt.AlignCenter, text)
-
-    def paintEvent(self, event):
-        """위젯의 모든 시각적 요소를 그립니다 (Qt에 의해 호출됨)."""
-        painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
+    def _layout(self) -> dict[str, QRectF]:
+        """현재 크기에서 각 요소의 위치를 계산합니다 (크기가 바뀔 때만 다시 계산)."""
+        if self._rects is not None: return self._rects
         c, w, h = self.rect().center(), self.width(), self.height()
-
-        C_OUTLINE, C_BG, C_BTN_OFF, C_BTN_ON, C_TEXT, C_BORDER = QColor("#d0d0d0"), QColor("#ffffff"), QColor("#e9e9e9"), QColor("#007bff"), QColor("#333333"), QColor("#adadad")
-        colors = (C_BORDER, C_BTN_OFF, C_BTN_ON, C_TEXT)
-
-        painter.setPen(QPen(C_OUTLINE, 2)); painter.setBrush(C_BG)
-        body_rect = self.rect().adjusted(10, 10, -10, -(self.stick_L.height() + 22))
-        painter.drawRoundedRect(body_rect, 30, 30)
-
+        body_rect = QRectF(self.rect().adjusted(10, 10, -10, -(self.stick_L.height() + 22)))
         # 버튼 크기 조정
         trigger_h, trigger_w = 75, 35
         shoulder_h, shoulder_w = 28, w * 0.16
-        
         trigger_y = body_rect.y() + 15; shoulder_y = trigger_y + trigger_h + 8
         left_x_center = body_rect.x() + 85; right_x_center = body_rect.right() - 85
-        
-        lt_rect = QRectF(left_x_center - trigger_w / 2, trigger_y, trigger_w, trigger_h); lb_rect = QRectF(left_x_center - shoulder_w / 2, shoulder_y, shoulder_w, shoulder_h)
-        rt_rect = QRectF(right_x_center - trigger_w / 2, trigger_y, trigger_w, trigger_h); rb_rect = QRectF(right_x_center - shoulder_w / 2, shoulder_y, shoulder_w, shoulder_h)
-
-        self._draw_trigger(painter, colors, lt_rect, self.trigger_L_val, self.raw_trigger_L, "LT"); self._draw_shoulder_button(painter, colors, lb_rect, self.button_states.get("LB", False), "LB")
-        self._draw_trigger(painter, colors, rt_rect, self.trigger_R_val, self.raw_trigger_R, "RT"); self._draw_shoulder_button(painter, colors, rb_rect, self.button_states.get("RB", False), "RB")
-
-        def draw_face_button(x_pos, y_pos, name, text=""):
-            is_on = self.button_states.get(name, False)
-            painter.setBrush(C_BTN_ON if is_on else C_BTN_OFF); painter.setPen(QPen(C_BORDER, 1)); painter.drawEllipse(QPointF(x_pos, y_pos), 22, 22)
-            if text:
-                painter.setPen(C_TEXT); painter.setFont(QFont("Segoe UI", 12, QFont.Bold))
-                painter.drawText(QRectF(x_pos - 22, y_pos - 22, 44, 44), Qt.AlignCenter, text)
-
+        r = self.FACE_RADIUS
+        def face(x_pos, y_pos): return QRectF(x_pos - r, y_pos - r, 2 * r, 2 * r)
         abxy_y_base, abxy_x_base, abxy_radius = c.y() + h * 0.05, c.x() + w * 0.27, 32
-        draw_face_button(abxy_x_base, abxy_y_base - abxy_radius, "Y", "Y"); draw_face_button(abxy_x_base - abxy_radius, abxy_y_base, "X", "X")
-        draw_face_button(abxy_x_base + abxy_radius, abxy_y_base, "B", "B"); draw_face_button(abxy_x_base, abxy_y_base + abxy_radius, "A", "A")
-
         dpad_x_base, dpad_y_base = c.x() - w * 0.27, abxy_y_base; arm_w, arm_l, gap = 30, 30, 15
-        dpad_states = { "DPAD_UP": QRectF(dpad_x_base - arm_w/2, dpad_y_base - arm_l - gap, arm_w, arm_l), "DPAD_DOWN": QRectF(dpad_x_base - arm_w/2, dpad_y_base + gap, arm_w, arm_l), "DPAD_LEFT": QRectF(dpad_x_base - arm_l - gap, dpad_y_base - arm_w/2, arm_l, arm_w), "DPAD_RIGHT": QRectF(dpad_x_base + gap, dpad_y_base - arm_w/2, arm_l, arm_w) }
-        painter.setPen(QPen(C_BORDER, 1))
-        for name, rect in dpad_states.items():
-            painter.setBrush(C_BTN_ON if self.button_states.get(name, False) else C_BTN_OFF); painter.drawRoundedRect(rect, 4, 4)
+        self._rects = {
+            "BODY": body_rect,
+            "LT": QRectF(left_x_center - trigger_w / 2, trigger_y, trigger_w, trigger_h), "LB": QRectF(left_x_center - shoulder_w / 2, shoulder_y, shoulder_w, shoulder_h),
+            "RT": QRectF(right_x_center - trigger_w / 2, trigger_y, trigger_w, trigger_h), "RB": QRectF(right_x_center - shoulder_w / 2, shoulder_y, shoulder_w, shoulder_h),
+            "Y": face(abxy_x_base, abxy_y_base - abxy_radius), "X": face(abxy_x_base - abxy_radius, abxy_y_base),
+            "B": face(abxy_x_base + abxy_radius, abxy_y_base), "A": face(abxy_x_base, abxy_y_base + abxy_radius),
+            "DPAD_UP": QRectF(dpad_x_base - arm_w/2, dpad_y_base - arm_l - gap, arm_w, arm_l), "DPAD_DOWN": QRectF(dpad_x_base - arm_w/2, dpad_y_base + gap, arm_w, arm_l),
+            "DPAD_LEFT": QRectF(dpad_x_base - arm_l - gap, dpad_y_base - arm_w/2, arm_l, arm_w), "DPAD_RIGHT": QRectF(dpad_x_base + gap, dpad_y_base - arm_w/2, arm_l, arm_w),
+            "BACK": face(c.x() - 50, c.y() - h * 0.15), "START": face(c.x() + 50, c.y() - h * 0.15),
+        }
+        return self._rects
+
+    def _ensure_fonts(self) -> Tuple[QFont, QFont, QFont]:
+        if GamepadWidget._fonts is None:
+            label = QFont(self.font()); label.setPointSize(10); label.setBold(False)
+            value = QFont(self.font()); value.setPointSize(11); value.setBold(True)
+            GamepadWidget._fonts = (label, value, QFont("Segoe UI", 12, QFont.Bold))
+        return GamepadWidget._fonts
+
+    def _draw_trigger(self, painter, rect, raw_value, text, chrome: bool):
+        """트리거 하나를 그립니다. chrome이면 빈 틀과 라벨만, 아니면 채움과 값만 그립니다."""
+        label_font, value_font, _ = self._ensure_fonts()
+        if chrome:
+            painter.setPen(QPen(self.C_BORDER, 1)); painter.setBrush(self.C_BTN_OFF); painter.drawRoundedRect(rect, 6, 6)
+        elif raw_value > 0:
+            fill_h = rect.height() * raw_value / 255.0
+            fill_rect = QRectF(rect.x(), rect.y() + rect.height() - fill_h, rect.width(), fill_h)
+            painter.setBrush(self.C_BTN_ON); painter.setPen(Qt.NoPen); painter.drawRoundedRect(fill_rect, 6, 6)
+        else: return
+        # LT/RT 텍스트를 상단에 표시 (채움이 라벨을 덮을 수 있으므로 다시 그림)
+        painter.setPen(self.C_TEXT); painter.setFont(label_font)
+        painter.drawText(rect, Qt.AlignTop | Qt.AlignHCenter, text)
 
-        draw_face_button(c.x() - 50, c.y() - h * 0.15, "BACK", "⁝"); draw_face_button(c.x() + 50, c.y() - h * 0.15, "START", "≡")
+    def _draw_trigger_value(self, painter, rect, raw_value):
+        # Raw 아날로그 값을 중앙에 표시. 가독성을 위해 텍스트에 흰색 그림자 효과 추가
+        painter.setFont(self._ensure_fonts()[1])
+        painter.setPen(self.C_SHADOW); painter.drawText(rect.translated(1, 1), Qt.AlignCenter, str(raw_value))
+        painter.setPen(self.C_TEXT); painter.drawText(rect, Qt.AlignCenter, str(raw_value))
+
+    def _draw_button(self, painter, name: str, rect: QRectF, is_on: bool):
+        """숄더/페이스/방향 버튼 하나를 그리는 헬퍼 메서드."""
+        kind, text = self._ELEMENTS[name]
+        painter.setPen(QPen(self.C_BORDER, 1)); painter.setBrush(self.C_BTN_ON if is_on else self.C_BTN_OFF)
+        if kind == "shoulder": painter.drawRoundedRect(rect, 8, 8); painter.setFont(self._ensure_fonts()[1])
+        elif kind == "face": painter.drawEllipse(rect); painter.setFont(self._ensure_fonts()[2])
+        else: painter.drawRoundedRect(rect, 4, 4)
+        if text: painter.setPen(self.C_TEXT); painter.drawText(rect, Qt.AlignCenter, text)
+
+    def _render_chrome(self) -> QPixmap:
+        """몸체와 모든 요소의 기본(꺼짐) 모습을 픽스맵으로 미리 그립니다."""
+        rects = self._layout()
+        dpr = self.devicePixelRatioF(); pixmap = QPixmap(int(self.width() * dpr), int(self.height() * dpr)); pixmap.setDevicePixelRatio(dpr); pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap); painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.C_OUTLINE, 2)); painter.setBrush(self.C_BG); painter.drawRoundedRect(rects["BODY"], 30, 30)
+        self._draw_trigger(painter, rects["LT"], 0, "LT", True); self._draw_trigger(painter, rects["RT"], 0, "RT", True)
+        for name in self._ELEMENTS: self._draw_button(painter, name, rects[name], False)
+        painter.end(); return pixmap
+
+    def paintEvent(self, event):
+        """미리 그린 기본 모습 위에 갱신 영역과 겹치는 동적 요소(눌린 버튼, 트리거 값)만 덧그립니다."""
+        if self._chrome is None: self._chrome = self._render_chrome()
+        rects = self._layout(); dirty = QRectF(event.rect())
+        painter = QPainter(self); painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPixmap(0, 0, self._chrome) # 갱신 영역 밖은 Qt가 잘라냄
+        for name, raw, text in (("LT", self.raw_trigger_L, "LT"), ("RT", self.raw_trigger_R, "RT")):
+            rect = rects[name]
+            if rect.intersects(dirty): self._draw_trigger(painter, rect, raw, text, False); self._draw_trigger_value(painter, rect, raw)
+        if self.buttons:
+            for name in self._ELEMENTS:
+                if self.buttons & BUTTON_MASKS[name] and rects[name].intersects(dirty): self._draw_button(painter, name, rects[name], True)
 
 class AxisDisplayWidget(QWidget):
     """스틱의 X, Y축 좌표값을 텍스트로 표시하는 위젯."""
@@ -552,24 +3337,62 @@ class AxisDisplayWidget(QWidget):
 
 class MainWindow(QWidget):
     """어플리케이션의 메인 윈도우. UI 구성과 이벤트 처리를 총괄합니다."""
-    def __init__(self):
+    startupFinished = Signal()
+    # 측정 모드별 통계 위젯의 (제목, 단위). 지연 모드는 같은 자리에 지연 분포를 표시합니다.
+    STAT_LABELS = {"polling": {"mean_hz": ("평균", "Hz"), "median_hz": ("중앙값", "Hz"), "mean_ms": ("평균 간격", "ms"), "stability_pct": ("안정도", "%")},
+                   "latency": {"mean_hz": ("평균 지연", "ms"), "median_hz": ("중앙 지연", "ms"), "mean_ms": ("무응답", "회"), "stability_pct": ("일관성", "%")}}
+
+    def __init__(self, backend: Optional[InputBackend] = None, staleness_ms: float = DeviceStateService.DEFAULT_STALENESS_MS, gc_mode: str = "freeze", fidelity: Optional[int] = None,
+                 results_db: Optional[str] = RESULTS_DB_NAME):
         super().__init__()
+        self._gc_mode = gc_mode # 측정 구간의 가비지 컬렉터 제어 (--gc)
+        self._fidelity_cpu = FIDELITY_AUTO if fidelity is None else fidelity; self._fidelity_default = fidelity is not None # '고정밀 측정' 체크 시 고정할 코어와 기본 체크 여부 (--high-fidelity)
         self.setWindowTitle(f"게임패드 테스터 v{VERSION}")
         self.setObjectName("MainWindow")
         self.setFixedSize(1300, 720)
         
-        self._thread: Optional[PollingThread] = None; self._xi = XInput(); self._vib_on = False; self.is_measuring = False
-        self.last_connection_state = [False, False, False, False]; self.device_order: List[int] = []
+        self._xi = backend if backend is not None else XInput()
+        self._thread: Optional[PollingThread | MultiPollingThread] = None
+        self._capture_path: Optional[str] = None
+        self._analyses: List[AnalysisThread] = []
+        self._primary = 0 # 화면에 표시하는 장치의 분석 스레드 번호
+        self._gui_pull_ns = 0; self._gui_pulls = 0
+        self._vib_on = False
+        self.is_measuring = False
+        self._soak_s: Optional[int] = None
+        self._state = DeviceStateService(self._xi, staleness_ms) # GUI의 모든 상태 조회는 이 서비스를 거칩니다.
+        self._info = DeviceInfoCache(self._xi); self._info.infoUpdated.connect(self.on_device_info); self._info.start(QThread.LowestPriority)
+        self._names = DeviceNameResolver(self._xi, self._state, self); self._names.namesChanged.connect(self.relabel_devices) # 첫 화면 표시 후 GUI 스레드에서 시작
+        self.last_connection_state = [False] * self._state.slot_count; self.device_order: List[int] = []
         self.previous_button_states: Set[str] = set()
+        self._last_ui_packet: Optional[Tuple[int, int]] = None # 마지막으로 화면에 반영한 (장치, 패킷 번호)
 
         root_layout = QHBoxLayout(self); root_layout.setContentsMargins(20, 20, 20, 20); root_layout.setSpacing(20)
         root_layout.addWidget(self._create_left_panel(), 4); root_layout.addWidget(self._create_center_panel(), 6)
 
-        self._ui_timer = QTimer(self); self._ui_timer.setInterval(16); self._ui_timer.timeout.connect(self.update_gamepad_ui); self._ui_timer.start()
-        self._connection_timer = QTimer(self); self._connection_timer.setInterval(500); self._connection_timer.timeout.connect(self.check_connection_status_realtime); self._connection_timer.start()
+        self._refresh = UiRefreshScheduler(self, self.update_gamepad_ui, self.check_connection_status_realtime) # 입력 표시/연결 감지 타이머 (활동량에 따라 주기 조절)
+        self._stats_timer = QTimer(self); self._stats_timer.setInterval(50); self._stats_timer.timeout.connect(self.pull_stats) # 측정 중에만 동작
         
         self.refresh_devices()
-        self.update_checker = UpdateCheckThread(); self.update_checker.updateAvailable.connect(self.show_update_dialog); self.update_checker.start()
+        # 결과 저장소: 상대 경로는 리포트와 같은 실행 파일 위치 기준 (--results-db, --no-results-db면 None)
+        self._store = ResultsStore(resolve_results_db(results_db)) if results_db else None
+        self.report_writer = ReportWriterThread(self._store); self.report_writer.reportSaved.connect(self.on_report_saved); self.report_writer.reportFailed.connect(self.on_report_failed); self.report_writer.start()
+        self.update_checker = UpdateCheckThread(); self.update_checker.updateAvailable.connect(self.show_update_dialog) # 첫 화면 표시 후 시작
+        self._deferred_started = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._deferred_started:
+            self._deferred_started = True; startup_mark("창 표시")
+            QTimer.singleShot(0, self._start_deferred) # 첫 프레임이 그려진 뒤 이벤트 루프에서 실행
+
+    @Slot()
+    def _start_deferred(self):
+        """시작 시간에 필요 없는 서브시스템(장치명 확인, 업데이트 확인)을 첫 화면 이후에 시작합니다."""
+        startup_mark("첫 프레임")
+        self._names.start(); self.update_checker.start(QThread.LowPriority)
+        startup_mark("지연 서브시스템 시작")
+        self.startupFinished.emit()
 
     def _create_left_panel(self) -> QWidget:
         """좌측 컨트롤 패널 UI를 생성합니다."""
@@ -591,12 +3414,17 @@ class MainWindow(QWidget):
         button_row_layout = QHBoxLayout()
         self.toggle_measure_button = QPushButton("측정 시작"); self.toggle_measure_button.setObjectName("StartButton"); self.toggle_measure_button.clicked.connect(self.toggle_measurement)
         self.btn_refresh = QPushButton("새로고침"); self.btn_refresh.clicked.connect(self.refresh_devices)
-        button_row_layout.addWidget(self.toggle_measure_button); button_row_layout.addStretch(1); button_row_layout.addWidget(self.btn_refresh)
+        self.chk_soak_raw = QCheckBox("내구 측정 원본 기록"); self.chk_soak_raw.setEnabled(False)
+        self.chk_soak_raw.setToolTip("내구 측정 중 원본 패킷을 캡처 파일(.gpcap)로도 저장합니다. 끄면 초/분 단위 집계만 남아 장시간 측정에도 디스크와 메모리 사용량이 일정합니다.")
+        self.chk_fidelity = QCheckBox("고정밀 측정"); self.chk_fidelity.setChecked(self._fidelity_default)
+        self.chk_fidelity.setToolTip("측정 스레드를 한 코어에 고정하고 우선순위와 타이머 해상도를 올립니다. 측정이 끝나면 원래대로 되돌리며, 적용/실패한 설정은 리포트에 기록됩니다.")
+        button_row_layout.addWidget(self.toggle_measure_button); button_row_layout.addSpacing(10); button_row_layout.addWidget(self.chk_soak_raw); button_row_layout.addWidget(self.chk_fidelity); button_row_layout.addStretch(1); button_row_layout.addWidget(self.btn_refresh)
         layout.addLayout(button_row_layout, 2, 0, 1, 2)
 
         device_widget = QWidget(); device_layout = QHBoxLayout(device_widget); device_layout.setContentsMargins(0,0,0,0)
         self.cmb_xinput_device = QComboBox(); self.cmb_xinput_device.currentIndexChanged.connect(self.update_start_button_state)
-        device_layout.addWidget(QLabel("테스트 대상:")); device_layout.addWidget(self.cmb_xinput_device, 1); layout.addWidget(device_widget, 3, 0, 1, 2)
+        self.chk_all_devices = QCheckBox("전체 장치 동시 측정"); self.chk_all_devices.setToolTip("연결된 모든 장치를 하나의 수집 루프에서 함께 측정하고 장치별 리포트와 통합 리포트를 저장합니다.")
+        device_layout.addWidget(QLabel("테스트 대상:")); device_layout.addWidget(self.cmb_xinput_device, 1); device_layout.addWidget(self.chk_all_devices); layout.addWidget(device_widget, 3, 0, 1, 2)
 
         self.stats = { "mean_hz": StatWidget("평균", "Hz"), "median_hz": StatWidget("중앙값", "Hz"), "mean_ms": StatWidget("평균 간격", "ms"), "stability_pct": StatWidget("안정도", "%") }
         layout.addWidget(self.stats["mean_hz"], 4, 0); layout.addWidget(self.stats["median_hz"], 4, 1)
@@ -606,10 +3434,20 @@ class MainWindow(QWidget):
         row6_layout = QHBoxLayout()
         samples_layout = QHBoxLayout(); samples_layout.addWidget(QLabel("샘플 수:"))
         self.cmb_samples = QComboBox(); self.cmb_samples.addItems(["1000", "2000", "4000", "8000", "16000"]); self.cmb_samples.setCurrentText("4000")
+        for label, seconds in SOAK_DURATIONS.items(): self.cmb_samples.addItem(label, userData=seconds) # 내구 측정 (시간 예산)
+        self.cmb_samples.currentIndexChanged.connect(lambda: self.chk_soak_raw.setEnabled(bool(self.cmb_samples.currentData())))
         samples_layout.addWidget(self.cmb_samples);
+        samples_layout.addWidget(QLabel("샘플링:"))
+        self.cmb_sampler = QComboBox()
+        for key, label in SAMPLER_STRATEGIES.items(): self.cmb_sampler.addItem(label, userData=key)
+        samples_layout.addWidget(self.cmb_sampler)
         
         gyro_layout = QHBoxLayout(); self.radio_standard = QRadioButton("표준"); self.radio_gyro = QRadioButton("자이로/모션"); self.radio_standard.setChecked(True)
-        gyro_layout.addWidget(self.radio_standard); gyro_layout.addWidget(self.radio_gyro)
+        self.radio_latency = QRadioButton("지연"); self.radio_latency.toggled.connect(self.on_latency_mode)
+        self.radio_latency.setToolTip(f"진동(자극)을 보낸 뒤 응답 버튼({SIM_LOOPBACK_BUTTON})이 눌린 첫 패킷까지의 입력 지연을 '샘플 수'회 측정합니다.\n진동을 감지해 버튼을 누르는 루프백 장치가 필요합니다.")
+        gyro_layout.addWidget(self.radio_standard); gyro_layout.addWidget(self.radio_gyro); gyro_layout.addWidget(self.radio_latency)
+        # 자이로 모드로 기록된 캡처를 재생할 때는 원본과 같은 간격이 나오도록 자이로 모드를 기본으로 선택합니다.
+        if isinstance(self._xi, ReplayBackend) and self._xi.capture_metadata(0).get("mode") == "gyro": self.radio_gyro.setChecked(True)
         
         row6_layout.addLayout(samples_layout)
         row6_layout.addStretch(1)
@@ -618,17 +3456,19 @@ class MainWindow(QWidget):
         
         self.progress_bar = QProgressBar(); self.progress_bar.setValue(0); self.progress_bar.setTextVisible(True); self.progress_bar.setFormat("%p%")
         layout.addWidget(self.progress_bar, 7, 0, 1, 2)
+        self.sampler_label = QLabel(""); self.sampler_label.setObjectName("StatusLabel"); layout.addWidget(self.sampler_label, 8, 0, 1, 2)
 
-        line = QFrame(); line.setFrameShape(QFrame.HLine); line.setFrameShadow(QFrame.Sunken); layout.addWidget(line, 8, 0, 1, 2)
+        line = QFrame(); line.setFrameShape(QFrame.HLine); line.setFrameShadow(QFrame.Sunken); layout.addWidget(line, 9, 0, 1, 2)
         
         vib_box=QGroupBox(""); vib_layout=QVBoxLayout(vib_box)
         self.sld_left=QSlider(Qt.Horizontal); self.sld_left.setRange(0,100); self.sld_left.setValue(50)
         self.sld_right=QSlider(Qt.Horizontal); self.sld_right.setRange(0,100); self.sld_right.setValue(50)
         self.btn_vib=QPushButton("진동 테스트"); self.btn_vib.setObjectName("VibButton"); self.btn_vib.clicked.connect(self.toggle_vibration)
         vib_layout.addWidget(QLabel("좌측 진동 모터")); vib_layout.addWidget(self.sld_left); vib_layout.addWidget(QLabel("우측 진동 모터")); vib_layout.addWidget(self.sld_right); vib_layout.addWidget(self.btn_vib)
-        self.sld_left.valueChanged.connect(self.update_vibration_intensity); self.sld_right.valueChanged.connect(self.update_vibration_intensity); layout.addWidget(vib_box, 9, 0, 1, 2)
+        self.sld_left.valueChanged.connect(self.update_vibration_intensity); self.sld_right.valueChanged.connect(self.update_vibration_intensity); layout.addWidget(vib_box, 10, 0, 1, 2)
         
-        layout.setRowStretch(10, 1); return panel
+        self.plot_widget = IntervalPlotWidget(); layout.addWidget(self.plot_widget, 11, 0, 1, 2)
+        layout.setRowStretch(11, 1); return panel
         
     def _create_center_panel(self) -> QWidget:
         """중앙 게임패드 및 AXIS 값 디스플레이 패널 UI를 생성합니다."""
@@ -658,17 +3498,23 @@ class MainWindow(QWidget):
     @Slot()
     def check_connection_status_realtime(self):
         """주기적으로 컨트롤러 연결 상태의 변경을 감지합니다."""
-        current_connections = [self._xi.get_state(i)[0] == ERROR_SUCCESS for i in range(4)]
+        current_connections = self._state.connections()
         if current_connections != self.last_connection_state:
+            for idx, (was, now) in enumerate(zip(self.last_connection_state, current_connections)):
+                if was != now: self._info.invalidate(idx)
             self.last_connection_state = current_connections
+            self._names.request_rescan()
             QTimer.singleShot(100, self.refresh_devices)
+        self.battery_widget.setToolTip(f"배터리/장치 정보 캐시: 시작 이후 드라이버 호출 분당 평균 {self._info.saved_per_minute():,.0f}회 절약")
+        ui = self._refresh.counters()
+        self.gamepad_widget.setToolTip(f"화면 갱신: {UiRefreshScheduler.MODE_NAMES[ui['ui_mode']]} {ui['ui_interval_ms']} ms 주기, 실효 {ui['ui_tick_hz']:.1f} Hz, 틱당 평균 {ui['ui_tick_us']:.0f} us")
 
     def update_start_button_state(self):
         """현재 선택된 장치의 연결 상태에 따라 측정 시작 버튼을 활성화/비활성화합니다."""
         if self.is_measuring: return
         idx = self.cmb_xinput_device.currentData(Qt.UserRole)
         if idx is None: self.toggle_measure_button.setEnabled(False); return
-        res, _ = self._xi.get_state(idx); self.toggle_measure_button.setEnabled(res == ERROR_SUCCESS)
+        self.toggle_measure_button.setEnabled(self._state.is_connected(idx))
 
     @Slot()
     def update_gamepad_ui(self):
@@ -678,8 +3524,12 @@ class MainWindow(QWidget):
         
         self.update_battery_status(idx)
         
-        res, state = self._xi.get_state(idx)
+        res, state = self._state.state(idx)
         if res == ERROR_SUCCESS:
+            key = (idx, state.dwPacketNumber)
+            if key == self._last_ui_packet: return # 패킷 번호가 그대로면 입력도 그대로이므로 위젯을 건드리지 않음
+            self._last_ui_packet = key
+            self._refresh.note_activity()
             gp = state.Gamepad
             self.gamepad_widget.update_state(gp)
             self.axis_L.update_values(normalize_stick_value(gp.sThumbLX), normalize_stick_value(gp.sThumbLY))
@@ -695,22 +3545,11 @@ class MainWindow(QWidget):
 
     def update_battery_status(self, idx: int):
         """주기적으로 배터리 상태를 확인하고 UI에 반영합니다."""
-        info = self._xi.get_battery_info(idx)
-        self.battery_widget.update_status(info)
+        self.battery_widget.update_status(self._info.battery(idx)) # 캐시 값 (만료 시 작업 스레드가 비동기로 갱신)
 
     def get_pressed_buttons_set(self, w_buttons: int) -> Set[str]:
         """wButtons 값으로부터 현재 눌린 버튼 이름의 집합을 반환합니다."""
-        buttons = {
-            "DPAD_UP": XINPUT_GAMEPAD_DPAD_UP, "DPAD_DOWN": XINPUT_GAMEPAD_DPAD_DOWN,
-            "DPAD_LEFT": XINPUT_GAMEPAD_DPAD_LEFT, "DPAD_RIGHT": XINPUT_GAMEPAD_DPAD_RIGHT,
-            "START": XINPUT_GAMEPAD_START, "BACK": XINPUT_GAMEPAD_BACK,
-            "LTHUMB": XINPUT_GAMEPAD_LEFT_THUMB, "RTHUMB": XINPUT_GAMEPAD_RIGHT_THUMB,
-            "LB": XINPUT_GAMEPAD_LEFT_SHOULDER, "RB": XINPUT_GAMEPAD_RIGHT_SHOULDER,
-            "A": XINPUT_GAMEPAD_A, "B": XINPUT_GAMEPAD_B,
-            "X": XINPUT_GAMEPAD_X, "Y": XINPUT_GAMEPAD_Y
-        }
-        pressed_set = {name for name, mask in buttons.items() if (w_buttons & mask)}
-        return pressed_set
+        return {name for name, mask in BUTTON_MASKS.items() if (w_buttons & mask)}
 
     @Slot()
     def toggle_measurement(self):
@@ -721,62 +3560,141 @@ class MainWindow(QWidget):
         """폴링 측정 스레드를 시작하고 관련 UI 상태를 '측정 중'으로 변경합니다."""
         if self._thread and self._thread.isRunning(): return
         self._dev_idx = int(self.cmb_xinput_device.currentData(Qt.UserRole) or 0)
-        max_samples = int(self.cmb_samples.currentText())
-        self.progress_bar.setMaximum(max_samples); self.progress_bar.setValue(0)
+        self._soak_s = self.cmb_samples.currentData(Qt.UserRole) # 내구 측정이면 시간 예산(초)
+        max_samples = int(self.cmb_samples.currentText()) if not self._soak_s else 0
+        self.progress_bar.setMaximum(int(self._soak_s or max_samples)); self.progress_bar.setValue(0)
+        raw = not self._soak_s or self.chk_soak_raw.isChecked()
         
-        self._thread = PollingThread(self._dev_idx, max_samples, self.radio_gyro.isChecked())
-        self._thread.statsUpdated.connect(self.on_stats); self._thread.deviceError.connect(self.on_error); self._thread.measurementFinished.connect(self.stop_measure)
-        self._thread.start()
+        strategy = self.cmb_sampler.currentData(Qt.UserRole); fidelity = self._fidelity_cpu if self.chk_fidelity.isChecked() else None
+        if self.radio_latency.isChecked():
+            # 지연 측정: 단일 장치, 샘플 수 = 자극 횟수. 진동 모터를 자극으로 쓰므로 진동 테스트는 끕니다.
+            if self._soak_s: self.status_label.setText("지연 측정은 샘플 수(자극 횟수)로만 설정할 수 있습니다."); return
+            if self._vib_on: self.toggle_vibration()
+            self._capture_path = self._output_path("Latency", "txt")
+            self._thread = LatencyProbeThread(self._dev_idx, max_samples, backend=self._xi, strategy=strategy, capture_meta={"device": self.cmb_xinput_device.currentText()}, gc_mode=self._gc_mode, fidelity=fidelity)
+            self._analyses = [AnalysisThread(self._thread)]; self._primary = 0
+        elif self.chk_all_devices.isChecked():
+            # 다중 장치 측정: 연결된 모든 슬롯을 한 루프에서 폴링하며, 표시 위젯은 선택된 장치를 따라갑니다.
+            indices = [i for i, connected in enumerate(self._state.connections()) if connected]
+            if not indices: self.status_label.setText("측정 가능한 장치가 없습니다."); return
+            labels = {self.cmb_xinput_device.itemData(i, Qt.UserRole): self.cmb_xinput_device.itemText(i) for i in range(self.cmb_xinput_device.count())}
+            names = [labels.get(i, f"포트 #{i + 1}") for i in indices]
+            self._capture_path = self._output_path("Soak" if self._soak_s else "Report", "txt", "전체 장치") # 통합 요약 리포트
+            self._thread = MultiPollingThread(indices, max_samples, self.radio_gyro.isChecked(), backend=self._xi, strategy=strategy, duration_s=self._soak_s,
+                                              capture_paths=[self._output_path("Capture", "gpcap", name) if raw else None for name in names], capture_meta=[{"device": name} for name in names], gc_mode=self._gc_mode, fidelity=fidelity)
+            self._thread.channelError.connect(self.on_channel_error)
+            self._analyses = [AnalysisThread(ch, soak_log_path=self._output_path("Soak", "csv", name) if self._soak_s else None) for ch, name in zip(self._thread.channels, names)]
+            self._primary = indices.index(self._dev_idx) if self._dev_idx in indices else 0
+        else:
+            capture_path = self._output_path("Capture", "gpcap") if raw else None
+            self._capture_path = self._output_path("Soak", "txt") if self._soak_s else capture_path # 측정 종료 후 리포트의 기준 경로
+            self._thread = PollingThread(self._dev_idx, max_samples, self.radio_gyro.isChecked(), backend=self._xi, strategy=strategy, duration_s=self._soak_s,
+                                         capture_path=capture_path, capture_meta={"device": self.cmb_xinput_device.currentText()}, gc_mode=self._gc_mode, fidelity=fidelity)
+            self._analyses = [AnalysisThread(self._thread, soak_log_path=self._output_path("Soak", "csv") if self._soak_s else None)]; self._primary = 0
+        self._thread.deviceError.connect(self.on_error); self._thread.measurementFinished.connect(self.stop_measure)
+        self._gui_pull_ns = 0; self._gui_pulls = 0
+        self._state_counters = self._state.counters(); self._info_mark = self._info.mark() # 측정 구간 집계의 기준점
+        self._refresh.reset_counters(); self._refresh.set_measuring(True)
+        self._state.attach([analysis.capture for analysis in self._analyses])
+        self.plot_widget.set_data(None)
+        self._thread.start(); self._stats_timer.start()
+        for analysis in self._analyses: analysis.start()
         
         self.is_measuring = True
         self.toggle_measure_button.setText("측정 중지"); self.toggle_measure_button.setObjectName("StopButton"); self.style().polish(self.toggle_measure_button)
-        self.status_label.setText("측정 중... 컨트롤러를 계속 움직여주세요.")
-        self.cmb_xinput_device.setEnabled(False); self.btn_refresh.setEnabled(False)
+        self.status_label.setText("지연 측정 중... 루프백 장치를 연결한 채로 컨트롤러를 건드리지 마세요." if isinstance(self._thread, LatencyProbeThread) else "측정 중... 컨트롤러를 계속 움직여주세요.")
+        self._set_controls_enabled(False)
+        self.btn_vib.setEnabled(not isinstance(self._thread, LatencyProbeThread))
 
     @Slot()
     def stop_measure(self):
         """폴링 측정 스레드를 종료하고 UI 상태를 복원하며, 결과 리포트를 자동 저장합니다."""
-        data_to_save = None
-        if self._thread:
-            if self._thread.snapshot_intervals_ns(): data_to_save = self._thread.snapshot_intervals_ns()
-            self._thread.stop(); self._thread.wait(1500); self._thread = None
-        if data_to_save: self.auto_save_report(data_to_save)
+        self._stats_timer.stop()
+        thread, analyses, capture_path = self._thread, self._analyses, self._capture_path
+        self._thread = None; self._analyses = []; self._capture_path = None
+        self._state.detach()
+        if thread:
+            # 종료 대기와 리포트 저장은 작업 큐에서 처리합니다. 이후 도착하는 시그널이 새 측정에 영향을 주지 않도록 연결을 끊습니다.
+            thread.deviceError.disconnect(self.on_error); thread.measurementFinished.disconnect(self.stop_measure)
+            thread.stop()
+            for analysis in analyses: analysis.stop()
+            extra = {"gui_pull_us": self._gui_pull_ns / max(1, self._gui_pulls) / 1000.0,
+                     **{k: v - self._state_counters.get(k, 0) for k, v in self._state.counters().items()}, # 측정 구간 동안의 GUI 상태 조회
+                     "info_saved_per_min": self._info.saved_per_minute(self._info_mark), **self._refresh.counters()} # 캐시 절약도 측정 구간 기준
+            if isinstance(thread, MultiPollingThread): thread.channelError.disconnect(self.on_channel_error)
+            if isinstance(thread, LatencyProbeThread): self.report_writer.submit_latency(capture_path, thread, analyses[0], extra)
+            elif self._soak_s: self.report_writer.submit_soak(capture_path, thread, analyses, extra)
+            elif isinstance(thread, MultiPollingThread):
+                self.report_writer.submit_group(capture_path, thread, analyses, extra)
+            elif capture_path:
+                self.report_writer.submit(capture_path, thread, analyses[0], extra)
         if self._vib_on: self._xi.set_vibration(self._dev_idx, 0, 0); self._vib_on = False; self.btn_vib.setText("진동 테스트")
         
-        self.is_measuring = False; self.progress_bar.setValue(0)
+        self.is_measuring = False; self.progress_bar.setValue(0); self._refresh.set_measuring(False) # 리포트에 측정 중 주기가 남도록 집계 후 해제
         self.toggle_measure_button.setText("측정 시작"); self.toggle_measure_button.setObjectName("StartButton"); self.style().polish(self.toggle_measure_button)
-        self.status_label.setText("측정이 중지되었습니다.")
-        self.cmb_xinput_device.setEnabled(True); self.btn_refresh.setEnabled(True)
+        self.status_label.setText("측정이 중지되었습니다. 결과를 저장하는 중..." if thread and capture_path else "측정이 중지되었습니다.")
+        self._set_controls_enabled(True)
+        self.btn_vib.setEnabled(True)
+        self.on_latency_mode(self.radio_latency.isChecked())
         self.update_start_button_state()
         for stat_widget in self.stats.values(): stat_widget.set_value(None)
 
+    @Slot()
+    def pull_stats(self):
+        """측정 파이프라인의 3단계(표시). 분석 스레드가 게시한 최신 스냅샷을 가져와 화면에 반영합니다."""
+        if not self._analyses: return
+        t0 = time.perf_counter_ns()
+        snapshots = [analysis.latest_snapshot() for analysis in self._analyses]
+        self.on_stats(snapshots[self._primary])
+        self.plot_widget.set_data(self._analyses[self._primary].latest_plot())
+        if len(snapshots) > 1:
+            # 통합 보기: 진행률은 가장 느린 장치 기준, 하단 라벨에는 장치별 요약을 표시합니다.
+            self.progress_bar.setValue(min(int(snap["soak_elapsed_s"]) if "soak_elapsed_s" in snap else snap.get("samples", 0) for snap in snapshots))
+            self.sampler_label.setText(format_device_summary([(a.capture.capture_meta.get("device", ""), snap) for a, snap in zip(self._analyses, snapshots)]))
+        self._gui_pull_ns += time.perf_counter_ns() - t0; self._gui_pulls += 1
+
+    def _set_controls_enabled(self, enabled: bool):
+        """측정 중에는 바꿀 수 없는 장치·측정 설정 컨트롤을 한꺼번에 켜거나 끕니다."""
+        for widget in (self.cmb_xinput_device, self.btn_refresh, self.cmb_sampler, self.cmb_samples, self.chk_fidelity,
+                       self.radio_standard, self.radio_gyro, self.radio_latency):
+            widget.setEnabled(enabled)
+        self.chk_soak_raw.setEnabled(enabled and bool(self.cmb_samples.currentData())) # 내구 측정 항목에서만 의미가 있음
+        self.chk_all_devices.setEnabled(enabled and not self.radio_latency.isChecked()) # 지연 측정은 단일 장치 전용
+
+    @Slot(bool)
+    def on_latency_mode(self, latency: bool):
+        """지연 모드에서는 통계 위젯의 의미를 바꾸고, 지원하지 않는 다중 장치 측정을 끕니다."""
+        for key, (title, unit) in self.STAT_LABELS["latency" if latency else "polling"].items(): self.stats[key].set_labels(title, unit)
+        if latency: self.chk_all_devices.setChecked(False)
+        self.chk_all_devices.setEnabled(not latency and not self.is_measuring)
+
     @Slot(dict)
     def on_stats(self, stats: dict):
+        if "latency_stimuli" in stats:
+            self.stats["mean_hz"].set_value(stats.get("mean_ms")); self.stats["median_hz"].set_value(stats.get("median_ms"))
+            self.stats["mean_ms"].set_value(stats["latency_timeouts"], "{:d}"); self.stats["stability_pct"].set_value(stats.get("stability_pct"))
+            self.progress_bar.setValue(stats.get("samples", 0))
+            self.sampler_label.setText(f"자극 {stats['latency_stimuli']:,}회 · 자극 호출 {stats.get('stimulus_call_us', 0):.0f}µs · " + format_sampler_report(stats)); return
         self.stats["mean_hz"].set_value(stats.get("mean_hz")); self.stats["median_hz"].set_value(stats.get("median_hz"))
         self.stats["mean_ms"].set_value(stats.get("mean_ms")); self.stats["stability_pct"].set_value(stats.get("stability_pct"))
+        if "soak_elapsed_s" in stats: self.progress_bar.setValue(int(stats["soak_elapsed_s"])); self.sampler_label.setText(format_soak_status(stats)); return
         self.progress_bar.setValue(stats.get("samples", 0))
+        self.sampler_label.setText(format_sampler_report(stats))
     @Slot(str)
     def on_error(self, msg: str): self.status_label.setText(f"오류: {msg}"); self.stop_measure()
+    @Slot(int, str)
+    def on_channel_error(self, idx: int, msg: str): self.status_label.setText(f"오류: 포트 #{idx + 1} {msg} (나머지 장치는 계속 측정합니다)")
 
     def refresh_devices(self):
         """최초 연결된 컨트롤러 순서를 유지하며 장치 목록 UI를 갱신합니다."""
-        current_connections = [self._xi.get_state(i)[0] == ERROR_SUCCESS for i in range(4)]
-        for idx in range(4):
+        current_connections = self._state.connections(max_age_ms=100) # 연결 변화 감지 직후 호출되므로 그 결과를 재사용
+        for idx in range(self._state.slot_count):
             if current_connections[idx] and idx not in self.device_order: self.device_order.append(idx)
-        pygame_names = get_gamepad_names_from_pygame()
         current_selection_data = self.cmb_xinput_device.currentData(Qt.UserRole)
         self.cmb_xinput_device.clear()
-        display_order = self.device_order + [i for i in range(4) if i not in self.device_order]
+        display_order = self.device_order + [i for i in range(self._state.slot_count) if i not in self.device_order]
         for idx in display_order:
-            res, _ = self._xi.get_state(idx)
-            label = f"#{self.device_order.index(idx) + 1}" if idx in self.device_order else f"포트 #{idx + 1}"
-            if res == ERROR_SUCCESS:
-                name = pygame_names.get(idx, "")
-                if name: label += f" [{name.split(' (Controller')[0]}]"
-                else:
-                    caps = self._xi.get_capabilities(idx); subtype_name = _SUBTYPE_NAME.get(caps.SubType, "장치") if caps else "장치"; label += f" [{subtype_name}]"
-            else: label += " (미연결)"
-            self.cmb_xinput_device.addItem(label, userData=idx)
+            self.cmb_xinput_device.addItem(self._device_label(idx, current_connections[idx]), userData=idx)
         if current_selection_data is not None:
             index_in_new_list = self.cmb_xinput_device.findData(current_selection_data, Qt.UserRole)
             if index_in_new_list != -1: self.cmb_xinput_device.setCurrentIndex(index_in_new_list)
@@ -786,27 +3704,47 @@ class MainWindow(QWidget):
                 if idx is not None and current_connections[idx]: self.cmb_xinput_device.setCurrentIndex(i); break
         self.update_start_button_state()
 
-    def auto_save_report(self, data_ns: List[int]):
-        """측정 결과를 요약 및 원본 데이터를 포함하여 텍스트 파일로 자동 저장합니다."""
-        base_path = os.path.dirname(os.path.abspath(sys.argv[0])); dev_text = self.cmb_xinput_device.currentText(); sanitized_name = "".join(c for c in dev_text if c.isalnum() or c in " _-").replace("__", "_").strip()
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S'); filename = f"Report_{sanitized_name}_{timestamp}.txt"; path = os.path.join(base_path, filename)
-        stats = compute_polling_stats(data_ns)
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write("Gamepad Polling Rate Test Report\n" + "="*40 + "\n"); f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"); f.write(f"Device: {dev_text}\n" + "="*40 + "\n\n")
-                f.write("[Summary]\n"); f.write(f"  Average Rate: {stats.get('mean_hz', 0):.2f} Hz\n"); f.write(f"  Median Rate: {stats.get('median_hz', 0):.2f} Hz\n"); f.write(f"  Average Interval: {stats.get('mean_ms', 0):.3f} ms\n")
-                f.write(f"  Median Interval: {stats.get('median_ms', 0):.3f} ms\n"); f.write(f"  Stability: {stats.get('stability_pct', 0):.1f}%\n"); f.write(f"  Total Samples: {len(data_ns):,}\n\n")
-                f.write("[Raw Interval Data (ms)]\n"); [f.write(f"{ns / 1_000_000.0:.4f}\n") for ns in data_ns]
-            self.status_label.setText(f"결과가 {filename}에 자동 저장되었습니다.")
-            dlg = QMessageBox(self); dlg.setWindowTitle("저장 완료"); dlg.setText("테스트 결과가 저장되었습니다."); dlg.setInformativeText(f"파일 위치: {path}"); dlg.addButton("확인", QMessageBox.AcceptRole); dlg.setIcon(QMessageBox.Information); dlg.exec()
-        except Exception as e: self.status_label.setText(f"파일 자동 저장 실패: {e}")
+    def _device_label(self, idx: int, connected: bool) -> str:
+        label = f"#{self.device_order.index(idx) + 1}" if idx in self.device_order else f"포트 #{idx + 1}"
+        if not connected: return label + " (미연결)"
+        name = self._names.names().get(idx, "")
+        if name: return label + f" [{name.split(' (Controller')[0]}]"
+        caps = self._info.capabilities(idx); subtype_name = _SUBTYPE_NAME.get(caps.SubType, "장치") if caps else "장치"
+        return label + f" [{subtype_name}]"
+
+    @Slot(int)
+    def on_device_info(self, idx: int):
+        """작업 스레드가 장치 정보를 갱신하면 해당 장치의 목록 표시를 고칩니다 (측정 중에는 파일명에 쓰이므로 유지)."""
+        if self.is_measuring: return
+        i = self.cmb_xinput_device.findData(idx, Qt.UserRole)
+        if i != -1 and self._state.is_connected(idx):
+            label = self._device_label(idx, True)
+            if label != self.cmb_xinput_device.itemText(i): self.cmb_xinput_device.setItemText(i, label)
+    @Slot()
+    def relabel_devices(self):
+        """이름 확인 서비스의 목록이 바뀌면 연결된 장치의 표시 이름을 고칩니다."""
+        for idx in range(self._state.slot_count): self.on_device_info(idx)
+
+    def _output_path(self, prefix: str, ext: str, device_text: Optional[str] = None) -> str:
+        """실행 파일 위치에 '<prefix>_<장치명>_<시각>.<ext>' 형식의 결과 파일 경로를 만듭니다."""
+        base_path = os.path.dirname(os.path.abspath(sys.argv[0])); dev_text = device_text if device_text is not None else self.cmb_xinput_device.currentText(); sanitized_name = "".join(c for c in dev_text if c.isalnum() or c in " _-").replace("__", "_").strip()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S'); return os.path.join(base_path, f"{prefix}_{sanitized_name}_{timestamp}.{ext}")
+
+    @Slot(str)
+    def on_report_saved(self, path: str):
+        """리포트 저장 완료를 상태 표시줄과 비모달 알림으로 표시합니다."""
+        self.status_label.setText(f"결과가 {os.path.basename(path)}에 자동 저장되었습니다.")
+        dlg = QMessageBox(self); dlg.setWindowTitle("저장 완료"); dlg.setText("테스트 결과가 저장되었습니다."); dlg.setInformativeText(f"파일 위치: {path}"); dlg.addButton("확인", QMessageBox.AcceptRole); dlg.setIcon(QMessageBox.Information)
+        dlg.setWindowModality(Qt.NonModal); dlg.setAttribute(Qt.WA_DeleteOnClose); dlg.show()
+    @Slot(str, str)
+    def on_report_failed(self, path: str, error: str): self.status_label.setText(f"파일 자동 저장 실패: {error}")
 
     @Slot()
     def update_vibration_intensity(self):
         if self._vib_on: idx = int(self.cmb_xinput_device.currentData(Qt.UserRole) or 0); l = int(self.sld_left.value() * 655.35); r = int(self.sld_right.value() * 655.35); self._xi.set_vibration(idx, l, r)
     def toggle_vibration(self):
         idx = int(self.cmb_xinput_device.currentData(Qt.UserRole) or 0)
-        if self._xi.get_state(idx)[0] != ERROR_SUCCESS: return
+        if not self._state.is_connected(idx): return
         self._vib_on = not self._vib_on; self.btn_vib.setText("테스트 종료" if self._vib_on else "진동 테스트")
         if self._vib_on: self.update_vibration_intensity()
         else: self._xi.set_vibration(idx, 0, 0)
@@ -814,9 +3752,14 @@ class MainWindow(QWidget):
     def show_update_dialog(self, new_version: str):
         msg_box = QMessageBox(self); msg_box.setWindowTitle("업데이트 알림"); msg_box.setText(f"새로운 버전 {new_version}을(를) 사용할 수 있습니다.\n다운로드 페이지로 이동하시겠습니까?"); msg_box.setIcon(QMessageBox.Information)
         update_button = msg_box.addButton("업데이트", QMessageBox.ActionRole); msg_box.addButton("나중에", QMessageBox.RejectRole); msg_box.exec();
-        if msg_box.clickedButton() == update_button: webbrowser.open("https://github.com/deuxdoom/GamePadTester/releases")
+        if msg_box.clickedButton() == update_button: open_url("https://github.com/deuxdoom/GamePadTester/releases")
     def show_about_dialog(self): AboutDialog(self).exec()
-    def closeEvent(self, event): self.stop_measure(); super().closeEvent(event)
+    def closeEvent(self, event):
+        self.stop_measure()
+        self.report_writer.stop(); self.report_writer.wait() # 대기 중인 리포트를 모두 저장한 뒤 종료
+        if self._store is not None: self._store.close()
+        self._info.stop(); self._info.wait(); self._names.stop()
+        super().closeEvent(event)
 
 class AboutDialog(QDialog):
     """'정보' 창을 표시하는 간단한 대화상자 클래스."""
@@ -830,29 +3773,302 @@ class AboutDialog(QDialog):
         title_label = QLabel(f"게임패드 테스터 v{VERSION}"); title_label.setObjectName("TitleLabel"); title_label.setAlignment(Qt.AlignCenter); layout.addWidget(title_label)
         desc_label = QLabel("XInput 컨트롤러의 폴링레이트, 버튼, 스틱, 진동을 테스트하는 프로그램입니다."); desc_label.setWordWrap(True); desc_label.setAlignment(Qt.AlignCenter); layout.addWidget(desc_label)
         layout.addStretch(1)
-        github_button = QPushButton("GitHub 방문"); github_button.clicked.connect(lambda: webbrowser.open("https://github.com/deuxdoom/GamePadTester")); layout.addWidget(github_button)
+        github_button = QPushButton("GitHub 방문"); github_button.clicked.connect(lambda: open_url("https://github.com/deuxdoom/GamePadTester")); layout.addWidget(github_button)
+
+# --- 헤드리스(CLI) 측정 ---
+
+EXIT_PASS, EXIT_FAIL, EXIT_ERROR = 0, 1, 2
+
+def _record_headless(args: argparse.Namespace, capture: PollingThread, stats: dict, sampler: dict, report_path: str):
+    """헤드리스 측정 결과를 결과 저장소에 기록합니다 (--no-results-db면 생략, 실패해도 종료 코드에는 영향 없음)."""
+    if args.no_results_db: return
+    path = resolve_results_db(args.results_db); store = ResultsStore(path)
+    try: print(f"결과 저장소: #{store.record_capture(capture, stats, sampler, report_path)} -> {path}")
+    except Exception as e: print(f"결과 저장소 기록 실패: {e}", file=sys.stderr)
+    finally: store.close()
+
+def _headless_result(args: argparse.Namespace, capture: PollingThread, analysis: AnalysisThread, device: str, out_path: str, capture_path: str) -> Tuple[bool, dict, dict]:
+    """헤드리스 측정 한 장치분의 결과 파일을 저장하고 (합격 여부, 분석 결과, 샘플러 정보)를 반환합니다."""
+    sampler = {**capture.sampler_report(), **analysis.counters()}
+    if args.format == "txt": stats = export_capture_to_text(capture_path, out_path, sampler)
+    else:
+        with CaptureReader(capture_path) as cap: stats = analyze_intervals(cap.intervals_ns())
+    checks = {"samples": stats.get("samples", 0) >= args.samples}
+    # 샘플러 여유와 패킷 누락은 실행 환경(코어 수, 부하)에 따라 흔들리므로 기본은 경고만 하고, 기준을 지정했을 때만 합격 판정에 넣습니다.
+    keepup = sampler_keepup(stats, sampler)
+    if args.min_keepup is not None: checks["keepup"] = keepup is None or keepup >= args.min_keepup
+    if args.max_missed is not None: checks["missed"] = not has_missed_packets(sampler, args.max_missed)
+    if args.min_hz is not None: checks["min_hz"] = stats.get("median_hz", 0) >= args.min_hz
+    if args.min_stability is not None: checks["min_stability"] = stats.get("stability_pct", 0) >= args.min_stability
+    passed = all(checks.values())
+    if args.format == "json":
+        summary = {k: v for k, v in stats.items() if k not in ("outliers", "histogram", "quantiles_ms")}
+        summary.update({"outlier_count": len(stats.get("outliers", [])), "device": device, "mode": args.mode, "confidence": measurement_confidence(stats, sampler),
+                        "sampler": sampler, "checks": checks, "passed": passed, "capture": capture_path})
+        with open(out_path, "w", encoding="utf-8") as f: json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"{'PASS' if passed else 'FAIL'} {device} samples={stats.get('samples', 0)} median={stats.get('median_hz', 0):.2f}Hz "
+          f"mean={stats.get('mean_hz', 0):.2f}Hz stability={stats.get('stability_pct', 0):.1f}% -> {out_path}")
+    for name, ok in checks.items():
+        if not ok: print(f"  기준 미달: {device} {name}", file=sys.stderr)
+    if args.min_keepup is None and is_undersampled(stats, sampler): print(f"  주의: {device} 샘플러 폴링 주기가 장치 주기의 {keepup:.2f}배로 언더샘플링입니다", file=sys.stderr)
+    if args.max_missed is None and has_missed_packets(sampler): print(f"  주의: {device} 패킷 {sampler['missed_pct']:.2f}%가 관측되지 않았습니다 (수집 스레드 정지)", file=sys.stderr)
+    if measurement_confidence(stats, sampler).get("sampler_limited"): print(f"  주의: {device} 간격 지터의 대부분이 샘플러의 시각 분해능에서 옵니다", file=sys.stderr)
+    _record_headless(args, capture, stats, {**sampler, "capture": capture_path}, out_path)
+    return passed, stats, sampler
+
+def _run_soak_headless(args: argparse.Namespace, backend: InputBackend, indices: List[int], devices: List[str], stamp: str) -> int:
+    """내구 측정(--soak): 시간 예산 동안 측정하며 분 구간마다 한 줄 요약을 출력하고, 끝나면 내구 리포트를 저장합니다."""
+    duration = parse_duration(args.soak)
+    out_path = args.output or f"Soak_{'all' if args.all_devices else str(indices[0] + 1)}_{backend.name}_{stamp}.{'json' if args.format == 'json' else 'txt'}"
+    root = os.path.splitext(out_path)[0]; tags = [f"_{i + 1}" if args.all_devices else "" for i in indices]
+    raw = args.soak_raw or args.format == "gpcap"
+    capture_paths = [f"{root}{tag}.gpcap" if raw else None for tag in tags]; log_paths = [f"{root}{tag}.csv" for tag in tags]
+    errors: List[str] = []
+    if args.all_devices:
+        thread = MultiPollingThread(indices, args.samples, args.mode == "gyro", backend=backend, strategy=args.sampler, capture_paths=capture_paths,
+                                    capture_meta=[{"device": d} for d in devices], duration_s=duration, gc_mode=args.gc, fidelity=args.high_fidelity)
+        channels = thread.channels
+    else:
+        thread = PollingThread(indices[0], args.samples, args.mode == "gyro", backend=backend, strategy=args.sampler, capture_path=capture_paths[0],
+                               capture_meta={"device": devices[0]}, duration_s=duration, gc_mode=args.gc, fidelity=args.high_fidelity)
+        channels = [thread]
+    thread.deviceError.connect(errors.append, Qt.DirectConnection)
+    def minute_printer(device: str):
+        return lambda m: print(f"[{device}] {m[0] + 1}분: {m[2]:.1f}Hz 안정도 {'-' if m[3] is None else f'{m[3]:.1f}%'} 최대 간격 {m[4] / 1e6:.3f}ms 끊김 {m[5]}", flush=True)
+    analyses = [AnalysisThread(ch, soak_log_path=log_path, on_minute=minute_printer(device)) for ch, log_path, device in zip(channels, log_paths, devices)]
+    print(f"내구 측정 시작: {duration:,.0f}초, 장치 {len(channels)}개 -> {out_path}", flush=True)
+    thread.start()
+    for analysis in analyses: analysis.start()
+    if not thread.wait(int((duration + 30) * 1000)): thread.stop(); thread.wait()
+    for analysis in analyses: analysis.stop(); analysis.wait()
+    backend.close()
+    if errors: print(f"오류: {errors[0]}", file=sys.stderr); return EXIT_ERROR
+
+    rows = [(device, analysis.soak, {**ch.sampler_report(), **analysis.counters(), "capture": path}) for ch, analysis, device, path in zip(channels, analyses, devices, capture_paths)]
+    passed_all = True; results = []
+    for device, soak, sampler in rows:
+        summary = soak.summary(); worst = summary["worst_minute"]
+        checks = {"samples": summary["samples"] > 0}
+        if args.min_hz is not None: checks["min_hz"] = (worst[2] if worst else summary["rate_hz"]) >= args.min_hz # 가장 나쁜 1분 기준
+        if args.min_stability is not None: checks["min_stability"] = (summary["stability_pct"] or 0) >= args.min_stability
+        passed = all(checks.values()); passed_all = passed_all and passed
+        results.append({**summary, "device": device, "minutes": list(soak.minutes), "sampler": sampler, "checks": checks, "passed": passed, "minute_log": soak.log_path})
+        print(f"{'PASS' if passed else 'FAIL'} {device} {summary['seconds']:,}s samples={summary['samples']:,} rate={summary['rate_hz']:.2f}Hz "
+              f"max_gap={summary['max_gap_ms']:.3f}ms disconnects={summary['disconnects']}")
+        for name, ok in checks.items():
+            if not ok: print(f"  기준 미달: {device} {name}", file=sys.stderr)
+    if args.format == "json":
+        with open(out_path, "w", encoding="utf-8") as f: json.dump({"mode": "soak", "duration_s": duration, "devices": results}, f, ensure_ascii=False, indent=2)
+    else: write_soak_report(out_path, rows)
+    print(f"내구 리포트: {out_path}")
+    for ch, (_, soak, sampler) in zip(channels, rows): _record_headless(args, ch, soak.summary(), sampler, out_path)
+    return EXIT_PASS if passed_all else EXIT_FAIL
+
+def _run_latency_headless(args: argparse.Namespace, backend: InputBackend, index: int, device: str, stamp: str) -> int:
+    """입력 지연 측정(--mode latency): 자극 --samples회의 지연을 측정해 저장하고, --max-latency가 있으면 P99로 판정합니다."""
+    out_path = args.output or f"Latency_{index + 1}_{backend.name}_{stamp}.{'json' if args.format == 'json' else 'txt'}"
+    errors: List[str] = []
+    probe = LatencyProbeThread(index, args.samples, backend=backend, strategy=args.sampler, response_button=args.latency_button, capture_meta={"device": device}, gc_mode=args.gc, fidelity=args.high_fidelity)
+    probe.deviceError.connect(errors.append, Qt.DirectConnection)
+    analysis = AnalysisThread(probe)
+    probe.start(); analysis.start()
+    if not probe.wait(int(args.timeout * 1000)): probe.stop(); probe.wait()
+    analysis.stop(); analysis.wait(); backend.close()
+    if errors: print(f"오류: {errors[0]}", file=sys.stderr); return EXIT_ERROR
+    latencies = probe.snapshot_intervals_ns()
+    if not latencies: print(f"FAIL {device} 응답이 기록된 자극이 없습니다 (무응답 {probe.timeouts}회).", file=sys.stderr); return EXIT_FAIL
+    sampler = {**probe.sampler_report(), **analysis.counters()}
+    if args.format == "json": stats = analyze_intervals(latencies)
+    else: stats = write_latency_report(out_path, latencies, device, sampler)
+    p99 = stats.get("percentiles_ms", {}).get(99.0, stats.get("max_ms", 0.0))
+    checks = {"samples": len(latencies) >= args.samples}
+    if args.max_latency is not None: checks["max_latency"] = p99 <= args.max_latency
+    passed = all(checks.values())
+    if args.format == "json":
+        summary = {k: v for k, v in stats.items() if k not in ("outliers", "histogram", "quantiles_ms", "mean_hz", "median_hz", "stability_pct")} # 폴링레이트 전용 지표 제외
+        summary.update({"device": device, "mode": "latency", "sampler": sampler, "checks": checks, "passed": passed})
+        with open(out_path, "w", encoding="utf-8") as f: json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"{'PASS' if passed else 'FAIL'} {device} events={len(latencies)} median={stats.get('median_ms', 0):.3f}ms p99={p99:.3f}ms "
+          f"timeouts={probe.timeouts} -> {out_path}")
+    for name, ok in checks.items():
+        if not ok: print(f"  기준 미달: {device} {name}", file=sys.stderr)
+    _record_headless(args, probe, stats, sampler, out_path)
+    return EXIT_PASS if passed else EXIT_FAIL
+
+def run_results_query(args: argparse.Namespace) -> int:
+    """결과 저장소 조회(--history, --trend, --compare)를 출력합니다. 필터가 XXXX:XXXX 형식이면 VID:PID, 아니면 장치명으로 찾습니다."""
+    path = resolve_results_db(args.results_db)
+    if not os.path.exists(path): print(f"오류: 결과 저장소가 없습니다: {path}", file=sys.stderr); return EXIT_ERROR
+    store = ResultsStore(path)
+    try:
+        if args.compare: print(format_comparison(store.compare(*args.compare))); return EXIT_PASS
+        text = args.history or None
+        by_model = text is not None and len(text) == 9 and text[4] == ":" and all(c in "0123456789abcdefABCDEF" for c in text[:4] + text[5:])
+        key = {"vid_pid": text.upper()} if by_model else {"device": text}
+        if args.trend:
+            for timestamp, value in store.trend(args.trend, mode=args.mode, **key): print(f"{timestamp}	{value:.4f}")
+        else: print(format_run_table(store.runs(limit=args.limit, **key)))
+        return EXIT_PASS
+    except ValueError as e: print(f"오류: {e}", file=sys.stderr); return EXIT_ERROR
+    finally: store.close()
+
+def run_headless(args: argparse.Namespace) -> int:
+    """
+    GUI 없이 측정 엔진(PollingThread + AnalysisThread)만으로 측정하고 결과를 저장합니다.
+    - QApplication과 위젯을 만들지 않으므로 시작이 빠르고 화면 갱신이 샘플러를 교란하지 않습니다.
+    - --all-devices는 연결된 모든 슬롯을 MultiPollingThread로 함께 측정하고 장치별 결과와 통합 요약을 남깁니다.
+    - --soak는 샘플 수 대신 시간 예산으로 측정하는 내구 측정입니다 (_run_soak_headless).
+    - --mode latency는 폴링레이트 대신 입력 지연을 측정합니다 (_run_latency_headless, 단일 장치).
+    - 종료 코드: 0 = 합격, 1 = 기준 미달 또는 샘플 부족, 2 = 장치/백엔드 오류
+    """
+    try: backend = create_backend(args.backend)
+    except (OSError, ValueError) as e: print(f"오류: 입력 백엔드를 초기화할 수 없습니다: {e}", file=sys.stderr); return EXIT_ERROR
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    indices = [i for i in range(backend.max_devices) if backend.get_state(i)[0] == ERROR_SUCCESS] if args.all_devices else [args.device]
+    if not indices: print("오류: 측정 가능한 장치가 없습니다.", file=sys.stderr); backend.close(); return EXIT_ERROR
+    devices = [f"#{i + 1} [{backend.name}]" for i in indices]
+    if isinstance(backend, ReplayBackend) and args.mode != "latency":
+        # 자이로 캡처는 스틱 값이 그대로인 패킷도 담고 있으므로 자이로 모드로 재생해야 원본과 같은 간격이 나옵니다. 재생은 캡처에 든 간격 수를 넘을 수 없습니다.
+        if args.mode == "standard" and any(backend.capture_metadata(i).get("mode") == "gyro" for i in indices):
+            args.mode = "gyro"; print("참고: 자이로 모드로 기록된 캡처이므로 자이로 모드로 재생합니다.", file=sys.stderr)
+        args.samples = min(args.samples, min(backend.interval_count(i) for i in indices))
+    if args.mode == "latency":
+        if args.all_devices or args.soak: print("오류: 지연 측정은 단일 장치, 샘플 수 기준으로만 지원합니다.", file=sys.stderr); backend.close(); return EXIT_ERROR
+        try: return _run_latency_headless(args, backend, indices[0], devices[0], stamp)
+        except (OSError, ValueError) as e: print(f"오류: {e}", file=sys.stderr); backend.close(); return EXIT_ERROR
+    if args.soak:
+        try: return _run_soak_headless(args, backend, indices, devices, stamp)
+        except (OSError, ValueError) as e: print(f"오류: {e}", file=sys.stderr); backend.close(); return EXIT_ERROR
+    if args.output: out_path = args.output
+    else: out_path = f"Report_{'all' if args.all_devices else str(indices[0] + 1)}_{backend.name}_{stamp}.{args.format}"
+    root, ext = os.path.splitext(out_path)
+    # 다중 장치 측정은 장치별 결과를 '<이름>_<포트>.<형식>'으로, 통합 요약을 지정한 경로(텍스트)에 저장합니다.
+    out_paths = [f"{root}_{i + 1}{ext}" for i in indices] if args.all_devices else [out_path]
+    capture_paths = [p if args.format == "gpcap" else os.path.splitext(p)[0] + ".gpcap" for p in out_paths]
+
+    errors: List[str] = []; failed: Set[int] = set()
+    if args.all_devices:
+        thread = MultiPollingThread(indices, args.samples, args.mode == "gyro", backend=backend, strategy=args.sampler,
+                                    capture_paths=capture_paths, capture_meta=[{"device": d} for d in devices], gc_mode=args.gc, fidelity=args.high_fidelity)
+        thread.channelError.connect(lambda idx, msg: (failed.add(idx), print(f"오류: 포트 #{idx + 1} {msg}", file=sys.stderr)), Qt.DirectConnection)
+        channels = thread.channels
+    else:
+        thread = PollingThread(indices[0], args.samples, args.mode == "gyro", backend=backend, strategy=args.sampler,
+                               capture_path=capture_paths[0], capture_meta={"device": devices[0]}, gc_mode=args.gc, fidelity=args.high_fidelity)
+        channels = [thread]
+    thread.deviceError.connect(errors.append, Qt.DirectConnection) # 이벤트 루프가 없으므로 직접 호출
+    analyses = [AnalysisThread(ch) for ch in channels]
+    thread.start()
+    for analysis in analyses: analysis.start()
+    if not thread.wait(int(args.timeout * 1000)): thread.stop(); thread.wait()
+    for analysis in analyses: analysis.stop(); analysis.wait()
+    backend.close()
+    for ch, capture_path in zip(channels, capture_paths):
+        if os.path.exists(capture_path) and ch.ring.write_count == 0: os.remove(capture_path)
+    if errors:
+        print(f"오류: {errors[0]}", file=sys.stderr)
+        return EXIT_ERROR
+
+    passed_all = True; rows = []
+    for ch, analysis, device, path, capture_path in zip(channels, analyses, devices, out_paths, capture_paths):
+        if ch.ring.write_count == 0: print(f"FAIL {device} 측정된 간격이 없습니다.", file=sys.stderr); passed_all = False; continue
+        passed, stats, sampler = _headless_result(args, ch, analysis, device, path, capture_path)
+        passed_all = passed_all and passed and ch.device_index not in failed; rows.append((device, stats, sampler))
+    if args.all_devices and rows:
+        summary_path = root + (".txt" if ext != ".txt" else "_summary.txt")
+        write_combined_report(summary_path, rows); print(f"통합 리포트: {summary_path}")
+    return EXIT_PASS if passed_all else EXIT_FAIL
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """명령줄 인자를 해석합니다. Qt 전용 인자는 그대로 남겨 QApplication에 전달됩니다."""
+    parser = argparse.ArgumentParser(prog="GamePadTester", description="XInput 게임패드 폴링레이트/입력 테스터")
+    parser.add_argument("--backend", default="xinput", help='입력 백엔드 (기본: xinput, 예: "sim:1000:jitter", 캡처 재생은 "replay:Capture.gpcap:4x")')
+    parser.add_argument("--bench", choices=["stats", "alloc", "store", "replay"],
+                        help="마이크로벤치마크를 실행하고 종료합니다 (stats: 통계 엔진, alloc: 수집 루프 할당, store: 결과 저장소 조회, "
+                             "replay: 최대 속도 재생으로 측정 파이프라인 처리량, --backend replay:CAPTURE로 캡처 지정).")
+    parser.add_argument("--gc", choices=list(GC_MODES), default="freeze", help="측정 구간의 가비지 컬렉터 제어 (기본: freeze, disable은 내구 측정에서 freeze로 대체)")
+    parser.add_argument("--high-fidelity", type=int, nargs="?", const=FIDELITY_AUTO, default=None, metavar="CPU",
+                        help="고정밀 측정: 측정 스레드를 코어 CPU(생략 시 허용된 마지막 코어)에 고정하고 우선순위와 타이머 해상도를 올림 (GUI에서는 '고정밀 측정' 기본 체크)")
+    parser.add_argument("--staleness-ms", type=float, default=DeviceStateService.DEFAULT_STALENESS_MS, help="GUI 장치 상태 캐시의 허용 지연(ms, 기본: 16)")
+    parser.add_argument("--profile-startup", action="store_true", help="시작 단계별(import, 초기화, 첫 프레임) 소요 시간을 출력합니다.")
+    parser.add_argument("--export", metavar="CAPTURE", help="캡처 파일(.gpcap)을 텍스트 리포트로 내보내고 종료합니다.")
+    db = parser.add_argument_group("결과 저장소")
+    db.add_argument("--results-db", default=RESULTS_DB_NAME, metavar="PATH", help=f"측정 결과를 기록할 SQLite 파일 (기본: {RESULTS_DB_NAME}, 상대 경로는 프로그램 폴더 기준)")
+    db.add_argument("--no-results-db", action="store_true", help="측정 결과를 결과 저장소에 기록하지 않습니다.")
+    db.add_argument("--history", nargs="?", const="", metavar="FILTER", help="저장된 측정을 최신순으로 출력하고 종료합니다 (FILTER: VID:PID 또는 장치명).")
+    db.add_argument("--trend", metavar="METRIC", help="--history와 함께: 지표(예: median_hz, stability_pct, p99_ms)의 시간순 추이를 출력합니다 (--mode 적용).")
+    db.add_argument("--compare", nargs=2, type=int, metavar=("A", "B"), help="두 측정(ID)의 지표 차이와 분포 검정(KS) 결과를 출력하고 종료합니다.")
+    db.add_argument("--limit", type=int, default=50, help="--history 출력 건수 (기본: 50)")
+    cli = parser.add_argument_group("헤드리스 측정")
+    cli.add_argument("--headless", action="store_true", help="GUI 없이 측정하고 결과에 따라 종료 코드를 반환합니다.")
+    cli.add_argument("--device", type=int, default=0, help="장치 인덱스 (0~3, 기본: 0)")
+    cli.add_argument("--all-devices", action="store_true", help="연결된 모든 장치를 동시에 측정합니다 (--device 무시).")
+    cli.add_argument("--samples", type=int, default=4000, help="측정할 샘플 수 (기본: 4000)")
+    cli.add_argument("--mode", choices=["standard", "gyro", "latency"], default="standard", help="측정 모드 (기본: standard, latency는 --samples회 자극의 입력 지연)")
+    cli.add_argument("--sampler", choices=list(SAMPLER_STRATEGIES), default="hybrid", help="샘플링 전략 (기본: hybrid)")
+    cli.add_argument("--timeout", type=float, default=60.0, help="최대 측정 시간(초, 기본: 60)")
+    cli.add_argument("--output", help="결과 파일 경로 (기본: 현재 폴더의 Report_<장치>_<시각>.<형식>)")
+    cli.add_argument("--format", choices=["txt", "json", "gpcap"], default="txt", help="결과 형식 (기본: txt, 캡처 파일은 항상 함께 저장)")
+    cli.add_argument("--min-hz", type=float, help="합격 기준: 중앙값 폴링레이트(Hz) 하한")
+    cli.add_argument("--min-stability", type=float, help="합격 기준: 안정도(%%) 하한")
+    cli.add_argument("--min-keepup", type=float, metavar="X", help=f"합격 기준: 샘플러 폴링 주기 ÷ 장치 주기 하한 (미지정 시 {KEEPUP_MIN_X:g}배 미만이면 경고만)")
+    cli.add_argument("--max-missed", type=float, metavar="PCT", help=f"합격 기준: 패킷 누락률(%%) 상한 (미지정 시 {MISSED_MAX_PCT:g}%% 초과면 경고만)")
+    cli.add_argument("--soak", metavar="DURATION", help="내구 측정: 샘플 수 대신 주어진 시간(예: 8h, 30m, 90s) 동안 측정하고 분 단위 추이를 기록합니다.")
+    cli.add_argument("--soak-raw", action="store_true", help="내구 측정의 원본 패킷을 캡처 파일(.gpcap)로도 기록합니다 (기본: 구간 집계만 저장).")
+    cli.add_argument("--latency-button", choices=list(BUTTON_MASKS), default=SIM_LOOPBACK_BUTTON, help=f"지연 측정: 루프백 장치가 누르는 응답 버튼 (기본: {SIM_LOOPBACK_BUTTON})")
+    cli.add_argument("--max-latency", type=float, help="합격 기준: 지연 측정 P99(ms) 상한")
+    args, _ = parser.parse_known_args(argv)
+    return args
 
 def main():
-    if os.name != "nt": 
+    args = parse_args(sys.argv[1:])
+    startup_mark("명령줄 해석")
+    if args.bench == "stats": benchmark_stats(); return
+    if args.bench == "alloc": benchmark_alloc(); return
+    if args.bench == "store": benchmark_store(); return
+    if args.bench == "replay":
+        path = None
+        if args.backend.startswith("replay:"):
+            try: backend = create_backend(args.backend)
+            except (OSError, ValueError) as e: print(f"오류: {e}", file=sys.stderr); sys.exit(EXIT_ERROR)
+            path = backend.paths[0]; backend.close()
+        benchmark_replay(path); return
+    if args.history is not None or args.compare: sys.exit(run_results_query(args))
+    if args.export:
+        txt_path = report_path_for_capture(args.export)
+        try: export_capture_to_text(args.export, txt_path)
+        except (OSError, ValueError) as e: print(f"내보내기 실패: {e}"); sys.exit(1)
+        print(f"리포트 저장: {txt_path}"); return
+    if args.headless: sys.exit(run_headless(args))
+    if args.backend == "xinput" and os.name != "nt":
         app = QApplication(sys.argv)
-        QMessageBox.critical(None, "오류", "이 프로그램은 Windows(XInput) 전용입니다.")
+        QMessageBox.critical(None, "오류", "이 프로그램은 Windows(XInput) 전용입니다.\n다른 환경에서는 --backend 옵션으로 백엔드를 지정하세요.")
         return
     
     # --- 단일 인스턴스 실행 처리 ---
-    mutex_name = "GamePadTester_Mutex_2A5V3D7G"
-    kernel32 = ctypes.WinDLL('kernel32')
-    mutex_handle = kernel32.CreateMutexW(None, True, mutex_name)
+    mutex_handle = None; kernel32 = None
+    if os.name == "nt":
+        mutex_name = "GamePadTester_Mutex_2A5V3D7G"
+        kernel32 = ctypes.WinDLL('kernel32')
+        mutex_handle = kernel32.CreateMutexW(None, True, mutex_name)
 
-    if kernel32.GetLastError() == ERROR_ALREADY_EXISTS:
-        app = QApplication(sys.argv)
-        QMessageBox.warning(None, "실행 오류", "프로그램이 이미 실행 중입니다.")
-        sys.exit(1)
+        if kernel32.GetLastError() == ERROR_ALREADY_EXISTS:
+            app = QApplication(sys.argv)
+            QMessageBox.warning(None, "실행 오류", "프로그램이 이미 실행 중입니다.")
+            sys.exit(1)
 
     try:
-        app = QApplication(sys.argv); app.setStyleSheet(STYLESHEET)
-        app_icon = QIcon(_load_app_pixmap()) if _load_app_pixmap() else QIcon()
-        app.setWindowIcon(app_icon)
-        w = MainWindow(); w.setWindowIcon(app_icon); w.show()
+        app = QApplication(sys.argv); app.setStyleSheet(STYLESHEET); startup_mark("QApplication 생성")
+        try: backend = create_backend(args.backend)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(None, "오류", f"입력 백엔드를 초기화할 수 없습니다.\n{e}"); sys.exit(1)
+        startup_mark("입력 백엔드 초기화")
+        pixmap = _load_app_pixmap(); app_icon = QIcon(pixmap) if pixmap else QIcon()
+        app.setWindowIcon(app_icon); startup_mark("아이콘 디코딩")
+        w = MainWindow(backend, args.staleness_ms, args.gc, args.high_fidelity, None if args.no_results_db else args.results_db); w.setWindowIcon(app_icon); startup_mark("메인 창 구성")
+        if args.profile_startup: w.startupFinished.connect(lambda: print(format_startup_profile(), flush=True))
+        w.show()
         sys.exit(app.exec())
     finally:
         # 프로그램 종료 시 뮤텍스 해제
@@ -860,6 +4076,7 @@ def main():
             kernel32.ReleaseMutex(mutex_handle)
             kernel32.CloseHandle(mutex_handle)
 
+startup_mark("모듈 로드")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# GUI 없이도 QThread/QObject를 쓰는 측정 엔진을 불러올 수 있도록 화면 없는 Qt 플랫폼을 사용합니다.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+import ctypes
+
+import GamePadTester as gpt
+
+
+def make_state(k):
+    state = gpt.XINPUT_STATE(); state.dwPacketNumber = 0xFFFF0000 + k
+    gp = state.Gamepad
+    gp.wButtons = k & 0xFFFF; gp.bLeftTrigger = k % 256; gp.bRightTrigger = 255 - k % 256
+    gp.sThumbLX = -k; gp.sThumbLY = k * 3; gp.sThumbRX = -32768 + k; gp.sThumbRY = 32767 - k # 마지막 필드까지 레코드에 들어가야 함
+    return state
+
+
+def test_xinput_state_matches_the_16_byte_record():
+    assert ctypes.sizeof(gpt.XINPUT_GAMEPAD) == 12
+    assert ctypes.sizeof(gpt.XINPUT_STATE) == 16
+
+
+def test_capture_round_trip_keeps_timestamps_and_full_states(tmp_path):
+    path = str(tmp_path / "Capture_1.gpcap")
+    ring = gpt.PacketRing(64, with_states=True)
+    states = [make_state(k) for k in range(50)]
+    timestamps = [1_000_000_000 + k * 1_000_000 + (k % 3) * 7_000 for k in range(50)]
+    for ts, state in zip(timestamps, states): ring.append_packet(ts, state)
+    writer = gpt.CaptureWriter(path, {"device": "#1 [test]", "mode": "standard"}, with_states=True)
+    writer.write_views(ring.views()); writer.close()
+    assert writer.records == 50
+
+    with gpt.CaptureReader(path) as cap:
+        assert len(cap) == 50 and cap.with_states and cap.metadata["device"] == "#1 [test]"
+        assert list(cap.timestamps()) == timestamps
+        assert list(cap.intervals_ns()) == [b - a for a, b in zip(timestamps, timestamps[1:])]
+        for k, state in enumerate(states):
+            assert bytes(cap.state(k)) == bytes(state)
+
+
+def test_timestamp_only_capture(tmp_path):
+    path = str(tmp_path / "Capture_2.gpcap")
+    ring = gpt.PacketRing(16, with_states=False)
+    for k in range(20): ring.append_packet(k * 2_000_000, gpt.XINPUT_STATE())
+    writer = gpt.CaptureWriter(path, {}, with_states=False)
+    writer.write_views(ring.views()); writer.close()
+    with gpt.CaptureReader(path) as cap:
+        assert not cap.with_states and len(cap) == 16
+        assert list(cap.intervals_ns()) == [2_000_000] * 15
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+import GamePadTester as gpt
+
+INTERVAL_NS = 1_000_000
+
+
+def write_event_stream(path, packets, start_ns=5_000_000_000):
+    """ABS_X 값을 바꾸는 SYN_REPORT 패킷을 1ms 간격으로 기록한 녹화 파일(struct input_event 나열)을 만듭니다."""
+    with open(path, "wb") as f:
+        for i in range(packets):
+            ts_ns = start_ns + i * INTERVAL_NS
+            sec, usec = divmod(ts_ns // 1000, 1_000_000)
+            f.write(gpt._INPUT_EVENT.pack(sec, usec, gpt.EV_ABS, gpt.ABS_X, (i % 200 + 1) * 100))
+            f.write(gpt._INPUT_EVENT.pack(sec, usec, gpt.EV_SYN, gpt.SYN_REPORT, 0))
+
+
+@pytest.mark.parametrize("strategy", ["hybrid", "event"])
+def test_recorded_stream_yields_kernel_intervals_and_ends_at_eof(tmp_path, strategy):
+    packets = 3 * gpt.EvdevBackend.FILE_CHUNK_EVENTS + 17 # 여러 덩어리에 걸친 녹화
+    path = tmp_path / "rec.bin"; write_event_stream(path, packets)
+    backend = gpt.EvdevBackend([str(path)])
+    capture = gpt.PollingThread(0, 100_000, backend=backend, strategy=strategy)
+    start = time.monotonic()
+    capture.start()
+    assert capture.wait(10_000), "녹화 파일 끝에서 측정이 끝나지 않았습니다"
+    elapsed = time.monotonic() - start
+    backend.close()
+    intervals = capture.snapshot_intervals_ns()
+    assert len(intervals) == packets - 1
+    assert set(intervals) == {INTERVAL_NS}
+    assert elapsed < 5.0
+
+
+def test_stream_ended_only_after_all_packets_are_read(tmp_path):
+    path = tmp_path / "rec.bin"; write_event_stream(path, 10)
+    backend = gpt.EvdevBackend([str(path)])
+    assert backend.get_state(0)[0] == gpt.ERROR_SUCCESS
+    assert not backend.stream_ended(0)
+    res, packets = backend.read_packets(0)
+    assert res == gpt.ERROR_SUCCESS and len(packets) == 10
+    assert [b - a for (a, _), (b, _) in zip(packets, packets[1:])] == [INTERVAL_NS] * 9
+    backend.read_packets(0)
+    assert backend.stream_ended(0)
+    backend.discard_packets(0) # 측정 시작마다 처음부터 다시 읽음
+    assert not backend.stream_ended(0)
+    assert len(backend.read_packets(0)[1]) == 10
+    backend.close()
+
+
+def test_unopenable_path_names_the_path():
+    with pytest.raises(OSError, match="/nonexistent"):
+        gpt.EvdevBackend(["/nonexistent"])
@@ -0,0 +1,41 @@
+import json
+
+import GamePadTester as gpt
+
+
+def run(tmp_path, *extra, name="result.json"):
+    out = tmp_path / name
+    argv = ["--headless", "--backend", "sim:1000", "--samples", "300", "--timeout", "30", "--format", "json",
+            "--output", str(out), "--no-results-db", *extra]
+    return gpt.run_headless(gpt.parse_args(argv)), out
+
+
+def test_pass_writes_json_summary(tmp_path):
+    code, out = run(tmp_path)
+    assert code == gpt.EXIT_PASS == 0
+    summary = json.loads(out.read_text(encoding="utf-8"))
+    assert {"checks", "passed", "sampler"} <= summary.keys()
+    assert summary["passed"] is True and all(summary["checks"].values())
+    assert summary["samples"] >= 300
+    assert 900 < summary["median_hz"] < 1100
+    assert summary["sampler"]["sampler"] == "hybrid"
+    assert (tmp_path / "result.gpcap").exists() # 캡처 파일은 항상 함께 저장
+
+
+def test_unmet_threshold_exits_1(tmp_path):
+    code, out = run(tmp_path, "--min-hz", "5000")
+    assert code == gpt.EXIT_FAIL == 1
+    summary = json.loads(out.read_text(encoding="utf-8"))
+    assert summary["passed"] is False and summary["checks"]["min_hz"] is False
+
+
+def test_unopenable_backend_exits_2(tmp_path, capsys):
+    code = gpt.run_headless(gpt.parse_args(["--headless", "--backend", "evdev:/nonexistent", "--no-results-db", "--output", str(tmp_path / "x.json")]))
+    assert code == gpt.EXIT_ERROR == 2
+    assert "/nonexistent" in capsys.readouterr().err
+
+
+def test_missing_device_exits_2(tmp_path):
+    code, out = run(tmp_path, "--device", "3")
+    assert code == gpt.EXIT_ERROR
+    assert not out.exists()
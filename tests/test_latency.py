@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+import GamePadTester as gpt
+
+LATENCY_MS, DEVICE_PERIOD_MS = 4.0, 1.0
+
+
+def test_latency_mode_against_simulated_loopback(tmp_path):
+    out = tmp_path / "latency.json"
+    argv = ["--headless", "--mode", "latency", "--backend", f"sim:1000:ideal:0:0:{LATENCY_MS:g}/1", "--samples", "40", "--timeout", "60",
+            "--format", "json", "--output", str(out), "--no-results-db"]
+    assert gpt.run_headless(gpt.parse_args(argv)) == gpt.EXIT_PASS
+    summary = json.loads(out.read_text(encoding="utf-8"))
+    assert summary["mode"] == "latency" and summary["passed"] is True
+    assert summary["samples"] == 40
+    assert summary["sampler"]["latency_timeouts"] == 0
+    # 응답은 지연 뒤 다음 패킷에 실리므로 중앙값은 설정 지연 + 패킷 주기의 절반 근처여야 합니다.
+    assert summary["median_ms"] == pytest.approx(LATENCY_MS + DEVICE_PERIOD_MS / 2, abs=0.75)
+    assert summary["percentiles_ms"]["99.0"] < LATENCY_MS + 4 * 1.0 + DEVICE_PERIOD_MS
+
+
+def test_latency_threshold_fails_when_p99_is_above_it(tmp_path):
+    argv = ["--headless", "--mode", "latency", "--backend", "sim:1000:ideal:0:0:4/1", "--samples", "10", "--timeout", "60",
+            "--format", "json", "--output", str(tmp_path / "latency.json"), "--no-results-db", "--max-latency", "2"]
+    assert gpt.run_headless(gpt.parse_args(argv)) == gpt.EXIT_FAIL
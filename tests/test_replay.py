@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+import GamePadTester as gpt
+
+
+def write_capture(path, count=2000, seed=7):
+    """간격이 0.8~1.6 ms로 흔들리고 매 패킷 스틱 값이 바뀌는 작은 표준 모드 캡처를 만듭니다."""
+    rng = random.Random(seed)
+    ring = gpt.PacketRing(count, with_states=True)
+    ts = 1_000_000_000
+    for k in range(count):
+        state = gpt.XINPUT_STATE(); state.dwPacketNumber = k + 1
+        state.Gamepad.sThumbLX = (k * 37) % 30000 + 1; state.Gamepad.sThumbRY = -((k * 11) % 30000) - 1
+        ring.append_packet(ts, state)
+        ts += rng.choice((800_000, 1_000_000, 1_000_000, 1_000_000, 1_250_000)) + (15_000_000 if k % 500 == 499 else 0) # 드문 긴 간격은 이상치
+    writer = gpt.CaptureWriter(path, {"mode": "standard", "backend": "test"}, with_states=True)
+    writer.write_views(ring.views()); writer.close()
+    return count
+
+
+@pytest.mark.parametrize("strategy", ["hybrid", "event"])
+def test_max_speed_replay_reproduces_capture_stats(tmp_path, strategy):
+    path = str(tmp_path / "Capture_replay.gpcap")
+    records = write_capture(path)
+    backend = gpt.create_backend(f"replay:{path}:max")
+    try:
+        assert backend.interval_count(0) == records - 1
+        thread = gpt.PollingThread(0, backend.interval_count(0), backend=backend, strategy=strategy)
+        analysis = gpt.AnalysisThread(thread)
+        thread.start(); analysis.start()
+        assert thread.wait(10_000)
+        analysis.stop(); assert analysis.wait(10_000)
+    finally:
+        backend.close()
+
+    with gpt.CaptureReader(path) as cap: recorded = cap.intervals_ns()
+    expected = gpt.analyze_intervals(recorded)
+    assert list(thread.snapshot_intervals_ns()) == list(recorded)
+    live = analysis.latest_snapshot()
+    assert live["samples"] == expected["samples"] == records - 1
+    for key in ("median_ms", "mean_ms", "stability_pct"):
+        assert live[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-9), key
+    final = gpt.analyze_intervals(thread.snapshot_intervals_ns())
+    assert {k: final[k] for k in ("median_ms", "mean_ms", "stability_pct")} == {k: expected[k] for k in ("median_ms", "mean_ms", "stability_pct")}
@@ -0,0 +1,25 @@
+from array import array
+
+import GamePadTester as gpt
+
+
+def fill(ring, n):
+    for i in range(n): ring.append(i * 1000)
+    return [i * 1000 for i in range(n)]
+
+
+def test_ring_keeps_only_the_latest_capacity_values():
+    ring = gpt.IntervalRing(10)
+    values = fill(ring, 25)
+    assert ring.tolist() == values[-10:]
+    assert ring.all_values() == array("q", values[-10:])
+
+
+def test_spilled_ring_returns_the_whole_record_as_int64_array(tmp_path):
+    ring = gpt.IntervalRing(10, str(tmp_path / "spill.bin"))
+    values = fill(ring, 37)
+    result = ring.all_values()
+    ring.close()
+    assert isinstance(result, array) and result.typecode == "q"
+    assert result.tolist() == values
+    assert ring.spilled == 30
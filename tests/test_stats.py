@@ -0,0 +1,40 @@
+import random
+from collections import deque
+
+import pytest
+
+import GamePadTester as gpt
+
+KEYS = ("samples", "mean_ms", "median_ms", "mean_hz", "median_hz")
+
+
+def assert_matches(snapshot, expected):
+    assert snapshot["samples"] == expected["samples"]
+    if expected["samples"] < 10: return
+    for key in KEYS: assert snapshot[key] == pytest.approx(expected[key], rel=1e-9)
+    # 안정도는 1µs 히스토그램으로 세므로 ±2σ 양쪽 경계 구간에 걸친 값(각 하나)만큼의 차이를 허용합니다.
+    assert abs(snapshot["stability_pct"] - expected["stability_pct"]) <= 2 * 100.0 / expected["samples"] + 1e-9
+
+
+def test_sliding_window_matches_batch_stats():
+    rng = random.Random(3)
+    values = [int(rng.gauss(1_000_000, 40_000)) for _ in range(3000)] + [rng.choice((2_000_000, 8_000_000)) for _ in range(50)]
+    stats = gpt.StreamingPollingStats(); window = deque(); size = 500
+    for i, v in enumerate(values):
+        stats.add(v); window.append(v)
+        if len(window) > size: stats.remove(window.popleft())
+        if i % 97 == 0: assert_matches(stats.snapshot(), gpt.compute_polling_stats(list(window)))
+    assert_matches(stats.snapshot(), gpt.compute_polling_stats(list(window)))
+
+
+def test_drain_to_empty_and_refill():
+    stats = gpt.StreamingPollingStats(); tree = stats._tree; median = stats._median
+    values = [1_000_000 + 1000 * (i % 7) for i in range(40)]
+    for v in values: stats.add(v)
+    for v in values: stats.remove(v)
+    assert stats.snapshot() == {"samples": 0}
+    assert stats._tree is tree and stats._median is median # 구조를 다시 만들지 않음
+    assert not any(tree) and not median.lo and not median.hi and not median.delayed
+    refill = [2_000_000 + 500 * (i % 5) for i in range(30)]
+    for v in refill: stats.add(v)
+    assert_matches(stats.snapshot(), gpt.compute_polling_stats(refill))